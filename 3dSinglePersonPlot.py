@@ -1,10 +1,16 @@
-import json, os
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (needed for 3D)
 from matplotlib.widgets import Button, Slider, TextBox
 from JSON_FILES.JSONREAD import filecleanup, filecleanupsingle
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "AlphaPose_Code"))
+from frameindex import LazyFrames
+from adapters import entry_xyz
+from skeleton import edges_for
+
 
 
 #CONSTS ---------
@@ -14,23 +20,6 @@ JSON_PATH = "C:/Users/Francisco Jimenez/Desktop/rec1RE.json"
 # lim = None
 #----------------
 
-# ----------------------------
-# Skeleton edges (COCO-17 default; swap to SMPL24 if you prefer)
-# ----------------------------
-COCO17_EDGES = [
-    (0,1),(0,2),(1,3),(2,4),
-    (0,5),(0,6),(5,7),(7,9),
-    (6,8),(8,10),(5,11),(6,12),
-    (11,13),(13,15),(12,14),(14,16)
-]
-SMPL24_EDGES = [
-    (0,1),(1,4),(4,7),(7,10),
-    (0,2),(2,5),(5,8),(8,11),
-    (0,3),(3,6),(6,9),(9,12),(12,15),
-    (12,13),(13,16),(16,18),(18,20),(20,22),
-    (12,14),(14,17),(17,19),(19,21),(21,23)
-]
-
 def frame_number(k: str) -> int:
     base = os.path.splitext(k)[0]
     try:
@@ -43,16 +32,12 @@ def frame_number(k: str) -> int:
         return 0
 
 def load_frames(json_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    # Group by image_id
-    frames = {}
-    for d in data:
-        frames.setdefault(d["image_id"], []).append(d)
-    # Sort by frame number
-    keys = sorted(frames.keys(), key=frame_number)
-    return keys, frames
+    """
+    Sorted frame keys plus a lazy image_id -> entries mapping: frames are parsed from
+    their byte ranges (frameindex sidecar) as the player reaches them, not all up front.
+    """
+    frames = LazyFrames(json_path)
+    return frames.keys, frames
 
 def select_person_entry(entries, target_idx=None):
     if not entries:
@@ -67,15 +52,12 @@ def select_person_entry(entries, target_idx=None):
 def get_xyz_from_entry(entry):
     """
     Returns (x, y, z) arrays or (None, None, None) if missing.
-    Expects 'pred_xyz_jts' shape (J, 3).
+    Reads 'pred_xyz_jts' (J, 3) or 'keypoints_3d' through adapters.entry_xyz.
     """
     if entry is None:
         return None, None, None
-    kj = entry.get("pred_xyz_jts")
-    if kj is None:
-        return None, None, None
-    kp = np.array(kj, dtype=float)
-    if kp.ndim != 2 or kp.shape[1] < 3:
+    kp, _ = entry_xyz(entry)   # pred_xyz_jts (nested or flat) or keypoints_3d
+    if kp is None:
         return None, None, None
     return kp[:, 0], kp[:, 1], kp[:, 2]
 
@@ -84,7 +66,7 @@ class Pose3DPlayer:
         self,
         json_path,
         target_idx=None,           # track id to follow, or None for first person
-        edges=SMPL24_EDGES,
+        edges=None,                # None: picked from the joint count (COCO17, SMPL24/29, BODY_25)
         fps=15,
         fixed_limits= lim,         # e.g., (-1000,1000) to force all axes same range
         auto_scale_margin=1.2,     # margin factor if not using fixed_limits
@@ -95,7 +77,6 @@ class Pose3DPlayer:
             raise RuntimeError("No frames found in JSON.")
         self.fps = max(1, int(fps))
         self.target_idx = target_idx
-        self.edges = edges
         self.interval = int(1000 / self.fps)
         self.fixed_limits = fixed_limits
         self.auto_scale_margin = auto_scale_margin
@@ -126,6 +107,7 @@ class Pose3DPlayer:
 
         if x is None:
             raise RuntimeError("Could not find any frame with 'pred_xyz_jts' data.")
+        self.edges = edges if edges is not None else edges_for(len(x))
 
         # artists
         self.scat = self.ax.scatter3D(x, y, z, s=self.point_size)
@@ -369,7 +351,6 @@ if __name__ == "__main__":
     viewer = Pose3DPlayer(
         json_path=JSON_PATH,
         target_idx=1,        # or an integer track id, e.g., 0 or 1
-        edges=SMPL24_EDGES,
         fps=30,
         fixed_limits= lim,     
         auto_scale_margin=1.3,  # enlarge the autoscaled cube a bit
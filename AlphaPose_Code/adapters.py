@@ -0,0 +1,238 @@
+# adapters.py — every supported pose source -> the same columns (see columnar.py)
+import os
+import re
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from columnar import entries_to_columns, load_columns, save_columns, frame_number
+from archive import load_archive
+from frameindex import load_frame_index, read_frames
+
+STREAM_FRAMES = 256   # frames parsed per read when streaming an AlphaPose .json through its frame index
+
+# ----------------------------
+# Source adapters
+# ----------------------------
+def load_alphapose(path):
+    """AlphaPose results JSON (2D keypoints, plus pred_xyz_jts when the 3D model was used)."""
+    return load_columns(path)
+
+def _openpose_frame_number(filename):
+    match = re.search(r'_(\d+)_keypoints\.json$', filename)
+    return int(match.group(1)) if match else -1
+
+def _read_openpose_file(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return [np.asarray(p['pose_keypoints_2d'], dtype=np.float32).reshape(-1, 3) for p in data.get('people', [])]
+
+def load_openpose_folder(json_dir, workers=None):
+    """
+    Folder of OpenPose *_keypoints.json files (one per frame), read on a thread pool.
+    OpenPose has no tracking, so track ids are the person order within each frame —
+    run the result through repair2 to get stable IDs.
+    """
+    files = sorted((f for f in os.listdir(json_dir) if f.endswith('_keypoints.json')), key=_openpose_frame_number)
+    if not files:
+        raise RuntimeError(f"No *_keypoints.json files found in {json_dir}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        people = list(executor.map(_read_openpose_file, (os.path.join(json_dir, f) for f in files)))
+
+    F = len(files)
+    K = max((len(p) for p in people), default=0)
+    J = max((len(kp) for p in people for kp in p), default=25)
+    cols = {
+        "frame": np.array([_openpose_frame_number(f) for f in files], dtype=np.int64),
+        "image_id": np.array([f"{_openpose_frame_number(f)}.jpg" for f in files], dtype=str),
+        "track_id": np.arange(K, dtype=np.int64),
+        "keypoints": np.zeros((F, K, J, 3), dtype=np.float32),
+        "present": np.zeros((F, K), dtype=bool),
+        "score": np.zeros((F, K), dtype=np.float32),
+        "box": np.zeros((F, K, 4), dtype=np.float32),
+    }
+    for fi, frame_people in enumerate(people):
+        for k, kp in enumerate(frame_people):
+            cols["keypoints"][fi, k, :len(kp)] = kp
+            cols["present"][fi, k] = True
+            vis = kp[kp[:, 2] > 0]
+            if len(vis):
+                cols["score"][fi, k] = vis[:, 2].mean()
+                x0, y0 = vis[:, :2].min(axis=0)
+                x1, y1 = vis[:, :2].max(axis=0)
+                cols["box"][fi, k] = (x0, y0, x1 - x0, y1 - y0)
+    return cols
+
+def read_jsonl(path):
+    """
+    Frame-per-line JSON (what repair2 streams): yields one list of entries per line.
+    A torn last line — the writer died mid-frame — is skipped, everything before it is kept.
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise
+                return
+
+def load_session(path, workers=None):
+    """Dispatch on the path: OpenPose folder, .npz columns, .qca archive, frame-per-line .jsonl or AlphaPose JSON."""
+    if os.path.isdir(path):
+        return load_openpose_folder(path, workers)
+    if path.endswith('.qca'):
+        return load_archive(path)
+    if path.endswith('.jsonl'):
+        return entries_to_columns([e for frame in read_jsonl(path) for e in frame])
+    if path.endswith('.npz') or path.endswith('.json'):
+        return load_alphapose(path)
+    raise ValueError(f"Don't know how to load '{path}'")
+
+# ----------------------------
+# Columns -> AlphaPose entries (for code that walks entry dicts)
+# ----------------------------
+def columns_to_entries(cols):
+    entries = []
+    has_xyz = "xyz" in cols
+    has_valid = "xyz_valid" in cols
+    for fi, k in zip(*np.nonzero(cols["present"])):
+        e = {
+            "image_id": str(cols["image_id"][fi]),
+            "category_id": 1,
+            "keypoints": cols["keypoints"][fi, k].reshape(-1).tolist(),
+            "score": float(cols["score"][fi, k]),
+            "box": cols["box"][fi, k].tolist(),
+            "idx": int(cols["track_id"][k]),
+        }
+        if has_xyz:
+            e["pred_xyz_jts"] = cols["xyz"][fi, k].tolist()
+        if has_valid:
+            e["xyz_valid"] = cols["xyz_valid"][fi, k].astype(int).tolist()
+        entries.append(e)
+    return entries
+
+def entry_keypoints(entry):
+    """(J, 3) x/y/score from an entry's flat "keypoints" — any joint count (COCO17, BODY_25, 29) — or None."""
+    kp = np.asarray(entry.get("keypoints", ()), dtype=float).reshape(-1)
+    if kp.size == 0 or kp.size % 3:
+        return None
+    return kp.reshape(-1, 3)
+
+def entry_xyz(entry):
+    """
+    (J, 3) 3D joints and a (J,) visibility mask (None = all visible) from "pred_xyz_jts"
+    (nested or flat) or "keypoints_3d" (x/y/z/visibility); (None, None) when the entry has neither.
+    """
+    if "pred_xyz_jts" in entry:
+        X = np.asarray(entry["pred_xyz_jts"], dtype=float)
+        if X.size == 0 or X.size % 3:
+            return None, None
+        return X.reshape(-1, 3), None
+    if "keypoints_3d" in entry:
+        A = np.asarray(entry["keypoints_3d"], dtype=float)
+        if A.ndim == 1 and A.size and A.size % 4 == 0:
+            A = A.reshape(-1, 4)
+        if A.ndim == 2 and A.shape[1] >= 3:
+            return A[:, :3], (A[:, 3] > 0) if A.shape[1] > 3 else None
+    return None, None
+
+def load_entries(path, workers=None):
+    """AlphaPose-style entry list from any supported source (plain JSON / JSON-lines are read as-is)."""
+    if os.path.isfile(path) and path.endswith('.json'):
+        with open(path, 'r') as f:
+            return json.load(f)
+    if os.path.isfile(path) and path.endswith('.jsonl'):
+        return [e for frame in read_jsonl(path) for e in frame]
+    return columns_to_entries(load_session(path, workers))
+
+def iter_frames(path, workers=None):
+    """
+    (image_id, entries) in frame order. A .jsonl file is streamed a line at a time and an
+    AlphaPose .json is read STREAM_FRAMES frames at a time through its frame index (see
+    frameindex.py), so neither is held whole; other sources are loaded whole and grouped.
+    """
+    if os.path.isfile(path) and path.endswith('.jsonl'):
+        for frame in read_jsonl(path):
+            if frame:
+                yield frame[0]["image_id"], frame
+        return
+    if os.path.isfile(path) and path.endswith('.json'):
+        index = load_frame_index(path)
+        ids = index["image_id"]
+        for i in range(0, len(ids), STREAM_FRAMES):
+            yield from read_frames(path, image_ids=ids[i:i + STREAM_FRAMES], index=index).items()
+        return
+    frames = {}
+    for entry in load_entries(path, workers):
+        frames.setdefault(entry["image_id"], []).append(entry)
+    for fid in sorted(frames, key=frame_number):
+        yield fid, frames.pop(fid)
+
+# ----------------------------
+# Streaming entry writers (repair output)
+# ----------------------------
+class JsonLinesWriter:
+    """One JSON array of a frame's entries per line, flushed as written: a crash loses at most one frame."""
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'w')
+
+    def write(self, entries):
+        self.f.write(json.dumps(entries, separators=(',', ':')))
+        self.f.write('\n')
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+class JsonArrayWriter:
+    """Classic AlphaPose layout (one flat JSON array), written entry by entry instead of in one dump."""
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'w')
+        self.f.write('[')
+        self.first = True
+
+    def write(self, entries):
+        for e in entries:
+            if not self.first:
+                self.f.write(', ')
+            self.f.write(json.dumps(e))
+            self.first = False
+
+    def close(self):
+        self.f.write(']')
+        self.f.close()
+
+class ColumnsWriter:
+    """
+    Columnar .npz (see columnar.py). npz can't be appended to, so entries are held with
+    their keypoints as float32 arrays (a fraction of the size of JSON lists) and packed on close:
+    memory grows with the session. Write .jsonl when a session doesn't fit in memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+
+    def write(self, entries):
+        for e in entries:
+            e = dict(e)
+            e["keypoints"] = np.asarray(e.get("keypoints", ()), dtype=np.float32)
+            if "pred_xyz_jts" in e:
+                e["pred_xyz_jts"] = np.asarray(e["pred_xyz_jts"], dtype=np.float32)
+            self.entries.append(e)
+
+    def close(self):
+        save_columns(entries_to_columns(self.entries), self.path)
+        self.entries = []
+
+def open_entry_writer(path):
+    """Writer for repaired entries, picked by extension: .jsonl, .npz, anything else -> JSON array."""
+    if path.endswith('.jsonl'):
+        return JsonLinesWriter(path)
+    if path.endswith('.npz'):
+        return ColumnsWriter(path)
+    return JsonArrayWriter(path)
@@ -0,0 +1,243 @@
+# archive.py — compact, chunked, random-access storage for finished sessions (.qca)
+#   python archive.py pack session.json session.qca
+#   python archive.py unpack session.qca restored.json
+#   python archive.py info session.qca
+import io
+import os
+import json
+import zlib
+import struct
+import argparse
+import numpy as np
+
+from columnar import save_columns
+
+# ----------------------------
+# Format
+# ----------------------------
+# [MAGIC][chunk 0][chunk 1]...[index JSON (zlib)][u64 index offset][MAGIC]
+# Each chunk is an uncompressed .npz of one frame range, compressed as a whole with zstd
+# (if the `zstandard` package is installed) or zlib. The index lists every chunk's frame
+# range and byte span, so a frame range is read without touching the rest of the file.
+#
+# Inside a chunk, x/y (and box) are fixed-point integers of XY_STEP pixels, xyz of XYZ_STEP
+# meters: the chunk's first frame is stored absolute (int32), later frames as the per-track
+# difference from the frame before (int16 when it fits, which it nearly always does — people
+# move a few pixels per frame). Absent detections repeat the last value so they cost nothing.
+# Keypoint confidences are float16.
+MAGIC = b"QCA1"
+XY_STEP = 1 / 32           # pixels; round-trip error <= 1/64 px
+XYZ_STEP = 1e-4            # meters (pred_xyz_jts)
+CHUNK_FRAMES = 256         # frames per compressed chunk
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+def _codec(name=None):
+    """(name, compress, decompress) — zstd when available (or asked for), else zlib."""
+    if name in (None, "zstd"):
+        try:
+            import zstandard
+            return ("zstd",
+                    zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress,
+                    zstandard.ZstdDecompressor().decompress)
+        except ImportError:
+            if name == "zstd":
+                raise RuntimeError("zstd archives need the zstandard package (pip install zstandard).")
+    if name in (None, "zlib"):
+        return "zlib", lambda b: zlib.compress(b, ZLIB_LEVEL), zlib.decompress
+    raise ValueError(f"Unknown archive codec '{name}' (use 'zstd' or 'zlib')")
+
+# ----------------------------
+# Fixed-point + time-delta encoding
+# ----------------------------
+def _ffill(a, present):
+    """Absent rows (per frame, per track) take the last present value along time."""
+    F = len(present)
+    last = np.where(present, np.arange(F)[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    last = last.reshape(last.shape + (1,) * (a.ndim - 2))
+    return np.take_along_axis(a, last, axis=0)
+
+def _pack_fixed(a, present, step):
+    q = _ffill(np.round(a / step).astype(np.int64), present)
+    base = q[:1].astype(np.int32)
+    delta = np.diff(q, axis=0)
+    small = delta.size == 0 or (delta.min() >= -32768 and delta.max() <= 32767)
+    return base, delta.astype(np.int16 if small else np.int32)
+
+def _unpack_fixed(base, delta, present, step):
+    q = np.concatenate([base.astype(np.int64), delta.astype(np.int64)], axis=0)
+    out = (np.cumsum(q, axis=0) * step).astype(np.float32)
+    out[~present] = 0.0
+    return out
+
+def _encode_chunk(cols, a, b):
+    present = cols["present"][a:b]
+    kp = cols["keypoints"][a:b]
+    arrays = {
+        "frame": cols["frame"][a:b],
+        "image_id": cols["image_id"][a:b],
+        "present": np.packbits(present, axis=None),
+        "score": cols["score"][a:b],
+        "conf": kp[..., 2].astype(np.float16),
+    }
+    arrays["xy_base"], arrays["xy_delta"] = _pack_fixed(kp[..., :2], present, XY_STEP)
+    arrays["box_base"], arrays["box_delta"] = _pack_fixed(cols["box"][a:b], present, XY_STEP)
+    if "xyz" in cols:
+        arrays["xyz_base"], arrays["xyz_delta"] = _pack_fixed(cols["xyz"][a:b], present, XYZ_STEP)
+    if "xyz_valid" in cols:
+        arrays["xyz_valid"] = np.packbits(cols["xyz_valid"][a:b], axis=None)
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+def _decode_chunk(raw, n_frames, K):
+    with np.load(io.BytesIO(raw), allow_pickle=False) as z:
+        present = np.unpackbits(z["present"], count=n_frames * K).reshape(n_frames, K).astype(bool)
+        xy = _unpack_fixed(z["xy_base"], z["xy_delta"], present, XY_STEP)
+        conf = z["conf"].astype(np.float32)
+        conf[~present] = 0.0
+        cols = {
+            "frame": z["frame"],
+            "image_id": z["image_id"],
+            "keypoints": np.concatenate([xy, conf[..., None]], axis=-1),
+            "present": present,
+            "score": z["score"],
+            "box": _unpack_fixed(z["box_base"], z["box_delta"], present, XY_STEP),
+        }
+        if "xyz_base" in z.files:
+            cols["xyz"] = _unpack_fixed(z["xyz_base"], z["xyz_delta"], present, XYZ_STEP)
+        if "xyz_valid" in z.files:
+            shape = cols["xyz"].shape[:3]
+            cols["xyz_valid"] = np.unpackbits(z["xyz_valid"], count=int(np.prod(shape))).reshape(shape).astype(bool)
+    return cols
+
+# ----------------------------
+# Write / read
+# ----------------------------
+def save_archive(cols, path, chunk_frames=CHUNK_FRAMES, codec=None):
+    """Write columns (see columnar.py) as a .qca archive."""
+    name, compress, _ = _codec(codec)
+    F = len(cols["frame"])
+    chunks = []
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        for a in range(0, F, chunk_frames):
+            b = min(F, a + chunk_frames)
+            blob = compress(_encode_chunk(cols, a, b))
+            chunks.append({"start": a, "frames": b - a,
+                           "first_frame": int(cols["frame"][a]), "last_frame": int(cols["frame"][b - 1]),
+                           "offset": f.tell(), "nbytes": len(blob)})
+            f.write(blob)
+        index = {
+            "version": 1, "codec": name, "frames": F,
+            "track_id": cols["track_id"].tolist(),
+            "joints": int(cols["keypoints"].shape[2]),
+            "joints_3d": int(cols["xyz"].shape[2]) if "xyz" in cols else 0,
+            "xyz_valid": "xyz_valid" in cols,
+            "xy_step": XY_STEP, "xyz_step": XYZ_STEP,
+            "chunks": chunks,
+        }
+        index_offset = f.tell()
+        f.write(zlib.compress(json.dumps(index).encode()))
+        f.write(struct.pack("<Q", index_offset))
+        f.write(MAGIC)
+    return path
+
+def read_index(path):
+    """The archive's index: track ids, joint counts, codec and every chunk's frame range / byte span."""
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a .qca archive")
+        f.seek(-12, os.SEEK_END)
+        index_offset, = struct.unpack("<Q", f.read(8))
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is truncated (no index)")
+        end = f.seek(0, os.SEEK_END) - 12
+        f.seek(index_offset)
+        return json.loads(zlib.decompress(f.read(end - index_offset)))
+
+def load_archive(path, frame_range=None):
+    """
+    Columns from a .qca archive. frame_range=(first, last) (frame numbers, inclusive)
+    only reads and decodes the chunks that overlap it.
+    """
+    index = read_index(path)
+    _, _, decompress = _codec(index["codec"])
+    K = len(index["track_id"])
+    chunks = index["chunks"]
+    if frame_range is not None:
+        lo, hi = frame_range
+        chunks = [c for c in chunks if c["last_frame"] >= lo and c["first_frame"] <= hi]
+
+    parts = []
+    with open(path, "rb") as f:
+        for c in chunks:
+            f.seek(c["offset"])
+            parts.append(_decode_chunk(decompress(f.read(c["nbytes"])), c["frames"], K))
+
+    J, J3 = index["joints"], index["joints_3d"]
+    empty = {"frame": np.zeros(0, np.int64), "image_id": np.zeros(0, str),
+             "keypoints": np.zeros((0, K, J, 3), np.float32), "present": np.zeros((0, K), bool),
+             "score": np.zeros((0, K), np.float32), "box": np.zeros((0, K, 4), np.float32)}
+    if J3:
+        empty["xyz"] = np.zeros((0, K, J3, 3), np.float32)
+    if index.get("xyz_valid"):
+        empty["xyz_valid"] = np.zeros((0, K, J3), bool)
+    cols = {k: np.concatenate([p[k] for p in parts]) if parts else v for k, v in empty.items()}
+    cols["track_id"] = np.array(index["track_id"], dtype=np.int64)
+
+    if frame_range is not None:
+        keep = (cols["frame"] >= lo) & (cols["frame"] <= hi)
+        cols = {k: (v if k == "track_id" else v[keep]) for k, v in cols.items()}
+    return cols
+
+# ----------------------------
+# JSON <-> archive
+# ----------------------------
+def pack(src_path, out_path, chunk_frames=CHUNK_FRAMES, codec=None):
+    """Any supported pose source (see adapters.py) -> .qca."""
+    from adapters import load_session
+    return save_archive(load_session(src_path), out_path, chunk_frames, codec)
+
+def unpack(path, out_path, frame_range=None):
+    """.qca -> AlphaPose JSON (or .npz columns, by extension) in the existing schema."""
+    cols = load_archive(path, frame_range)
+    if out_path.endswith(".npz"):
+        return save_columns(cols, out_path)
+    from adapters import columns_to_entries
+    with open(out_path, "w") as f:
+        json.dump(columns_to_entries(cols), f)
+    return out_path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pack pose sessions into compact .qca archives and back")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("pack", help="JSON / .jsonl / .npz / OpenPose folder -> .qca")
+    p.add_argument("src")
+    p.add_argument("out")
+    p.add_argument("--chunk-frames", type=int, default=CHUNK_FRAMES)
+    p.add_argument("--codec", choices=("zstd", "zlib"))
+    u = sub.add_parser("unpack", help=".qca -> AlphaPose JSON (or .npz)")
+    u.add_argument("src")
+    u.add_argument("out")
+    u.add_argument("--frames", nargs=2, type=int, metavar=("FIRST", "LAST"), help="only this frame range")
+    i = sub.add_parser("info", help="print the chunk index")
+    i.add_argument("src")
+    args = ap.parse_args()
+
+    if args.cmd == "pack":
+        pack(args.src, args.out, args.chunk_frames, args.codec)
+        before = sum(os.path.getsize(os.path.join(r, n)) for r, _, ns in os.walk(args.src) for n in ns) \
+            if os.path.isdir(args.src) else os.path.getsize(args.src)
+        after = os.path.getsize(args.out)
+        print(f"{args.src}: {before / 1e6:.2f} MB -> {args.out}: {after / 1e6:.2f} MB ({before / max(after, 1):.1f}x)")
+    elif args.cmd == "unpack":
+        unpack(args.src, args.out, tuple(args.frames) if args.frames else None)
+        print(f"Wrote {args.out}")
+    else:
+        index = read_index(args.src)
+        print(f"{index['frames']} frames, {len(index['track_id'])} tracks, {index['joints']} joints"
+              f"{', ' + str(index['joints_3d']) + ' 3D joints' if index['joints_3d'] else ''}, codec {index['codec']}")
+        for c in index["chunks"]:
+            print(f"  frames {c['first_frame']}-{c['last_frame']}: {c['nbytes']} bytes @ {c['offset']}")
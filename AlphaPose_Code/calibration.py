@@ -0,0 +1,191 @@
+# calibration.py — pixel -> meter mapping for distances and speeds
+import json
+import numpy as np
+import cv2
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog
+
+CALIBRATION_JSON = "calibration.json"
+
+# ----------------------------
+# Building the transform
+# ----------------------------
+def homography_from_points(image_pts, world_pts):
+    """
+    3x3 homography H with world ~ H @ [x, y, 1] (DLT, >= 4 correspondences).
+    image_pts: (N,2) pixels, world_pts: (N,2) meters on the mat plane.
+    """
+    src = np.asarray(image_pts, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(world_pts, dtype=np.float64).reshape(-1, 2)
+    if len(src) < 4 or len(src) != len(dst):
+        raise ValueError("Need at least 4 matching image/world points.")
+    x, y = src[:, 0], src[:, 1]
+    u, v = dst[:, 0], dst[:, 1]
+    z, o = np.zeros_like(x), np.ones_like(x)
+    A = np.concatenate([
+        np.stack([x, y, o, z, z, z, -u * x, -u * y, -u], axis=1),
+        np.stack([z, z, z, x, y, o, -v * x, -v * y, -v], axis=1),
+    ])
+    _, _, Vt = np.linalg.svd(A)
+    H = Vt[-1].reshape(3, 3)
+    return H / H[2, 2]
+
+def mat_corners_homography(corners_px, width_m, length_m):
+    """Four clicked mat corners (TL, TR, BR, BL) -> homography onto a width x length meter rectangle."""
+    world = [(0.0, 0.0), (width_m, 0.0), (width_m, length_m), (0.0, length_m)]
+    return homography_from_points(corners_px, world)
+
+def reference_scale(p1_px, p2_px, length_m):
+    """Known-size reference (e.g. a fighter's height): uniform scale as a 3x3 matrix."""
+    px = float(np.linalg.norm(np.asarray(p1_px, float) - np.asarray(p2_px, float)))
+    if px <= 0:
+        raise ValueError("Reference points must be distinct.")
+    s = length_m / px
+    return np.diag([s, s, 1.0])
+
+def projection_from_points(image_pts, world_pts):
+    """
+    3x4 camera matrix P with [x, y, 1] ~ P @ [X, Y, Z, 1] (DLT resection, >= 6 correspondences
+    not all on one plane — e.g. the mat corners plus points at a known height).
+    image_pts: (N,2) pixels, world_pts: (N,3) meters.
+    """
+    src = np.asarray(image_pts, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(world_pts, dtype=np.float64).reshape(-1, 3)
+    if len(src) < 6 or len(src) != len(dst):
+        raise ValueError("Need at least 6 matching image/world points.")
+    Xh = np.concatenate([dst, np.ones((len(dst), 1))], axis=1)
+    z = np.zeros_like(Xh)
+    A = np.concatenate([
+        np.concatenate([Xh, z, -src[:, :1] * Xh], axis=1),
+        np.concatenate([z, Xh, -src[:, 1:] * Xh], axis=1),
+    ])
+    _, _, Vt = np.linalg.svd(A)
+    P = Vt[-1].reshape(3, 4)
+    return P / np.linalg.norm(P[2, :3])
+
+# ----------------------------
+# Applying it (batched)
+# ----------------------------
+def apply_homography(H, xy):
+    """Map (..., 2) pixel coords through H in one matrix op. NaNs pass through."""
+    xy = np.asarray(xy, dtype=np.float64)
+    out = xy @ H[:2, :2].T + H[:2, 2]
+    w = xy @ H[2, :2] + H[2, 2]
+    return out / w[..., None]
+
+def calibrate_keypoints(keypoints, H):
+    """(..., J, 3) x/y/score -> same shape with x/y in meters; scores untouched."""
+    kp = np.array(keypoints, dtype=np.float32, copy=True)
+    kp[..., :2] = apply_homography(H, kp[..., :2])
+    return kp
+
+# ----------------------------
+# Persisting
+# ----------------------------
+def save_calibration(H, path=CALIBRATION_JSON, method="homography"):
+    with open(path, "w") as f:
+        json.dump({"H": np.asarray(H, float).tolist(), "units": "m", "method": method}, f, indent=2)
+    return path
+
+def load_calibration(path):
+    """Returns the 3x3 pixel->meter matrix, or None when path is empty."""
+    if not path:
+        return None
+    with open(path, "r") as f:
+        H = np.array(json.load(f)["H"], dtype=np.float64)
+    if H.shape != (3, 3):
+        raise ValueError(f"Calibration in {path} is not a 3x3 matrix.")
+    return H
+
+def save_projection(P, path, method="dlt"):
+    with open(path, "w") as f:
+        json.dump({"P": np.asarray(P, float).tolist(), "units": "m", "method": method}, f, indent=2)
+    return path
+
+def load_projection(path):
+    """
+    3x4 pixel <- meter camera matrix from a JSON holding "P", or "K", "R", "t"
+    (intrinsics, world->camera rotation, translation in meters).
+    """
+    with open(path, "r") as f:
+        d = json.load(f)
+    if "P" in d:
+        P = np.array(d["P"], dtype=np.float64)
+    else:
+        K, R = np.array(d["K"], dtype=np.float64), np.array(d["R"], dtype=np.float64)
+        P = K @ np.concatenate([R, np.array(d["t"], dtype=np.float64).reshape(3, 1)], axis=1)
+    if P.shape != (3, 4):
+        raise ValueError(f"Camera in {path} is not a 3x4 projection.")
+    return P
+
+# ----------------------------
+# Point picking on the first video frame
+# ----------------------------
+def pick_points(video_path, n, title="Click points (Enter = done, Esc = cancel)"):
+    cap = cv2.VideoCapture(video_path)
+    ok, frame = cap.read()
+    cap.release()
+    if not ok:
+        raise RuntimeError("Could not read a frame from the video.")
+
+    pts = []
+    def on_click(event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN and len(pts) < n:
+            pts.append((x, y))
+            cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)
+            cv2.putText(frame, str(len(pts)), (x + 6, y - 6), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.7, (0, 0, 255), 2, cv2.LINE_AA)
+
+    cv2.namedWindow(title)
+    cv2.setMouseCallback(title, on_click)
+    try:
+        while True:
+            cv2.imshow(title, frame)
+            key = cv2.waitKey(20) & 0xFF
+            if key == 27:
+                return None
+            if key in (13, 10) and len(pts) == n:
+                return np.array(pts, dtype=np.float64)
+    finally:
+        cv2.destroyWindow(title)
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.withdraw()
+
+    try:
+        video = filedialog.askopenfilename(
+            title="Select source video",
+            filetypes=[("Video Files", "*.mp4 *.avi *.mov")]
+        )
+        if not video:
+            raise RuntimeError("Calibration cancelled: no video selected.")
+
+        use_mat = messagebox.askyesno(
+            "Calibration method",
+            "Yes: click the 4 mat corners (TL, TR, BR, BL)\nNo: click 2 ends of a known-length reference"
+        )
+        if use_mat:
+            width_m = simpledialog.askfloat("Mat size", "Mat width (m), TL→TR:", minvalue=0.01)
+            length_m = simpledialog.askfloat("Mat size", "Mat length (m), TR→BR:", minvalue=0.01)
+            pts = pick_points(video, 4)
+            if pts is None or not width_m or not length_m:
+                raise RuntimeError("Calibration cancelled.")
+            H = mat_corners_homography(pts, width_m, length_m)
+            method = "mat_corners"
+        else:
+            length_m = simpledialog.askfloat("Reference", "Reference length (m):", minvalue=0.01)
+            pts = pick_points(video, 2)
+            if pts is None or not length_m:
+                raise RuntimeError("Calibration cancelled.")
+            H = reference_scale(pts[0], pts[1], length_m)
+            method = "reference"
+
+        out = save_calibration(H, CALIBRATION_JSON, method)
+        messagebox.showinfo("Calibration saved", f"Wrote {out}")
+        print(f"Wrote {out}")
+    except Exception as e:
+        messagebox.showerror("Calibration failed", str(e))
+        raise
+    finally:
+        root.destroy()
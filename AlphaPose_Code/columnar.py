@@ -0,0 +1,109 @@
+# columnar.py — AlphaPose entries <-> dense per-frame/per-track arrays
+import os
+import json
+import numpy as np
+
+# ----------------------------
+# Schema
+# ----------------------------
+# Every loader in this folder hands back the same dict of arrays ("columns"):
+#   frame     (F,)          int64    frame number parsed from image_id
+#   image_id  (F,)          str      original image_id for each frame
+#   track_id  (K,)          int64    sorted track ids (AlphaPose "idx")
+#   keypoints (F, K, J, 3)  float32  x, y, score  (zeros where absent)
+#   present   (F, K)        bool     track k was detected on frame f
+#   score     (F, K)        float32  detection score
+#   box       (F, K, 4)     float32  AlphaPose box [x, y, w, h]
+# Optional:
+#   xyz       (F, K, J3, 3) float32  pred_xyz_jts when the source has them
+#   xyz_valid (F, K, J3)    bool     per-joint 3D validity (entries' "xyz_valid", e.g. triangulate.py
+#                                    output); without it every joint of a present track counts as valid
+
+def frame_number(k: str) -> int:
+    # turns "000123.jpg" -> 123, "123.png" -> 123, "img_123.jpg" -> 123
+    base = os.path.splitext(os.path.basename(str(k)))[0]
+    try:
+        return int(base)
+    except:
+        for part in base.split('_')[::-1]:
+            if part.isdigit():
+                return int(part)
+        return 0
+
+def entries_to_columns(data):
+    """Pack a list of AlphaPose entries into the column dict described above."""
+    frames = {}
+    for entry in data:
+        fid = entry.get('image_id')
+        if fid is not None:
+            frames.setdefault(fid, []).append(entry)
+    sorted_fids = sorted(frames.keys(), key=frame_number)
+
+    # Track ids: use "idx" when present, otherwise the position within the frame
+    def _tid(entry, pos):
+        pid = entry.get('idx')
+        if isinstance(pid, list):  # some AlphaPose builds emit [idx]
+            pid = pid[0] if pid else None
+        return int(pid) if pid is not None else pos
+
+    ids = set()
+    n_joints = 0
+    n_joints_3d = 0
+    has_valid = False
+    for fid in sorted_fids:
+        for pos, entry in enumerate(frames[fid]):
+            ids.add(_tid(entry, pos))
+            n_joints = max(n_joints, len(entry.get('keypoints', ())) // 3)
+            if 'pred_xyz_jts' in entry:
+                n_joints_3d = max(n_joints_3d, np.asarray(entry['pred_xyz_jts']).size // 3)
+                has_valid = has_valid or 'xyz_valid' in entry
+
+    track_id = np.array(sorted(ids), dtype=np.int64)
+    col_of = {int(t): k for k, t in enumerate(track_id)}
+    F, K = len(sorted_fids), len(track_id)
+
+    cols = {
+        "frame": np.array([frame_number(f) for f in sorted_fids], dtype=np.int64),
+        "image_id": np.array(sorted_fids, dtype=str),
+        "track_id": track_id,
+        "keypoints": np.zeros((F, K, n_joints, 3), dtype=np.float32),
+        "present": np.zeros((F, K), dtype=bool),
+        "score": np.zeros((F, K), dtype=np.float32),
+        "box": np.zeros((F, K, 4), dtype=np.float32),
+    }
+    if n_joints_3d:
+        cols["xyz"] = np.zeros((F, K, n_joints_3d, 3), dtype=np.float32)
+    if n_joints_3d and has_valid:
+        cols["xyz_valid"] = np.zeros((F, K, n_joints_3d), dtype=bool)
+
+    for fi, fid in enumerate(sorted_fids):
+        for pos, entry in enumerate(frames[fid]):
+            k = col_of[_tid(entry, pos)]
+            if cols["present"][fi, k]:
+                continue  # duplicate id in one frame: keep the first
+            cols["present"][fi, k] = True
+            kp = np.asarray(entry.get('keypoints', ()), dtype=np.float32).reshape(-1, 3)
+            cols["keypoints"][fi, k, :len(kp)] = kp
+            cols["score"][fi, k] = entry.get('score', 0.0)
+            box = entry.get('box')
+            if box is not None and len(box) == 4:
+                cols["box"][fi, k] = box
+            if n_joints_3d and 'pred_xyz_jts' in entry:
+                X = np.asarray(entry['pred_xyz_jts'], dtype=np.float32).reshape(-1, 3)
+                cols["xyz"][fi, k, :len(X)] = X
+                if has_valid:
+                    cols["xyz_valid"][fi, k, :len(X)] = entry.get('xyz_valid', True)
+    return cols
+
+def load_columns(path):
+    """Load an AlphaPose JSON (or a saved .npz of columns) as columns."""
+    if path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as z:
+            return {k: z[k] for k in z.files}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return entries_to_columns(data)
+
+def save_columns(cols, path):
+    np.savez_compressed(path, **cols)
+    return path
@@ -2,6 +2,7 @@ import os
 import shutil
 
 def clear_directory(dir_path):
+    os.makedirs(dir_path, exist_ok=True)
     for filename in os.listdir(dir_path):
         file_path = os.path.join(dir_path, filename)
         try:
@@ -17,4 +18,6 @@ def clear_all():
     directory = 'AlphaPose_Code/output_plots'  # replace with your directory path
     clear_directory(directory)
     clear_directory('AlphaPose_Code/selected_frames')
-clear_all()
\ No newline at end of file
+
+if __name__ == "__main__":
+    clear_all()
\ No newline at end of file
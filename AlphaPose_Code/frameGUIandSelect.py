@@ -1,10 +1,13 @@
 import os
-import json
 import shutil
 import cv2
 import tkinter as tk
 from tkinter import messagebox
 
+from instrument import stage, count
+from adapters import load_entries
+from frameindex import indexed_frames
+
 # ----------------------------
 # Frame Range Helper Functions
 # ----------------------------
@@ -14,14 +17,12 @@ def extract_frame_number(image_id):
     return int(base.split('_')[-1])
 
 def frame_range_from_json(json_path, start_time, end_time, fps):
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-
-    frames = set()
-    for entry in data:
-        fname = entry['image_id']
-        frame_num = extract_frame_number(fname)
-        frames.add(frame_num)
+    if json_path.endswith('.json'):
+        # frame list straight from the byte-offset sidecar: no entry is parsed
+        image_ids, _ = indexed_frames(json_path)
+    else:
+        image_ids = [entry['image_id'] for entry in load_entries(json_path)]
+    frames = {extract_frame_number(fname) for fname in image_ids}
 
     start_frame = int(start_time * fps)
     end_frame = int(end_time * fps)
@@ -116,13 +117,15 @@ def frame_selector(json_path,video_path):
 
     # ✅ Copy selected frames
     copied = 0
-    for frame in range(start, end + 1):
-        filename = f"plot_{frame}.png"
-        src_path = os.path.join(SOURCE_DIR, filename)
-        dst_path = os.path.join(TARGET_DIR, filename)
-
-        if os.path.exists(src_path):
-            shutil.copy2(src_path, dst_path)
-            copied += 1
+    with stage("frame_select"):
+        for frame in range(start, end + 1):
+            filename = f"plot_{frame}.png"
+            src_path = os.path.join(SOURCE_DIR, filename)
+            dst_path = os.path.join(TARGET_DIR, filename)
+
+            if os.path.exists(src_path):
+                shutil.copy2(src_path, dst_path)
+                copied += 1
+    count("selected_frames", copied)
 
     print(f"Copied {copied} frames (plot_{start}.png to plot_{end}.png) to '{TARGET_DIR}'")
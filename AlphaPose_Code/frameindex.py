@@ -0,0 +1,197 @@
+# frameindex.py — image_id -> byte ranges sidecar, for reading a few frames of a huge AlphaPose JSON
+import os
+import json
+import numpy as np
+from collections import OrderedDict
+
+from columnar import frame_number
+
+# ----------------------------
+# Sidecar
+# ----------------------------
+# <session>.json.frames.npz, rebuilt automatically when the JSON's size or mtime changes:
+#   image_id    (F,)  str    frames in frame order
+#   frame       (F,)  int64  frame_number(image_id)
+#   span_frame  (S,)  int64  row in image_id this span belongs to
+#   span_start  (S,)  int64  byte offset of the span's first entry ("{")
+#   span_end    (S,)  int64  byte offset just past the span's last entry ("}")
+#   span_count  (S,)  int64  entries in the span
+# A span is a run of consecutive entries of one frame — AlphaPose writes each frame's
+# entries together, so there is normally one span per frame.
+INDEX_SUFFIX = ".frames.npz"
+SCAN_BLOCK = 16 * 1024 * 1024   # bytes read per step while scanning
+MERGE_GAP = 64 * 1024           # spans closer than this are fetched with one read
+
+def index_path(json_path):
+    return json_path + INDEX_SUFFIX
+
+def _scan_entries(json_path, block=SCAN_BLOCK):
+    """
+    Yield (image_id, start, end) for every top-level entry, reading the file in blocks.
+    The text is decoded as latin-1 so string positions are byte offsets.
+    """
+    decoder = json.JSONDecoder()
+    with open(json_path, 'rb') as f:
+        buf = ""
+        base = 0        # byte offset of buf[0]
+        pos = 0
+        eof = False
+        started = False
+        while True:
+            # skip separators
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buf):
+                if buf[pos] != '[':
+                    raise ValueError(f"{json_path} is not a JSON array of entries")
+                started = True
+                pos += 1
+                continue
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                if pos >= len(buf):
+                    raise ValueError("need more data")
+                entry, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    if pos >= len(buf):
+                        return
+                    raise
+                chunk = f.read(block)
+                eof = not chunk
+                base += pos
+                buf = buf[pos:] + chunk.decode('latin-1')
+                pos = 0
+                continue
+            image_id = str(entry["image_id"]).encode('latin-1').decode('utf-8')
+            yield image_id, base + pos, base + end
+            pos = end
+
+def build_frame_index(json_path):
+    """Scan the JSON once and write the sidecar next to it."""
+    order = {}          # image_id -> row, in first-seen order
+    spans = []          # [row, start, end, count]
+    for image_id, start, end in _scan_entries(json_path):
+        row = order.setdefault(image_id, len(order))
+        if spans and spans[-1][0] == row:
+            spans[-1][2] = end
+            spans[-1][3] += 1
+        else:
+            spans.append([row, start, end, 1])
+
+    ids = list(order)
+    frames = np.array([frame_number(k) for k in ids], dtype=np.int64)
+    rank = np.argsort(frames, kind="stable")          # rows -> frame order
+    new_row = np.empty_like(rank)
+    new_row[rank] = np.arange(len(rank))
+    spans = np.array(spans, dtype=np.int64).reshape(-1, 4)
+    st = os.stat(json_path)
+    index = {
+        "image_id": np.array(ids, dtype=str)[rank] if ids else np.zeros(0, str),
+        "frame": frames[rank],
+        "span_frame": new_row[spans[:, 0]] if len(spans) else np.zeros(0, np.int64),
+        "span_start": spans[:, 1],
+        "span_end": spans[:, 2],
+        "span_count": spans[:, 3],
+        "source_size": np.int64(st.st_size),
+        "source_mtime_ns": np.int64(st.st_mtime_ns),
+    }
+    try:
+        with open(index_path(json_path), 'wb') as f:
+            np.savez(f, **index)
+    except OSError:
+        pass  # read-only location: still usable, just rebuilt next time
+    return index
+
+def load_frame_index(json_path, build=True):
+    """The sidecar for json_path, (re)built if it is missing or older than the JSON."""
+    path = index_path(json_path)
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as z:
+            index = {k: z[k] for k in z.files}
+        st = os.stat(json_path)
+        if int(index["source_size"]) == st.st_size and int(index["source_mtime_ns"]) == st.st_mtime_ns:
+            return index
+    if not build:
+        return None
+    return build_frame_index(json_path)
+
+# ----------------------------
+# Queries
+# ----------------------------
+def indexed_frames(json_path):
+    """(image_ids, frame numbers) in frame order, without parsing any entry."""
+    index = load_frame_index(json_path)
+    return index["image_id"].tolist(), index["frame"]
+
+def read_frames(json_path, frame_range=None, image_ids=None, index=None):
+    """
+    Entries for the frames with first <= frame <= last (frame_range) and/or the listed image_ids,
+    as {image_id: [entries]} in frame order. Only those frames' bytes are read and parsed.
+    """
+    index = index if index is not None else load_frame_index(json_path)
+    keep = np.ones(len(index["frame"]), dtype=bool)
+    if frame_range is not None:
+        keep &= (index["frame"] >= frame_range[0]) & (index["frame"] <= frame_range[1])
+    if image_ids is not None:
+        keep &= np.isin(index["image_id"], list(image_ids))
+
+    sel = np.nonzero(keep[index["span_frame"]])[0]
+    out = OrderedDict((str(index["image_id"][r]), []) for r in np.nonzero(keep)[0])
+    if not len(sel):
+        return out
+
+    # coalesce nearby spans into single reads
+    reads = []
+    for s in sel[np.argsort(index["span_start"][sel])]:
+        a, b = int(index["span_start"][s]), int(index["span_end"][s])
+        if reads and a - reads[-1][1] <= MERGE_GAP:
+            reads[-1][1] = max(reads[-1][1], b)
+            reads[-1][2].append(s)
+        else:
+            reads.append([a, b, [s]])
+
+    with open(json_path, 'rb') as f:
+        for a, b, members in reads:
+            f.seek(a)
+            blob = f.read(b - a)
+            for s in members:
+                lo, hi = int(index["span_start"][s]) - a, int(index["span_end"][s]) - a
+                entries = json.loads(b"[" + blob[lo:hi] + b"]")
+                out[str(index["image_id"][index["span_frame"][s]])].extend(entries)
+    return out
+
+class LazyFrames:
+    """
+    Mapping image_id -> entries for a JSON that may not fit in memory: frames are read
+    through the index when first asked for, and the most recent `cache` frames are kept.
+    """
+    def __init__(self, json_path, cache=256):
+        self.json_path = json_path
+        self.index = load_frame_index(json_path)
+        self.keys = self.index["image_id"].tolist()
+        self.cache = OrderedDict()
+        self.cache_size = cache
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, image_id):
+        if image_id in self.cache:
+            self.cache.move_to_end(image_id)
+            return self.cache[image_id]
+        entries = read_frames(self.json_path, image_ids=[image_id], index=self.index)[image_id]
+        self.cache[image_id] = entries
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return entries
+
+if __name__ == "__main__":
+    import sys
+    import time
+    for p in sys.argv[1:]:
+        t0 = time.perf_counter()
+        idx = build_frame_index(p)
+        print(f"{p}: {len(idx['frame'])} frames, {len(idx['span_start'])} spans, "
+              f"{time.perf_counter() - t0:.2f}s -> {index_path(p)}")
@@ -0,0 +1,102 @@
+# framesource.py — decode video frames on a background thread for skeleton overlays
+import threading
+import queue
+import cv2
+
+SEEK_GAP = 90        # jump with a seek instead of grab() when the next wanted frame is this far ahead
+_DONE = object()
+
+class VideoFrameReader:
+    """
+    Decodes only the wanted frame numbers (sorted) on a dedicated thread and hands them
+    over through a bounded queue, so the render loop never blocks on cap.read() for
+    longer than it takes to draw. Frame numbers match AlphaPose image_id ("123.jpg" -> 123).
+    """
+
+    def __init__(self, video_path, frame_numbers, queue_size=32):
+        self.video_path = video_path
+        self.wanted = sorted(set(int(f) for f in frame_numbers))
+        self.q = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._pending = None  # frame read from the queue but not asked for yet
+        self._exact_seek = True  # cleared once the container lands somewhere other than asked
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------- decoder thread ----------
+    def _seek(self, cap, target):
+        """Position cap for target and return the new position (0 after a rewind)."""
+        if self._exact_seek:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == target:
+                return target
+            # container can't seek exactly: rewind once, then only walk forward with grab()
+            self._exact_seek = False
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return 0
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            pos = 0
+            for target in self.wanted:
+                if self._stop.is_set():
+                    return
+                if target < pos or (self._exact_seek and target - pos > SEEK_GAP):
+                    pos = self._seek(cap, target)
+                while pos < target and cap.grab():
+                    pos += 1
+                ok, img = cap.read() if pos == target else (False, None)
+                pos += 1 if ok else 0
+                if not self._put((target, img if ok else None)):
+                    return
+        finally:
+            cap.release()
+            self._put(_DONE)
+
+    # ---------- consumer side ----------
+    def get(self, frame_no):
+        """Frame for frame_no (BGR), or None if it isn't in the video. Call in increasing order."""
+        while True:
+            item = self._pending if self._pending is not None else self.q.get()
+            self._pending = None
+            if item is _DONE:
+                self._pending = _DONE
+                return None
+            fno, img = item
+            if fno == frame_no:
+                return img
+            if fno > frame_no:
+                self._pending = item
+                return None
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def video_frame_count(video_path):
+    """Frame count from the container header (0 if the video can't be opened)."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+    finally:
+        cap.release()
+
+def open_backdrop(video_path, frame_numbers, enabled=True):
+    """VideoFrameReader when backdrops are enabled, else None (readers draw on white)."""
+    return VideoFrameReader(video_path, frame_numbers) if enabled else None
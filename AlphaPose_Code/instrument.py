@@ -0,0 +1,163 @@
+# instrument.py — stage timers, counters, throttled progress and run reports
+import os
+import sys
+import json
+import time
+import threading
+import cProfile
+import pstats
+from collections import defaultdict, Counter
+from contextlib import contextmanager
+
+REPORT_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "run_report.json")
+PROGRESS_EVERY = 0.5      # seconds between progress-bar redraws
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if the platform won't say)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+class RunReport:
+    def __init__(self, name="run"):
+        self.reset(name)
+
+    def reset(self, name="run"):
+        self.name = name
+        self.t0 = time.perf_counter()
+        self.stages = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.profile = None
+
+    # ---------- timers / counters ----------
+    @contextmanager
+    def stage(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - t
+            self.calls[name] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    # ---------- progress ----------
+    def progress(self, iterable, total=None, label="", counter="frames", every=PROGRESS_EVERY):
+        """Yield from iterable, redrawing one progress line at most every `every` seconds."""
+        total = total if total is not None else (len(iterable) if hasattr(iterable, "__len__") else None)
+        t0 = last = time.perf_counter()
+        done = 0
+        for item in iterable:
+            yield item
+            done += 1
+            self.counters[counter] += 1
+            now = time.perf_counter()
+            if now - last >= every or done == total:
+                last = now
+                _draw_bar(label, done, total, now - t0)
+        if done:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    # ---------- profiling ----------
+    @contextmanager
+    def profiled(self, mode="cprofile", out_path=None, interval=0.005, top=25):
+        """
+        mode="cprofile": deterministic profile, top functions by cumulative time in the report
+                         (and a .prof dump at out_path if given, for snakeviz/pstats).
+        mode="sample":   a background thread samples the calling thread's stack every
+                         `interval` s — near-zero overhead, top sampled lines in the report.
+        """
+        if mode == "cprofile":
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                if out_path:
+                    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+                    prof.dump_stats(out_path)
+                stats = pstats.Stats(prof).sort_stats("cumulative")
+                rows = []
+                for (fn, line, func), (cc, nc, tt, ct, _) in list(stats.stats.items()):
+                    rows.append({"func": f"{os.path.basename(fn)}:{line}:{func}", "calls": nc,
+                                 "tottime": round(tt, 4), "cumtime": round(ct, 4)})
+                rows.sort(key=lambda r: r["cumtime"], reverse=True)
+                self.profile = {"mode": mode, "top": rows[:top]}
+        elif mode == "sample":
+            target = threading.get_ident()
+            hits = Counter()
+            stop = threading.Event()
+
+            def sampler():
+                while not stop.wait(interval):
+                    frame = sys._current_frames().get(target)
+                    if frame is not None:
+                        code = frame.f_code
+                        hits[f"{os.path.basename(code.co_filename)}:{frame.f_lineno}:{code.co_name}"] += 1
+
+            th = threading.Thread(target=sampler, daemon=True)
+            th.start()
+            try:
+                yield
+            finally:
+                stop.set()
+                th.join()
+                n = sum(hits.values()) or 1
+                self.profile = {"mode": mode, "interval": interval, "samples": n,
+                                "top": [{"where": k, "share": round(v / n, 4)} for k, v in hits.most_common(top)]}
+        else:
+            raise ValueError(f"Unknown profile mode '{mode}' (use 'cprofile' or 'sample')")
+
+    # ---------- output ----------
+    def summary(self):
+        wall = time.perf_counter() - self.t0
+        frames = self.counters.get("frames", 0)
+        out = {
+            "name": self.name,
+            "wall_seconds": round(wall, 4),
+            "stages": {k: {"seconds": round(v, 4), "calls": self.calls[k]} for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "frames_per_s": round(frames / wall, 2) if frames and wall > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if self.profile:
+            out["profile"] = self.profile
+        return out
+
+    def write(self, path=REPORT_JSON):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+def _draw_bar(label, done, total, elapsed, width=30):
+    rate = done / elapsed if elapsed > 0 else 0.0
+    if total:
+        filled = int(width * done / total)
+        bar = "#" * filled + "-" * (width - filled)
+        eta = (total - done) / rate if rate > 0 else 0.0
+        line = f"\r{label} [{bar}] {done}/{total} • {rate:.1f}/s • {elapsed:.1f}s elapsed • ETA {eta:.1f}s"
+    else:
+        line = f"\r{label} {done} • {rate:.1f}/s • {elapsed:.1f}s elapsed"
+    sys.stdout.write(line)
+    sys.stdout.flush()
+
+# One report per process; modules time their stages into it.
+REPORT = RunReport()
+stage = REPORT.stage
+count = REPORT.count
+progress = REPORT.progress
+profiled = REPORT.profiled
+write_report = REPORT.write
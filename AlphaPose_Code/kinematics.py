@@ -0,0 +1,187 @@
+# kinematics.py — joint angles, angular velocities, joint speeds and limb extension speeds for whole sessions
+#   python kinematics.py session.json features.csv [--fps 30 --calibration calibration.json --3d]
+import argparse
+import numpy as np
+
+from adapters import load_session
+from calibration import load_calibration, calibrate_keypoints
+from metrics import DEFAULT_FPS, write_table
+
+CONF_THR = 0.05           # 2D joints at or below this confidence count as missing
+
+# ----------------------------
+# Joint layouts
+# ----------------------------
+COCO17_JOINTS = ["nose", "l_eye", "r_eye", "l_ear", "r_ear", "l_shoulder", "r_shoulder", "l_elbow", "r_elbow",
+                 "l_wrist", "r_wrist", "l_hip", "r_hip", "l_knee", "r_knee", "l_ankle", "r_ankle"]
+SMPL24_JOINTS = ["pelvis", "l_hip", "r_hip", "spine1", "l_knee", "r_knee", "spine2", "l_ankle", "r_ankle",
+                 "spine3", "l_foot", "r_foot", "neck", "l_collar", "r_collar", "head", "l_shoulder", "r_shoulder",
+                 "l_elbow", "r_elbow", "l_wrist", "r_wrist", "l_hand", "r_hand"]
+# HybrIK 29 = SMPL 24 + head top, middle fingers, big toes (angles/extensions use the SMPL 24 part)
+SMPL29_JOINTS = SMPL24_JOINTS + ["head_top", "l_middle", "r_middle", "l_bigtoe", "r_bigtoe"]
+
+# (name, a, b, c): the angle at b between b->a and b->c
+COCO17_ANGLES = [("l_elbow", 5, 7, 9), ("r_elbow", 6, 8, 10), ("l_shoulder", 11, 5, 7), ("r_shoulder", 12, 6, 8),
+                 ("l_hip", 5, 11, 13), ("r_hip", 6, 12, 14), ("l_knee", 11, 13, 15), ("r_knee", 12, 14, 16)]
+SMPL24_ANGLES = [("l_elbow", 16, 18, 20), ("r_elbow", 17, 19, 21), ("l_shoulder", 13, 16, 18),
+                 ("r_shoulder", 14, 17, 19), ("l_hip", 3, 1, 4), ("r_hip", 3, 2, 5), ("l_knee", 1, 4, 7),
+                 ("r_knee", 2, 5, 8), ("l_ankle", 4, 7, 10), ("r_ankle", 5, 8, 11)]
+# (name, proximal, distal): how far the limb reaches, and how fast that changes (strike extension)
+COCO17_EXTENSIONS = [("l_arm", 5, 9), ("r_arm", 6, 10), ("l_leg", 11, 15), ("r_leg", 12, 16)]
+SMPL24_EXTENSIONS = [("l_arm", 16, 20), ("r_arm", 17, 21), ("l_leg", 1, 7), ("r_leg", 2, 8)]
+# (shoulders, hips) for the torso length that scales features
+COCO17_TORSO = ((5, 6), (11, 12))
+SMPL24_TORSO = ((16, 17), (1, 2))
+
+LAYOUTS = {
+    17: (COCO17_JOINTS, COCO17_ANGLES, COCO17_EXTENSIONS, COCO17_TORSO),
+    24: (SMPL24_JOINTS, SMPL24_ANGLES, SMPL24_EXTENSIONS, SMPL24_TORSO),
+    29: (SMPL29_JOINTS, SMPL24_ANGLES, SMPL24_EXTENSIONS, SMPL24_TORSO),
+}
+
+# feature_matrix scaling, so every feature is roughly O(1) for the classifiers
+ANGLE_SCALE = 180.0       # degrees
+ANGVEL_SCALE = 1000.0     # degrees / s
+SPEED_SCALE = 10.0        # torso lengths / s
+
+# ----------------------------
+# Vectorized kinematics over (F, tracks, joints)
+# ----------------------------
+def joint_angles(pos, triples):
+    """(F, K, J, D) positions (NaN = missing), D = 2 or 3 -> (F, K, A) angles in degrees."""
+    a, b, c = (np.array([t[i] for t in triples]) for i in (1, 2, 3))
+    u = pos[..., a, :] - pos[..., b, :]
+    v = pos[..., c, :] - pos[..., b, :]
+    dot = (u * v).sum(-1)
+    uu, vv = (u * u).sum(-1), (v * v).sum(-1)
+    cross = np.sqrt(np.maximum(uu * vv - dot * dot, 0.0))   # |u x v| in 2D and 3D
+    ang = np.degrees(np.arctan2(cross, dot))
+    ang[(uu == 0) | (vv == 0)] = np.nan
+    return ang
+
+def time_derivative(x, t):
+    """d/dt along axis 0 (central differences, one-sided at the ends); NaN where a neighbour is missing."""
+    if len(t) < 2:
+        return np.full(x.shape, np.nan)
+    return np.gradient(x, t, axis=0)
+
+def body_scale(pos, torso):
+    """Per-track median torso length (mid-shoulder to mid-hip) over the session, (K,)."""
+    (s1, s2), (h1, h2) = torso
+    mid_s = (pos[..., s1, :] + pos[..., s2, :]) / 2
+    mid_h = (pos[..., h1, :] + pos[..., h2, :]) / 2
+    length = np.linalg.norm(mid_s - mid_h, axis=-1)
+    ok = np.isfinite(length)
+    out = np.full(length.shape[1], np.nan)
+    for k in np.nonzero(ok.any(axis=0))[0]:
+        out[k] = np.median(length[ok[:, k], k])
+    return out
+
+def compute_kinematics(cols, fps=DEFAULT_FPS, H=None, use_3d=None):
+    """
+    Angles, angular velocities, joint speeds, limb extensions and extension speeds for a whole
+    session. 2D uses the keypoints (COCO17; meters when a pixel->meter H is given), 3D uses
+    xyz (SMPL 24/29, e.g. pred_xyz_jts or triangulate.py output). use_3d=None picks 3D when
+    the columns have xyz.
+    """
+    use_3d = "xyz" in cols if use_3d is None else use_3d
+    if use_3d:
+        pos = np.asarray(cols["xyz"], dtype=np.float64)
+        valid = np.broadcast_to(cols["present"][..., None], pos.shape[:3])
+        if "xyz_valid" in cols:                 # joints triangulate.py could not solve are zeros, not positions
+            valid = valid & cols["xyz_valid"]
+        units = "m"
+    else:
+        kp = cols["keypoints"] if H is None else calibrate_keypoints(cols["keypoints"], H)
+        pos = np.asarray(kp[..., :2], dtype=np.float64)
+        valid = cols["present"][..., None] & (kp[..., 2] > CONF_THR)
+        units = "px" if H is None else "m"
+    J = pos.shape[2]
+    if J not in LAYOUTS:
+        raise ValueError(f"No joint layout for {J} joints (have {sorted(LAYOUTS)})")
+    joints, angles, extensions, torso = LAYOUTS[J]
+    pos = np.where(valid[..., None], pos, np.nan)
+    t = np.asarray(cols["frame"], dtype=np.float64) / float(fps)
+
+    angle = joint_angles(pos, angles)
+    p, d = np.array([e[1] for e in extensions]), np.array([e[2] for e in extensions])
+    ext = np.linalg.norm(pos[..., d, :] - pos[..., p, :], axis=-1)
+    return {
+        "frame": cols["frame"],
+        "track_id": cols["track_id"],
+        "present": np.asarray(cols["present"]),
+        "angle": angle.astype(np.float32),
+        "angle_vel": time_derivative(angle, t).astype(np.float32),
+        "joint_speed": np.linalg.norm(time_derivative(pos, t), axis=-1).astype(np.float32),
+        "extension": ext.astype(np.float32),
+        "extension_speed": time_derivative(ext, t).astype(np.float32),
+        "scale": body_scale(pos, torso).astype(np.float32),
+        "angle_names": np.array([a[0] for a in angles]),
+        "joint_names": np.array(joints),
+        "extension_names": np.array([e[0] for e in extensions]),
+        "units": np.array(units),
+    }
+
+# ----------------------------
+# Outputs: long table, classifier features
+# ----------------------------
+def kinematics_table(k):
+    """One row per (frame, present track); one column per angle / joint / limb quantity."""
+    f_idx, k_idx = np.nonzero(k["present"])
+    table = {"frame": k["frame"][f_idx], "track_id": k["track_id"][k_idx]}
+    for i, n in enumerate(k["angle_names"]):
+        table[f"angle_{n}"] = k["angle"][f_idx, k_idx, i]
+    for i, n in enumerate(k["angle_names"]):
+        table[f"angvel_{n}"] = k["angle_vel"][f_idx, k_idx, i]
+    for i, n in enumerate(k["joint_names"]):
+        table[f"speed_{n}"] = k["joint_speed"][f_idx, k_idx, i]
+    for i, n in enumerate(k["extension_names"]):
+        table[f"ext_{n}"] = k["extension"][f_idx, k_idx, i]
+        table[f"extspeed_{n}"] = k["extension_speed"][f_idx, k_idx, i]
+    return table
+
+def feature_names_for(num_joints):
+    """Column names of feature_matrix for a joint layout."""
+    joints, angles, extensions, _ = LAYOUTS[num_joints]
+    return ([f"angle_{a[0]}" for a in angles] + [f"angvel_{a[0]}" for a in angles]
+            + [f"speed_{n}" for n in joints] + [f"ext_{e[0]}" for e in extensions]
+            + [f"extspeed_{e[0]}" for e in extensions])
+
+def feature_names(k):
+    return feature_names_for(len(k["joint_names"]))
+
+def feature_matrix(k):
+    """
+    (F, K, D) float32 in feature_names(k) order, scaled to O(1) — distances and speeds in
+    torso lengths so they don't depend on camera distance — with missing values as 0.
+    Rows for (frame, track) go straight into a New_NN classifier / packed dataset.
+    """
+    scale = np.where(k["scale"] > 0, k["scale"], np.nan)[None, :, None]
+    X = np.concatenate([
+        k["angle"] / ANGLE_SCALE,
+        k["angle_vel"] / ANGVEL_SCALE,
+        k["joint_speed"] / scale / SPEED_SCALE,
+        k["extension"] / scale,
+        k["extension_speed"] / scale / SPEED_SCALE,
+    ], axis=-1)
+    return np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0).astype(np.float32)
+
+def export_kinematics(path, out_path, fps=DEFAULT_FPS, calibration_path=None, use_3d=None):
+    """Load a session, compute everything and write the table (.csv / .parquet / .npz). Returns (out_path, n_rows)."""
+    k = compute_kinematics(load_session(path), fps, load_calibration(calibration_path), use_3d)
+    table = kinematics_table(k)
+    write_table(table, out_path)
+    return out_path, len(table["frame"])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Joint angles and kinematics for every frame and track of a session")
+    ap.add_argument("session", help="AlphaPose .json / .jsonl, .npz columns or .qca archive")
+    ap.add_argument("out", help="feature table: .csv, .parquet or .npz")
+    ap.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    ap.add_argument("--calibration", help="calibration.json: 2D distances and speeds in meters")
+    dim = ap.add_mutually_exclusive_group()
+    dim.add_argument("--3d", dest="use_3d", action="store_const", const=True, help="use pred_xyz_jts / xyz")
+    dim.add_argument("--2d", dest="use_3d", action="store_const", const=False, help="use the 2D keypoints")
+    args = ap.parse_args()
+    out, n = export_kinematics(args.session, args.out, args.fps, args.calibration, args.use_3d)
+    print(f"Wrote {n} rows to {out}")
@@ -0,0 +1,301 @@
+# live.py — live overlay: follow a pose stream as it is written, repair IDs online, draw, show/stream
+#   python live.py --tail results.jsonl                 # follow a frame-per-line file
+#   python live.py --port 5005                          # or accept frames on a local socket
+#   python live.py --tail /tmp/live.jsonl --replay session.json --fps 30   # demo: replay a session into it
+import os
+import json
+import time
+import socket
+import argparse
+import threading
+from collections import deque
+import numpy as np
+import cv2
+
+from repair2 import OnlineRepairer
+from skeleton import draw_axes, draw_people, put_text_with_outline
+from calibration import load_calibration
+from adapters import entry_keypoints
+from videoCreator import open_encoder, DEFAULT_ENCODER
+from instrument import REPORT, stage, count, write_report
+
+LATENCY_BUDGET = 0.15    # seconds; frames older than this when we get to them are repaired but not drawn
+LIVE_QUEUE = 8           # frames buffered between reader and renderer; the oldest are dropped beyond this
+POLL = 0.005             # seconds between checks of a tailed file that has no new data
+
+# ----------------------------
+# Sources (each yields one frame = list of entries, until stop is set)
+# ----------------------------
+def tail_jsonl(path, stop, poll=POLL):
+    """Follow a frame-per-line file (repair2 .jsonl layout) as it grows; waits for it to appear."""
+    while not os.path.exists(path):
+        if stop.wait(poll):
+            return
+    with open(path, "r") as f:
+        partial = ""
+        while not stop.is_set():
+            line = f.readline()
+            if not line:
+                stop.wait(poll)
+                continue
+            partial += line
+            if not partial.endswith("\n"):
+                continue  # writer is mid-line
+            if partial.strip():
+                yield json.loads(partial)
+            partial = ""
+
+def tail_json_array(path, stop, poll=POLL):
+    """
+    Follow an AlphaPose results array while it is being written. A frame is complete
+    when the first entry of a different image_id arrives (or the array is closed).
+    """
+    decoder = json.JSONDecoder()
+    while not os.path.exists(path):
+        if stop.wait(poll):
+            return
+    with open(path, "r") as f:
+        buf, pos, frame = "", 0, []
+        while not stop.is_set():
+            while pos < len(buf) and buf[pos] in " \t\r\n,[":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                break
+            try:
+                entry, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                chunk = f.read()
+                if not chunk:
+                    stop.wait(poll)
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if frame and entry.get("image_id") != frame[0].get("image_id"):
+                yield frame
+                frame = []
+            frame.append(entry)
+        if frame:
+            yield frame
+
+def socket_frames(port, stop, host="127.0.0.1"):
+    """Local socket stand-in for a network stream: one producer, newline-delimited frame arrays."""
+    srv = socket.create_server((host, port))
+    srv.settimeout(0.2)
+    try:
+        while not stop.is_set():
+            try:
+                conn, _ = srv.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(0.2)
+            with conn:
+                buf = b""
+                while not stop.is_set():
+                    try:
+                        data = conn.recv(1 << 16)
+                    except socket.timeout:
+                        continue
+                    if not data:
+                        break  # producer went away; wait for the next one
+                    buf += data
+                    *lines, buf = buf.split(b"\n")
+                    for line in lines:
+                        if line.strip():
+                            yield json.loads(line)
+    finally:
+        srv.close()
+
+# ----------------------------
+# Bounded hand-off between the reader thread and the render loop
+# ----------------------------
+class LatestFrames:
+    """Keeps only the newest `size` frames; a put into a full buffer drops the oldest (counted)."""
+    def __init__(self, size=LIVE_QUEUE):
+        self.items = deque(maxlen=size)
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+    def get(self, timeout=0.1):
+        """(item, newer_waiting) or (None, False) on timeout / after close."""
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            if not self.items:
+                return None, False
+            return self.items.popleft(), bool(self.items)
+
+# ----------------------------
+# Live loop
+# ----------------------------
+def run_live(frames, width=1280, height=720, highlight=(2, 1), plot_distance=True, calibration_path=None,
+             display=True, out_path=None, encoder=DEFAULT_ENCODER, fps=30.0, budget=LATENCY_BUDGET,
+             max_frames=None, stop=None):
+    """
+    frames: a source generator (tail_jsonl / tail_json_array / socket_frames). Every frame taken
+    from the queue is repaired (tracking state stays continuous); frames that are already older
+    than `budget` seconds — or have a newer frame waiting behind them — are not drawn. When the
+    loop falls LIVE_QUEUE frames behind, the oldest are dropped before repair (dropped_full).
+    Latency is measured from arrival (and from the producer's "ts" when entries carry one) to display.
+    """
+    stop = stop or threading.Event()
+    H = load_calibration(calibration_path) if calibration_path else None
+    buf = LatestFrames()
+
+    def reader():
+        try:
+            for frame in frames:
+                buf.put((time.perf_counter(), frame))
+                if stop.is_set():
+                    break
+        finally:
+            buf.close()
+
+    threading.Thread(target=reader, daemon=True).start()
+    writer = open_encoder(encoder, out_path, fps, (width, height)) if out_path else None
+    repairer = None
+    latencies, e2e = [], []
+    shown = stale = 0
+    base = np.full((height, width, 3), 255, dtype=np.uint8)
+    draw_axes(base, step=100)
+    t_last = time.perf_counter()
+
+    try:
+        while not stop.is_set():
+            item, newer = buf.get()
+            if item is None:
+                if buf.closed and not buf.items:
+                    break
+                continue
+            arrived, entries = item
+            with stage("live.repair"):
+                if repairer is None:
+                    if not entries:
+                        continue
+                    repairer = OnlineRepairer(entries)
+                entries = repairer.step(entries)
+
+            if newer or time.perf_counter() - arrived > budget:
+                stale += 1
+                continue  # behind: skip drawing, catch up on the next frame
+
+            with stage("live.draw"):
+                people = [(e.get("idx"), entry_keypoints(e)) for e in entries]
+                canvas = draw_people(base.copy(), [p for p in people if p[1] is not None], *highlight,
+                                     plot_distance=plot_distance, H=H, missing_label=False)
+                now = time.perf_counter()
+                lat = now - arrived
+                live_fps = 1.0 / max(now - t_last, 1e-6)
+                t_last = now
+                put_text_with_outline(canvas, f"{1000 * lat:.0f} ms  {live_fps:.0f} fps  "
+                                              f"dropped {buf.dropped + stale}", (20, 30), scale=0.7)
+
+            with stage("live.show"):
+                if writer is not None:
+                    writer.write(canvas)
+                if display:
+                    cv2.imshow("live", canvas)
+                    if cv2.waitKey(1) & 0xFF in (ord("q"), 27):
+                        break
+            latencies.append(time.perf_counter() - arrived)
+            ts = [e["ts"] for e in entries if "ts" in e]
+            if ts:
+                e2e.append(time.time() - min(ts))
+            shown += 1
+            count("frames")
+            if max_frames and shown >= max_frames:
+                break
+    finally:
+        stop.set()
+        if writer is not None:
+            writer.release()
+        if display:
+            cv2.destroyAllWindows()
+
+    stats = {"shown": shown, "stale_skipped": stale, "dropped_full": buf.dropped}
+    for name, vals in (("latency", latencies), ("end_to_end", e2e)):
+        if vals:
+            v = 1000 * np.array(vals)
+            stats[name + "_ms"] = {"p50": round(float(np.percentile(v, 50)), 2),
+                                   "p95": round(float(np.percentile(v, 95)), 2), "max": round(float(v.max()), 2)}
+    count("live_dropped", stale + buf.dropped)
+    return stats
+
+# ----------------------------
+# Stand-in producer: replay a finished session in real time
+# ----------------------------
+def replay(src, fps=30.0, path=None, port=None, stop=None):
+    """Write src's frames at `fps` as .jsonl lines to `path`, or to a local socket on `port`; stamps "ts"."""
+    from adapters import iter_frames
+    stop = stop or threading.Event()
+    sink = open(path, "w") if path else socket.create_connection(("127.0.0.1", port))
+    try:
+        t0 = time.perf_counter()
+        for i, (_, entries) in enumerate(iter_frames(src)):
+            if stop.is_set():
+                break
+            delay = t0 + i / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.time()
+            line = json.dumps([dict(e, ts=now) for e in entries], separators=(",", ":")) + "\n"
+            if path:
+                sink.write(line)
+                sink.flush()
+            else:
+                sink.sendall(line.encode())
+    finally:
+        sink.close()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Live skeleton overlay from a pose stream")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--tail", help="follow a .jsonl (frame per line) or AlphaPose .json file as it is written")
+    src.add_argument("--port", type=int, help="accept newline-delimited frames on 127.0.0.1:PORT")
+    ap.add_argument("--replay", help="demo: replay this finished session into --tail/--port")
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--size", nargs=2, type=int, default=(1280, 720), metavar=("W", "H"))
+    ap.add_argument("--ids", nargs=2, type=int, default=(2, 1), help="the two ids to highlight")
+    ap.add_argument("--no-distance", action="store_true")
+    ap.add_argument("--calibration", help="calibration.json for meters")
+    ap.add_argument("--budget", type=float, default=LATENCY_BUDGET, help="seconds before a frame is stale")
+    ap.add_argument("--out", help="also stream the overlay into this video file")
+    ap.add_argument("--encoder", default=DEFAULT_ENCODER)
+    ap.add_argument("--no-display", action="store_true")
+    ap.add_argument("--frames", type=int, default=None, help="stop after this many shown frames")
+    args = ap.parse_args()
+
+    stop = threading.Event()
+    if args.tail:
+        source = tail_jsonl(args.tail, stop) if args.tail.endswith(".jsonl") else tail_json_array(args.tail, stop)
+    else:
+        source = socket_frames(args.port, stop)
+    if args.replay:
+        if args.tail and os.path.exists(args.tail):
+            os.remove(args.tail)
+        if args.port:
+            time.sleep(0.2)  # let the server socket come up first
+
+        def producer():
+            replay(args.replay, args.fps, args.tail, args.port, stop)
+            time.sleep(max(args.budget, 0.5))  # let the last frames drain, then end the demo
+            stop.set()
+        threading.Thread(target=producer, daemon=True).start()
+
+    REPORT.reset("live")
+    stats = run_live(source, *args.size, highlight=tuple(args.ids), plot_distance=not args.no_distance,
+                     calibration_path=args.calibration, display=not args.no_display, out_path=args.out,
+                     encoder=args.encoder, fps=args.fps, budget=args.budget, max_frames=args.frames, stop=stop)
+    print(json.dumps(stats, indent=2))
+    print(f"Run report: {write_report()}")
@@ -8,6 +8,10 @@ from reader import run_pose_plotter
 from singleReader import run_single_pose_plotter
 from frameGUIandSelect import frame_selector
 from reader_3d import run_pose_plotter_3d
+from videoCreator import ENCODERS, DEFAULT_ENCODER
+from instrument import REPORT, REPORT_JSON
+
+PROFILE_MODES = ("off", "sample", "cprofile")
 
 def run_repair():
     try:
@@ -28,21 +32,36 @@ def launch():
     mode = mode_var.get()
     run_frames = frames_var.get()
     plot_dist = plot_distance_var.get()  # <— NEW
+    backdrop = backdrop_var.get()
+    encoder = encoder_var.get()
+    profile = profile_var.get()
 
     root.destroy()
 
+    REPORT.reset(mode)
+    try:
+        if profile == "off":
+            run_pipeline(use_repair, mode, run_frames, plot_dist, backdrop, encoder)
+        else:
+            prof_path = os.path.splitext(REPORT_JSON)[0] + ".prof" if profile == "cprofile" else None
+            with REPORT.profiled(profile, out_path=prof_path):
+                run_pipeline(use_repair, mode, run_frames, plot_dist, backdrop, encoder)
+    finally:
+        print(f"Run report: {REPORT.write(REPORT_JSON)}")
+
+def run_pipeline(use_repair, mode, run_frames, plot_dist, backdrop, encoder):
     if use_repair:
         if not run_repair():
             return
 
     try:
         if mode == "single":
-            json_path, video_path, name = run_single_pose_plotter()
+            json_path, video_path, name = run_single_pose_plotter(backdrop=backdrop, encoder=encoder)
         elif mode == "reader":
             # pass the bool into reader
-            json_path, video_path, name = run_pose_plotter(plot_distance=plot_dist)
+            json_path, video_path, name = run_pose_plotter(plot_distance=plot_dist, backdrop=backdrop, encoder=encoder)
         elif mode =="3d":
-            json_path, video_path, name = run_pose_plotter_3d()
+            json_path, video_path, name = run_pose_plotter_3d(backdrop=backdrop, encoder=encoder)
         else:
             messagebox.showerror("No selection", "Choose Single or Two‑person view.")
             return
@@ -83,11 +102,24 @@ if __name__ == "__main__":
     plot_distance_var = tk.BooleanVar(value=False)
     ttk.Checkbutton(container, text="Plot distance (Two Person only)", variable=plot_distance_var).grid(row=6, column=0, sticky="w", pady=(6, 0))
 
+    backdrop_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(container, text="Draw skeletons on the video frames (instead of a white canvas)", variable=backdrop_var).grid(row=7, column=0, sticky="w", pady=(6, 0))
+
     frames_var = tk.BooleanVar(value=False)
-    ttk.Checkbutton(container, text="Run Frame Selector after plotting (Outputs a range of frames into selected_frames folder)", variable=frames_var).grid(row=7, column=0, sticky="w", pady=(8, 0))
+    ttk.Checkbutton(container, text="Run Frame Selector after plotting (Outputs a range of frames into selected_frames folder)", variable=frames_var).grid(row=8, column=0, sticky="w", pady=(8, 0))
+
+    enc_row = ttk.Frame(container)
+    enc_row.grid(row=9, column=0, sticky="w", pady=(8, 0))
+    ttk.Label(enc_row, text="Video encoder:").grid(row=0, column=0, sticky="w")
+    encoder_var = tk.StringVar(value=DEFAULT_ENCODER)
+    ttk.Combobox(enc_row, textvariable=encoder_var, values=ENCODERS, state="readonly", width=10).grid(row=0, column=1, padx=(6, 0))
+
+    ttk.Label(enc_row, text="Profile:").grid(row=0, column=2, sticky="w", padx=(16, 0))
+    profile_var = tk.StringVar(value="off")
+    ttk.Combobox(enc_row, textvariable=profile_var, values=PROFILE_MODES, state="readonly", width=9).grid(row=0, column=3, padx=(6, 0))
 
     btns = ttk.Frame(container)
-    btns.grid(row=8, column=0, sticky="e", pady=(12, 0))
+    btns.grid(row=10, column=0, sticky="e", pady=(12, 0))
     ttk.Button(btns, text="Launch", command=launch).grid(row=0, column=0, padx=(0, 8))
     ttk.Button(btns, text="Cancel", command=root.destroy).grid(row=0, column=1)
 
@@ -0,0 +1,187 @@
+# metrics.py — whole-session distance / speed / acceleration tables (no rendering)
+import os
+import csv
+import numpy as np
+import cv2
+import tkinter as tk
+from tkinter import filedialog, messagebox
+
+from adapters import load_session
+from calibration import load_calibration, calibrate_keypoints
+from skeleton import CENTER_JOINTS
+
+DEFAULT_FPS = 30.0
+
+# ----------------------------
+# Vectorized metrics
+# ----------------------------
+def track_centers(keypoints, present=None):
+    """
+    (F, K, J, 3) -> (F, K, 2) centers, NaN where unknown.
+    Mid-hip when both hips are visible, else the head joint (CENTER_JOINTS picks them per layout).
+    """
+    kp = np.asarray(keypoints, dtype=np.float64)
+    centers = np.full(kp.shape[:2] + (2,), np.nan)
+    l_hip, r_hip, head = CENTER_JOINTS.get(kp.shape[2], CENTER_JOINTS[17])
+    if kp.shape[2] > head:
+        head_ok = kp[..., head, 2] > 0
+        centers[head_ok] = kp[..., head, :2][head_ok]
+    if kp.shape[2] > max(l_hip, r_hip):
+        hips = kp[..., [l_hip, r_hip], :]
+        hips_ok = hips[..., 2].min(axis=-1) > 0
+        centers[hips_ok] = hips[..., :2].mean(axis=-2)[hips_ok]
+    if present is not None:
+        centers[~np.asarray(present)] = np.nan
+    return centers
+
+def pairwise_distances(centers):
+    """(F, K, 2) -> (F, K, K) center distances via broadcasting (NaN if either is missing)."""
+    diff = centers[:, :, None, :] - centers[:, None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+def speed_and_accel(centers, frames, fps=DEFAULT_FPS):
+    """
+    Per-track speed (units/s) and acceleration (units/s^2) from (F, K, 2) centers.
+    Frame gaps are honoured through the frame numbers; a value is NaN when the
+    track is missing on either side of the step.
+    """
+    F, K = centers.shape[:2]
+    speed = np.full((F, K), np.nan)
+    accel = np.full((F, K), np.nan)
+    if F < 2:
+        return speed, accel
+    dt = np.diff(np.asarray(frames, dtype=np.float64)) / float(fps)
+    dt[dt <= 0] = np.nan
+    step = np.sqrt((np.diff(centers, axis=0) ** 2).sum(axis=-1))
+    speed[1:] = step / dt[:, None]
+    accel[2:] = np.diff(speed[1:], axis=0) / dt[1:, None]
+    return speed, accel
+
+def compute_metrics(cols, fps=DEFAULT_FPS, H=None):
+    """All metrics for a session; pass a pixel->meter matrix H to get meters instead of pixels."""
+    kp = cols["keypoints"] if H is None else calibrate_keypoints(cols["keypoints"], H)
+    centers = track_centers(kp, cols["present"])
+    dist = pairwise_distances(centers)
+    speed, accel = speed_and_accel(centers, cols["frame"], fps)
+
+    # engagement: closest other fighter on each frame
+    others = dist.copy()
+    K = others.shape[1]
+    others[:, np.arange(K), np.arange(K)] = np.nan
+    valid = ~np.all(np.isnan(others), axis=-1)
+    nearest_k = np.zeros(valid.shape, dtype=np.int64)
+    nearest_k[valid] = np.nanargmin(others[valid], axis=-1)
+    nearest_dist = np.where(valid, np.take_along_axis(others, nearest_k[..., None], axis=-1)[..., 0], np.nan)
+    nearest_id = np.where(valid, cols["track_id"][nearest_k], -1)
+
+    return {
+        "frame": cols["frame"],
+        "track_id": cols["track_id"],
+        "center": centers.astype(np.float32),
+        "distance": dist.astype(np.float32),
+        "speed": speed.astype(np.float32),
+        "accel": accel.astype(np.float32),
+        "nearest_id": nearest_id,
+        "nearest_dist": nearest_dist.astype(np.float32),
+        "units": np.array("px" if H is None else "m"),
+    }
+
+# ----------------------------
+# Table export
+# ----------------------------
+def metrics_table(m):
+    """Long table, one row per (frame, present track), distance columns per other track."""
+    f_idx, k_idx = np.nonzero(~np.isnan(m["center"][..., 0]))
+    table = {
+        "frame": m["frame"][f_idx],
+        "track_id": m["track_id"][k_idx],
+        "cx": m["center"][f_idx, k_idx, 0],
+        "cy": m["center"][f_idx, k_idx, 1],
+        "speed": m["speed"][f_idx, k_idx],
+        "accel": m["accel"][f_idx, k_idx],
+        "nearest_id": m["nearest_id"][f_idx, k_idx],
+        "nearest_dist": m["nearest_dist"][f_idx, k_idx],
+    }
+    for j, tid in enumerate(m["track_id"]):
+        table[f"dist_{tid}"] = m["distance"][f_idx, k_idx, j]
+    return table
+
+def write_table(table, out_path):
+    """Write a column dict as .csv, .parquet or .npz (chosen by extension)."""
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == '.npz':
+        np.savez_compressed(out_path, **table)
+    elif ext == '.parquet':
+        try:
+            import pandas as pd
+        except ImportError:
+            raise RuntimeError("Parquet export needs pandas + pyarrow (pip install pandas pyarrow).")
+        pd.DataFrame(table).to_parquet(out_path, index=False)
+    elif ext == '.csv':
+        names = list(table.keys())
+        with open(out_path, 'w', newline='') as f:
+            w = csv.writer(f)
+            w.writerow(names)
+            rows = zip(*(np.round(table[n].astype(np.float64), 3).tolist() if table[n].dtype.kind == 'f' else table[n].tolist()
+                         for n in names))
+            w.writerows(("" if v != v else v for v in row) for row in rows)  # NaN -> empty cell
+    else:
+        raise ValueError(f"Unsupported metrics format '{ext}' (use .csv, .parquet or .npz)")
+    return out_path
+
+def export_metrics(json_path, out_path, fps=DEFAULT_FPS, calibration_path=None):
+    """Load a session, compute every metric and write the table. Returns (out_path, n_rows)."""
+    cols = load_session(json_path)
+    m = compute_metrics(cols, fps, load_calibration(calibration_path))
+    if out_path.lower().endswith('.npz'):
+        # keep the dense arrays too, so (F, K, K) distances can be sliced directly
+        table = dict(metrics_table(m), **{f"dense_{k}": v for k, v in m.items()})
+        n = int(np.count_nonzero(~np.isnan(m["center"][..., 0])))
+    else:
+        table = metrics_table(m)
+        n = len(table["frame"])
+    write_table(table, out_path)
+    return out_path, n
+
+def detect_fps(video_path):
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps if fps and fps > 0 else DEFAULT_FPS
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.withdraw()
+
+    try:
+        path = filedialog.askopenfilename(
+            title="Select AlphaPose JSON",
+            filetypes=[("JSON Files", "*.json"), ("Columns", "*.npz")]
+        )
+        if not path:
+            raise RuntimeError("Export cancelled: no file selected.")
+        video = filedialog.askopenfilename(
+            title="Select source video (for FPS) — cancel to use 30 FPS",
+            filetypes=[("Video Files", "*.mp4 *.avi *.mov")]
+        )
+        fps = detect_fps(video) if video else DEFAULT_FPS
+        calib = filedialog.askopenfilename(
+            title="Select calibration.json (meters) — cancel to keep pixels",
+            filetypes=[("JSON Files", "*.json")]
+        )
+        out = filedialog.asksaveasfilename(
+            title="Save metrics table",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet"), ("NumPy", "*.npz")]
+        )
+        if not out:
+            raise RuntimeError("Export cancelled: no output chosen.")
+
+        out_path, n = export_metrics(path, out, fps, calib or None)
+        messagebox.showinfo("Metrics exported", f"Wrote {n} rows to:\n{out_path}")
+        print(f"Wrote {n} rows to {out_path}")
+    except Exception as e:
+        messagebox.showerror("Metrics export failed", str(e))
+        raise
+    finally:
+        root.destroy()
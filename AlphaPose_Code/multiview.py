@@ -0,0 +1,251 @@
+# multiview.py — several cameras of one bout on one timeline: aligned columns + a single-pass grid render
+#   python multiview.py cameras.json grid.mp4 [--fps 30 --backdrop --distance --encoder ffmpeg]
+#   python multiview.py cameras.json session.mv.npz          # just align and save the multi-view store
+#
+# cameras.json: a list of cameras (or {"fps": 30, "cameras": [...]})
+#   name         label drawn on the camera's tile ("left", "corner", ...)
+#   json         the camera's pose results (anything load_session reads)
+#   video        the camera's video (frame size, fps, backdrop)
+#   fps          optional, default: read from the video
+#   offset       seconds on the shared timeline at which the camera's frame 0 was taken (default 0)
+#   calibration  optional calibration.json for this view (distances in meters)
+#   projection   optional 3x4 camera matrix JSON (see calibration.load_projection) for triangulate.py
+#   track_map    optional {"camera idx": shared idx} when this camera's ids differ from the others'
+import os
+import json
+import math
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+
+from adapters import load_session
+from calibration import load_calibration
+from columnar import save_columns, load_columns
+from framesource import open_backdrop
+from skeleton import draw_axes, draw_people, put_text_with_outline
+from videoCreator import open_encoder, imap_bounded, DEFAULT_ENCODER
+from instrument import stage, count, progress
+
+TILE_WIDTH = 640          # each camera is drawn at full size, then fitted into a tile this wide
+NO_SIGNAL = 90            # gray level of a tile whose camera isn't recording at that moment
+
+# ----------------------------
+# Multi-view store
+# ----------------------------
+# Columns on a shared timeline of T ticks at the session fps, V views, K tracks (union of all views):
+#   time        (T,)              float64  seconds on the shared timeline
+#   view        (V,)              str      camera names
+#   view_fps    (V,)              float64
+#   view_offset (V,)              float64  seconds
+#   view_size   (V, 2)            int64    camera frame width, height
+#   view_frame  (T, V)            int64    the camera's frame number at that tick, -1 when it isn't recording
+#   track_id    (K,)              int64
+#   keypoints   (T, V, K, J, 3)   float32  in each camera's own pixels
+#   present     (T, V, K)         bool
+#   score       (T, V, K)         float32
+#   box         (T, V, K, 4)      float32
+def read_cameras(path):
+    """(cameras, fps or None) from a cameras.json; fps and frame size come from each video when not given."""
+    with open(path) as f:
+        spec = json.load(f)
+    cameras, fps = (spec["cameras"], spec.get("fps")) if isinstance(spec, dict) else (spec, None)
+    base = os.path.dirname(os.path.abspath(path))
+    out = []
+    for i, cam in enumerate(cameras):
+        cam = dict(cam)
+        cam.setdefault("name", f"cam{i}")
+        for key in ("json", "video", "calibration", "projection"):
+            if cam.get(key) and not os.path.isabs(cam[key]):
+                cam[key] = os.path.join(base, cam[key])  # paths relative to cameras.json
+        cap = cv2.VideoCapture(cam["video"]) if cam.get("video") else None
+        if cap is not None and cap.isOpened():
+            cam.setdefault("fps", cap.get(cv2.CAP_PROP_FPS))
+            cam.setdefault("size", (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))))
+        if cap is not None:
+            cap.release()
+        if not cam.get("fps"):
+            raise ValueError(f"Camera '{cam['name']}' needs an fps (no readable video).")
+        out.append(cam)
+    return out, fps
+
+def align_cameras(cameras, fps=None):
+    """
+    Load every camera's session and put them on one timeline. Tick i is at
+    t0 + i / fps; camera c contributes its frame round((t - offset_c) * fps_c), so
+    cameras with different frame rates or start times line up by wall-clock time.
+    """
+    fps = float(fps or max(float(c["fps"]) for c in cameras))
+    with stage("load"):
+        sessions = [load_session(c["json"]) for c in cameras]
+
+    joints = {s["keypoints"].shape[2] for s in sessions if s["keypoints"].size}
+    if len(joints) > 1:
+        raise ValueError(f"Cameras use different joint layouts ({sorted(joints)} joints).")
+    J = joints.pop() if joints else 17
+
+    # each camera's track ids on the shared id axis
+    view_ids = []
+    for cam, s in zip(cameras, sessions):
+        tmap = {int(k): int(v) for k, v in (cam.get("track_map") or {}).items()}
+        view_ids.append(np.array([tmap.get(int(t), int(t)) for t in s["track_id"]], dtype=np.int64))
+    track_id = np.unique(np.concatenate(view_ids)) if view_ids else np.zeros(0, np.int64)
+
+    offsets = np.array([float(c.get("offset", 0.0)) for c in cameras])
+    vfps = np.array([float(c["fps"]) for c in cameras])
+    starts = [o + s["frame"][0] / f for o, f, s in zip(offsets, vfps, sessions) if len(s["frame"])]
+    ends = [o + s["frame"][-1] / f for o, f, s in zip(offsets, vfps, sessions) if len(s["frame"])]
+    if not starts:
+        raise ValueError("No camera has any frames.")
+    t0 = min(starts)
+    T = int(math.floor((max(ends) - t0) * fps + 1e-6)) + 1
+    time = t0 + np.arange(T) / fps
+
+    V, K = len(cameras), len(track_id)
+    mv = {
+        "time": time,
+        "view": np.array([c["name"] for c in cameras], dtype=str),
+        "view_fps": vfps,
+        "view_offset": offsets,
+        "view_size": np.array([c.get("size", (0, 0)) for c in cameras], dtype=np.int64).reshape(V, 2),
+        "view_frame": np.full((T, V), -1, dtype=np.int64),
+        "track_id": track_id,
+        "keypoints": np.zeros((T, V, K, J, 3), dtype=np.float32),
+        "present": np.zeros((T, V, K), dtype=bool),
+        "score": np.zeros((T, V, K), dtype=np.float32),
+        "box": np.zeros((T, V, K, 4), dtype=np.float32),
+    }
+    for v, (s, ids) in enumerate(zip(sessions, view_ids)):
+        cam_frame = np.rint((time - offsets[v]) * vfps[v]).astype(np.int64)
+        recording = (cam_frame >= 0) & (cam_frame <= (s["frame"][-1] if len(s["frame"]) else -1))
+        mv["view_frame"][:, v] = np.where(recording, cam_frame, -1)
+
+        # tick -> row of this camera's columns (frames with no detections have no row)
+        row = np.searchsorted(s["frame"], cam_frame).clip(0, max(len(s["frame"]) - 1, 0))
+        hit = recording & (len(s["frame"]) > 0)
+        hit[hit] = s["frame"][row[hit]] == cam_frame[hit]
+        ticks, rows = np.nonzero(hit)[0], row[hit]
+        kk = np.searchsorted(track_id, ids)
+        for name in ("keypoints", "present", "score", "box"):
+            mv[name][ticks[:, None], v, kk[None, :]] = s[name][rows]
+    return mv
+
+def save_multiview(mv, path):
+    save_columns(mv, path)
+    return path
+
+def load_multiview(path):
+    return load_columns(path)
+
+# ----------------------------
+# Grid render (one pass, one encoder)
+# ----------------------------
+def grid_shape(views, columns=None):
+    columns = columns or (views if views <= 3 else math.ceil(math.sqrt(views)))
+    return math.ceil(views / columns), columns
+
+def _fit(img, w, h):
+    """Letterbox img into a w x h white tile."""
+    ih, iw = img.shape[:2]
+    s = min(w / iw, h / ih)
+    nw, nh = max(1, int(round(iw * s))), max(1, int(round(ih * s)))
+    tile = np.full((h, w, 3), 255, dtype=np.uint8)
+    x, y = (w - nw) // 2, (h - nh) // 2
+    tile[y:y + nh, x:x + nw] = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_AREA)
+    return tile
+
+def render_grid(mv, cameras, out_path, encoder=DEFAULT_ENCODER, backdrop=False, plot_distance=False,
+                tile_width=TILE_WIDTH, columns=None, time_range=None, workers=None, **encoder_opts):
+    """
+    Draw every camera for every tick and write one side-by-side video. Backdrop frames are
+    decoded per camera on their own threads, the tiles of a tick are drawn by a shared worker
+    pool (bounded, in order), and a single encoder writes the grid.
+    """
+    V = len(mv["view"])
+    rows_n, cols_n = grid_shape(V, columns)
+    sizes = [tuple(int(x) for x in (c.get("size") or mv["view_size"][v])) for v, c in enumerate(cameras)]
+    sizes = [s if s[0] > 0 else (1280, 720) for s in sizes]
+    tile_w = int(tile_width)
+    tile_h = int(round(tile_w * sizes[0][1] / sizes[0][0])) // 2 * 2
+    Hs = [load_calibration(c.get("calibration")) for c in cameras]
+
+    ticks = np.arange(len(mv["time"]))
+    if time_range is not None:
+        ticks = ticks[(mv["time"] >= time_range[0]) & (mv["time"] <= time_range[1])]
+    videos = [open_backdrop(c["video"], [f for f in mv["view_frame"][ticks, v] if f >= 0], enabled=backdrop)
+              for v, c in enumerate(cameras)]
+
+    def frames_in_order():
+        # backdrop readers must be asked in increasing frame order: fetch on this thread. A slower
+        # camera shows the same frame on several ticks, so its last frame is reused.
+        last = [(-1, None)] * V
+        for t in ticks:
+            imgs = []
+            for v in range(V):
+                f = int(mv["view_frame"][t, v])
+                if videos[v] is not None and f >= 0 and f != last[v][0]:
+                    last[v] = (f, videos[v].get(f))
+                imgs.append(last[v][1] if f >= 0 and f == last[v][0] else None)
+            yield t, imgs
+
+    def draw_tick(item):
+        t, imgs = item
+        grid = np.full((rows_n * tile_h, cols_n * tile_w, 3), 255, dtype=np.uint8)
+        for v in range(V):
+            w, h = sizes[v]
+            f = mv["view_frame"][t, v]
+            if f < 0:
+                frame = np.full((h, w, 3), NO_SIGNAL, dtype=np.uint8)
+            else:
+                frame = imgs[v].copy() if imgs[v] is not None else None  # may be shown on several ticks
+                if frame is None:
+                    frame = np.full((h, w, 3), 255, dtype=np.uint8)
+                    draw_axes(frame, step=100)
+                people = [(int(mv["track_id"][k]), mv["keypoints"][t, v, k])
+                          for k in np.nonzero(mv["present"][t, v])[0]]
+                draw_people(frame, people, plot_distance=plot_distance, H=Hs[v])
+            tile = _fit(frame, tile_w, tile_h)
+            label = f"{mv['view'][v]}  #{f}" if f >= 0 else f"{mv['view'][v]}  (not recording)"
+            put_text_with_outline(tile, label, (10, tile_h - 12), scale=0.5)
+            r, c = divmod(v, cols_n)
+            grid[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w] = tile
+        put_text_with_outline(grid, f"{mv['time'][t]:.2f}s", (10, 20), scale=0.6)
+        return grid
+
+    fps = float(len(mv["time"]) - 1) / (mv["time"][-1] - mv["time"][0]) if len(mv["time"]) > 1 else 30.0
+    writer = open_encoder(encoder, out_path, fps, (cols_n * tile_w, rows_n * tile_h), **encoder_opts)
+    try:
+        with stage("render"), ThreadPoolExecutor(max_workers=workers) as executor:
+            for grid in progress(imap_bounded(executor, draw_tick, frames_in_order()), total=len(ticks),
+                                 label="Grid"):
+                writer.write(grid)
+                count("frames")
+    finally:
+        writer.release()
+        for video in videos:
+            if video is not None:
+                video.close()
+    return out_path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Align several cameras of one bout and render them as one grid video")
+    ap.add_argument("cameras", help="cameras.json")
+    ap.add_argument("out", help="grid video (.mp4/.avi), or a .npz to save the aligned multi-view store")
+    ap.add_argument("--fps", type=float, default=None, help="timeline fps (default: cameras.json, else fastest camera)")
+    ap.add_argument("--backdrop", action="store_true", help="draw on the video frames")
+    ap.add_argument("--distance", action="store_true", help="distance between the two highlighted ids")
+    ap.add_argument("--tile-width", type=int, default=TILE_WIDTH)
+    ap.add_argument("--columns", type=int, default=None)
+    ap.add_argument("--range", nargs=2, type=float, default=None, metavar=("START_S", "END_S"))
+    ap.add_argument("--encoder", default=DEFAULT_ENCODER)
+    args = ap.parse_args()
+
+    cams, spec_fps = read_cameras(args.cameras)
+    mv = align_cameras(cams, args.fps or spec_fps)
+    print(f"{len(cams)} cameras, {len(mv['time'])} ticks, {len(mv['track_id'])} tracks")
+    if args.out.endswith(".npz"):
+        print(f"Saved {save_multiview(mv, args.out)}")
+    else:
+        render_grid(mv, cams, args.out, args.encoder, args.backdrop, args.distance, args.tile_width,
+                    args.columns, args.range)
+        print(f"\n✅ Grid video saved to {args.out}")
@@ -1,75 +1,39 @@
 import os
-import json
 import numpy as np
 import cv2
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from videoCreator import make_video
+from videoCreator import make_video, DEFAULT_ENCODER
 from folderclear import clear_all
-import time
+from skeleton import draw_axes, draw_people
+from calibration import load_calibration
+from framesource import open_backdrop
+from adapters import load_entries, entry_keypoints
+from instrument import stage, progress
 
 # --- Helpers ---
 
-def get_center(kp):
-    try:
-        hips = kp[[11, 12]]
-        if hips[:, 2].min() > 0:
-            return np.mean(hips[:, :2], axis=0)
-    except:
-        pass
-    return kp[0, :2] if kp[0, 2] > 0 else np.array([0, 0])
+ID_A = 2   # drawn red
+ID_B = 1   # drawn blue
 
 def frame_num(fname):
     return int(os.path.splitext(os.path.basename(fname))[0])
 
-def draw_skeleton(frame, keypoints, color):
-    EDGES = [
-        (0, 1), (0, 2), (1, 3), (2, 4),
-        (0, 5), (0, 6), (5, 7), (7, 9),
-        (6, 8), (8, 10), (5, 11), (6, 12),
-        (11, 13), (13, 15), (12, 14), (14, 16)
-    ]
-    for i, j in EDGES:
-        if keypoints[i, 2] > 0 and keypoints[j, 2] > 0:
-            pt1 = tuple(keypoints[i, :2].astype(int))
-            pt2 = tuple(keypoints[j, :2].astype(int))
-            cv2.line(frame, pt1, pt2, color, 2)
-    for i in range(len(keypoints)):
-        if keypoints[i, 2] > 0:
-            pt = tuple(keypoints[i, :2].astype(int))
-            cv2.circle(frame, pt, 3, color, -1)
-
-def draw_axes(frame, step=100, grid_color=(200, 200, 200)):
-    h, w = frame.shape[:2]
-    for x in range(0, w, step):
-        cv2.line(frame, (x, 0), (x, h), grid_color, 1)
-        _put_text_with_outline(frame, str(x), (x + 2, 15))
-    for y in range(0, h, step):
-        cv2.line(frame, (0, y), (w, y), grid_color, 1)
-        _put_text_with_outline(frame, str(y), (2, max(12, y - 2)))
-    cv2.line(frame, (0, 0), (w, 0), (0, 0, 0), 2)
-    cv2.line(frame, (0, 0), (0, h), (0, 0, 0), 2)
-    _put_text_with_outline(frame, "X", (w - 20, 20), scale=0.6)
-    _put_text_with_outline(frame, "Y", (10, h - 10), scale=0.6)
-
-def _put_text_with_outline(frame, text, org, scale=0.4):
-    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
-                scale, (255, 255, 255), 3, lineType=cv2.LINE_AA)
-    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
-                scale, (0, 0, 0), 1, lineType=cv2.LINE_AA)
-
 # --- Core ---
 
-def convert_json_to_opencv_images(json_path, video_path, output_dir, plot_distance=False):
+def convert_json_to_opencv_images(json_path, video_path, output_dir, plot_distance=False, calibration_path=None,
+                                  backdrop=False, frame_range=None):
+    """backdrop=True draws on the real video frames; frame_range=(start, end) limits to those frame numbers."""
     os.makedirs(output_dir, exist_ok=True)
+    H = load_calibration(calibration_path)  # pixel -> meter, None keeps pixels
 
     cap = cv2.VideoCapture(video_path)
     w_res = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     h_res = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
 
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    with stage("load"):
+        data = load_entries(json_path)  # AlphaPose JSON, OpenPose folder or .npz columns
 
     frames = {}
     for entry in data:
@@ -78,67 +42,40 @@ def convert_json_to_opencv_images(json_path, video_path, output_dir, plot_distan
             frames.setdefault(fid, []).append(entry)
 
     sorted_fids = sorted(frames.keys(), key=frame_num)
-
-    ID_A = 2
-    ID_B = 1
-    start_time = time.perf_counter()
-
-    for idx, fid in enumerate(sorted_fids):
-        id_to_pose = {}
-        frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
-
-        draw_axes(frame, step=100)
-
-        for person in frames[fid]:
-            idx_val = person.get("idx")
-            kp = np.array(person["keypoints"], dtype=float)
-            if kp.size == 51:
-                pose = kp.reshape(-1, 3)
-                # context in gray
-                draw_skeleton(frame, pose, (180, 180, 180))
-                if pose[0, 2] > 0:
-                    x, y = pose[0, :2].astype(int)
-                    _put_text_with_outline(frame, str(idx_val), (x, max(0, y - 10)), scale=0.6)
-                if idx_val in (ID_A, ID_B):
-                    id_to_pose[idx_val] = pose
-
-        # Highlight tracked IDs
-        pose_A = id_to_pose.get(ID_A)
-        pose_B = id_to_pose.get(ID_B)
-        if pose_A is not None:
-            draw_skeleton(frame, pose_A, (0, 0, 255))
-        if pose_B is not None:
-            draw_skeleton(frame, pose_B, (255, 0, 0))
-
-        # ✅ Conditionally plot distance
-        if plot_distance and (pose_A is not None) and (pose_B is not None):
-            c1 = get_center(pose_A)
-            c2 = get_center(pose_B)
-            dist = np.linalg.norm(c1 - c2)
-            x1, y1 = c1.astype(int)
-            x2, y2 = c2.astype(int)
-            cv2.line(frame, (x1, y1), (x2, y2), (0, 0, 0), 2, lineType=cv2.LINE_AA)
-            mx, my = ((x1 + x2) // 2, (y1 + y2) // 2)
-            _put_text_with_outline(frame, f"{dist:.1f}", (mx, my), scale=0.6)
-        elif (pose_A is None) or (pose_B is None):
-            _put_text_with_outline(frame, "ID Missing", (20, 40), scale=0.9)
-
-        out_path = os.path.join(output_dir, f'plot_{idx}.png')
-        cv2.imwrite(out_path, frame)
-
-        elapsed = time.perf_counter() - start_time
-        print(f"Frame {idx+1}/{len(sorted_fids)} • Elapsed: {elapsed:.2f}s")
-
+    if frame_range is not None:
+        sorted_fids = [f for f in sorted_fids if frame_range[0] <= frame_num(f) <= frame_range[1]]
+    video = open_backdrop(video_path, [frame_num(f) for f in sorted_fids], enabled=backdrop)
+    try:
+        for idx, fid in progress(enumerate(sorted_fids), total=len(sorted_fids), label="Render"):
+            with stage("draw"):
+                frame = video.get(frame_num(fid)) if video else None
+                if frame is None:
+                    frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
+                    draw_axes(frame, step=100)
+                people = []
+                for person in frames[fid]:
+                    pose = entry_keypoints(person)  # any joint count; draw_skeleton picks the edges
+                    if pose is not None:
+                        people.append((person.get("idx"), pose))
+                draw_people(frame, people, ID_A, ID_B, plot_distance=plot_distance, H=H)
+
+            out_path = os.path.join(output_dir, f'plot_{idx}.png')
+            with stage("imwrite"):
+                cv2.imwrite(out_path, frame)
+    finally:
+        if video:
+            video.close()
     return output_dir
 
-def run_pose_plotter(plot_distance=False):
-    """Launches the two-person reader flow. Set plot_distance to toggle drawing the distance."""
+def run_pose_plotter(plot_distance=False, backdrop=False, encoder=DEFAULT_ENCODER):
+    """Launches the two-person reader flow. Set plot_distance to toggle drawing the distance,
+    backdrop to draw on the video frames instead of a white canvas."""
     result = {"json": None, "video": None, "name": None}
 
     def browse_json():
         path = filedialog.askopenfilename(
             title="Select JSON File",
-            filetypes=[("JSON Files", "*.json")]
+            filetypes=[("JSON Files", "*.json *.jsonl")]
         )
         json_path_var.set(path)
 
@@ -149,10 +86,18 @@ def run_pose_plotter(plot_distance=False):
         )
         video_path_var.set(path)
 
+    def browse_calibration():
+        path = filedialog.askopenfilename(
+            title="Select Calibration File",
+            filetypes=[("JSON Files", "*.json")]
+        )
+        calib_path_var.set(path)
+
     def run_processing():
         json_path = json_path_var.get()
         video_path = video_path_var.get()
         video_name = video_name_entry.get()
+        calib_path = calib_path_var.get().strip() or None
 
         if not json_path or not os.path.exists(json_path):
             messagebox.showerror("Missing JSON", "Please select a valid JSON file.")
@@ -163,14 +108,18 @@ def run_pose_plotter(plot_distance=False):
         if not video_name.strip():
             messagebox.showerror("Missing Name", "Please enter a video name.")
             return
+        if calib_path and not os.path.exists(calib_path):
+            messagebox.showerror("Missing Calibration", "Calibration file not found (leave empty for pixels).")
+            return
 
         OUTPUT_DIR = 'AlphaPose_Code/output_plots'
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         clear_all()
 
         # pass the flag through
-        convert_json_to_opencv_images(json_path, video_path, OUTPUT_DIR, plot_distance=plot_distance)
-        make_video(video_name, video_path)
+        convert_json_to_opencv_images(json_path, video_path, OUTPUT_DIR, plot_distance=plot_distance,
+                                      calibration_path=calib_path, backdrop=backdrop)
+        make_video(video_name, video_path, encoder=encoder)
 
         result["json"] = json_path
         result["video"] = video_path
@@ -184,6 +133,7 @@ def run_pose_plotter(plot_distance=False):
 
     json_path_var = tk.StringVar()
     video_path_var = tk.StringVar()
+    calib_path_var = tk.StringVar()
 
     tk.Label(root, text="JSON File:").grid(row=0, column=0, sticky="e")
     tk.Entry(root, textvariable=json_path_var, width=50).grid(row=0, column=1)
@@ -197,7 +147,11 @@ def run_pose_plotter(plot_distance=False):
     video_name_entry = tk.Entry(root)
     video_name_entry.grid(row=2, column=1)
 
-    tk.Button(root, text="Run Pose Plotter", command=run_processing).grid(row=3, column=1, pady=10)
+    tk.Label(root, text="Calibration (optional):").grid(row=3, column=0, sticky="e")
+    tk.Entry(root, textvariable=calib_path_var, width=50).grid(row=3, column=1)
+    tk.Button(root, text="Browse", command=browse_calibration).grid(row=3, column=2)
+
+    tk.Button(root, text="Run Pose Plotter", command=run_processing).grid(row=4, column=1, pady=10)
     root.mainloop()
 
     return result["json"], result["video"], result["name"]
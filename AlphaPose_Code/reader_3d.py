@@ -1,12 +1,15 @@
 # reader3d.py — 3D pose anchored to 2D motion (per-frame translation & scale)
-import os, json, time
+import os
 import numpy as np
 import cv2
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-from videoCreator import make_video
+from videoCreator import make_video, DEFAULT_ENCODER
 from folderclear import clear_all
+from framesource import open_backdrop
+from adapters import load_entries, entry_keypoints, entry_xyz
+from instrument import stage, progress
 
 # ----------------------------
 # Skeleton edges
@@ -58,24 +61,12 @@ def draw_skeleton_2d(img, pts, vis=None, color=(0,0,255), th=2):
 # Parse helpers
 # ----------------------------
 def parse_3d(entry):
-    if 'pred_xyz_jts' in entry:
-        arr = np.array(entry['pred_xyz_jts'], dtype=float)
-        X = arr.reshape(-1,3) if arr.ndim==1 else arr
-        return X, None
-    if 'keypoints_3d' in entry:
-        arr = np.array(entry['keypoints_3d'], dtype=float)
-        if arr.ndim==1 and arr.size%4==0:
-            A = arr.reshape(-1,4); return A[:,:3], (A[:,3]>0)
-        if arr.ndim==2 and arr.shape[1]>=3:
-            X = arr[:,:3]; vis = (arr[:,3]>0) if arr.shape[1]>3 else None
-            return X, vis
-    return None, None
+    """(J,3) joints + optional visibility; pred_xyz_jts / keypoints_3d via the adapter layer"""
+    return entry_xyz(entry)
 
 def parse_2d(entry):
-    """AlphaPose 2D: flat [x,y,score,...] -> (N,3)"""
-    if 'keypoints' not in entry: return None
-    kp = np.array(entry['keypoints'], dtype=float).reshape(-1,3)
-    return kp
+    """AlphaPose 2D: flat [x,y,score,...] -> (N,3), any joint count"""
+    return entry_keypoints(entry)
 
 def frame_num(fname):
     try:
@@ -125,7 +116,9 @@ def center_and_scale_2d(kp2d, conf_thr=0.05):
 # Main conversion
 # ----------------------------
 def convert_json3d_to_images(json_path, video_path, output_dir,
-                             highlight_ids=None, use_plane="xy", rel_to_2d_scale=1.0):
+                             highlight_ids=None, use_plane="xy", rel_to_2d_scale=1.0,
+                             backdrop=False, frame_range=None):
+    """backdrop=True draws on the real video frames; frame_range=(start, end) limits to those frame numbers."""
     os.makedirs(output_dir, exist_ok=True)
 
     cap = cv2.VideoCapture(video_path)
@@ -133,73 +126,80 @@ def convert_json3d_to_images(json_path, video_path, output_dir,
     h_res = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
 
-    with open(json_path,'r') as f:
-        data = json.load(f)
+    with stage("load"):
+        data = load_entries(json_path)  # AlphaPose JSON or .npz columns with xyz
 
     frames = {}
     for e in data:
         fid = e.get('image_id')
         if fid: frames.setdefault(fid, []).append(e)
     sorted_fids = sorted(frames.keys(), key=frame_num)
-
-    t0 = time.perf_counter()
-    for fi, fid in enumerate(sorted_fids):
-        frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
-        draw_axes(frame, step=100)
-
-        id_to_proj = {}
-        people_sorted = sorted(frames[fid], key=lambda p: (p.get('idx') is None, p.get('idx', 1e9)))
-
-        for person in people_sorted:
-            X3, vis3 = parse_3d(person)
-            kp2d   = parse_2d(person)
-
-            # 1) 3D relative shape (no translation)
-            Yrel, _ = project3d_relative(X3, use_plane=use_plane)  # ~[-0.5,0.5]
-
-            # 2) 2D anchor: where to place & how big on THIS frame
-            center2d, size2d = center_and_scale_2d(kp2d)
-
-            if Yrel.size == 0 or center2d is None or size2d is None:
-                # If missing either, just skip or draw a placeholder
-                continue
-
-            # 3) Scale relative shape to person's 2D size
-            #    rel_to_2d_scale lets you tune how big the 3D skeleton is vs. 2D box
-            s = rel_to_2d_scale * size2d
-            P = np.column_stack([center2d[0] + s * Yrel[:,0],
-                                 center2d[1] + s * Yrel[:,1]])
-
-            idx_val = person.get('idx', None)
-            id_to_proj[idx_val] = (P, vis3)
-
-            # context draw
-            draw_skeleton_2d(frame, P, vis3, color=(180,180,180), th=2)
-            if idx_val is not None and len(P)>0:
-                x,y = P[0].astype(int)
-                _txt(frame, str(idx_val), (int(x), max(0,int(y)-10)), 0.6)
-
-        # highlight two (optional)
-        if highlight_ids is not None:
-            a,b = highlight_ids
-            if a in id_to_proj:
-                Pa,Va = id_to_proj[a]; draw_skeleton_2d(frame, Pa, Va, (0,0,255), 2)
-            if b in id_to_proj:
-                Pb,Vb = id_to_proj[b]; draw_skeleton_2d(frame, Pb, Vb, (255,0,0), 2)
-
-        cv2.imwrite(os.path.join(output_dir, f"plot_{fi}.png"), frame)
-        print(f"Frame {fi+1}/{len(sorted_fids)} • Elapsed: {time.perf_counter()-t0:.2f}s")
-
+    if frame_range is not None:
+        sorted_fids = [f for f in sorted_fids if frame_range[0] <= frame_num(f) <= frame_range[1]]
+    video = open_backdrop(video_path, [frame_num(f) for f in sorted_fids], enabled=backdrop)
+    try:
+        for fi, fid in progress(enumerate(sorted_fids), total=len(sorted_fids), label="Render 3D"):
+            with stage("draw"):
+                frame = video.get(frame_num(fid)) if video else None
+                if frame is None:
+                    frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
+                    draw_axes(frame, step=100)
+
+                id_to_proj = {}
+                people_sorted = sorted(frames[fid], key=lambda p: (p.get('idx') is None, p.get('idx', 1e9)))
+
+                for person in people_sorted:
+                    X3, vis3 = parse_3d(person)
+                    kp2d   = parse_2d(person)
+
+                    # 1) 3D relative shape (no translation)
+                    Yrel, _ = project3d_relative(X3, use_plane=use_plane)  # ~[-0.5,0.5]
+
+                    # 2) 2D anchor: where to place & how big on THIS frame
+                    center2d, size2d = center_and_scale_2d(kp2d)
+
+                    if Yrel.size == 0 or center2d is None or size2d is None:
+                        # If missing either, just skip or draw a placeholder
+                        continue
+
+                    # 3) Scale relative shape to person's 2D size
+                    #    rel_to_2d_scale lets you tune how big the 3D skeleton is vs. 2D box
+                    s = rel_to_2d_scale * size2d
+                    P = np.column_stack([center2d[0] + s * Yrel[:,0],
+                                         center2d[1] + s * Yrel[:,1]])
+
+                    idx_val = person.get('idx', None)
+                    id_to_proj[idx_val] = (P, vis3)
+
+                    # context draw
+                    draw_skeleton_2d(frame, P, vis3, color=(180,180,180), th=2)
+                    if idx_val is not None and len(P)>0:
+                        x,y = P[0].astype(int)
+                        _txt(frame, str(idx_val), (int(x), max(0,int(y)-10)), 0.6)
+
+                # highlight two (optional)
+                if highlight_ids is not None:
+                    a,b = highlight_ids
+                    if a in id_to_proj:
+                        Pa,Va = id_to_proj[a]; draw_skeleton_2d(frame, Pa, Va, (0,0,255), 2)
+                    if b in id_to_proj:
+                        Pb,Vb = id_to_proj[b]; draw_skeleton_2d(frame, Pb, Vb, (255,0,0), 2)
+
+            with stage("imwrite"):
+                cv2.imwrite(os.path.join(output_dir, f"plot_{fi}.png"), frame)
+    finally:
+        if video:
+            video.close()
     return output_dir
 
 # ----------------------------
 # GUI
 # ----------------------------
-def run_pose_plotter_3d():
+def run_pose_plotter_3d(backdrop=False, encoder=DEFAULT_ENCODER):
     result = {"json": None, "video": None, "name": None}
 
     def browse_json():
-        p = filedialog.askopenfilename(title="Select 3D JSON File", filetypes=[("JSON Files","*.json")])
+        p = filedialog.askopenfilename(title="Select 3D JSON File", filetypes=[("JSON Files","*.json *.jsonl")])
         json_path_var.set(p)
 
     def browse_video():
@@ -224,8 +224,9 @@ def run_pose_plotter_3d():
 
         # rel_to_2d_scale: tweak if you want the 3D bones thicker/larger vs the 2D person box (default 0.4)
         convert_json3d_to_images(json_path, video_path, OUTPUT_DIR,
-                                 highlight_ids=None, use_plane="xy", rel_to_2d_scale=0.4)
-        make_video(video_name, video_path)
+                                 highlight_ids=None, use_plane="xy", rel_to_2d_scale=0.4,
+                                 backdrop=backdrop)
+        make_video(video_name, video_path, encoder=encoder)
 
         result.update({"json": json_path, "video": video_path, "name": video_name})
         root.quit(); root.destroy()
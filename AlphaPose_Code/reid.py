@@ -0,0 +1,155 @@
+# reid.py — appearance embeddings + per-track gallery for re-identifying returning people
+import numpy as np
+import cv2
+
+from skeleton import edges_for, CENTER_JOINTS
+
+HSV_BINS = (8, 3, 3)    # hue / saturation / value bins of each clothing histogram
+BONE_SAMPLES = 12       # pixels sampled along every limb
+MIN_SAMPLES = 12        # fewer usable limb pixels than this in either body half -> no embedding
+OCCLUDER_MARGIN = 0.05  # an occluder's box grows by this share of their height (limb thickness)
+DEPTH_MARGIN = 0.05     # feet this share of body height lower than another's = clearly in front of them
+# face and head joints per layout: skin and hair look alike across people
+HEAD_JOINTS = {17: (0, 1, 2, 3, 4), 25: (0, 15, 16, 17, 18), 24: (15,), 29: (15,)}
+
+# ----------------------------
+# Embeddings (one call per frame)
+# ----------------------------
+def hsv_bins(bgr):
+    """(..., 3) uint8 BGR pixels -> (...) HSV histogram bin, one cvtColor call for all of them."""
+    hsv = cv2.cvtColor(np.ascontiguousarray(bgr).reshape(-1, 1, 3), cv2.COLOR_BGR2HSV).astype(np.int64)
+    hsv = hsv.reshape(bgr.shape)
+    nh, ns, nv = HSV_BINS
+    h = hsv[..., 0] * nh // 180
+    s = hsv[..., 1] * ns // 256
+    v = hsv[..., 2] * nv // 256
+    return (h * ns + s) * nv + v
+
+def appearance_embeddings(image, kps, conf_thresh=0.05):
+    """
+    (D, J, 3) detections on one BGR frame -> ((D, E) unit embeddings, (D,) ok).
+    Pixels are sampled along every limb of every detection at once (only those pixels are
+    converted to HSV). Samples above the
+    person's center (mid-hip, else head) make an upper-body color histogram and the rest
+    a lower-body one, so the embedding is roughly "shirt + trousers". Each histogram is
+    square-rooted, so the cosine of two embeddings is their Bhattacharyya coefficient.
+    Samples inside another person's box are dropped (they may show that person's clothes)
+    unless this person is clearly in front: lowest visible joint DEPTH_MARGIN of their
+    height further down the frame.
+    ok is False when either half has fewer than MIN_SAMPLES usable limb pixels.
+    """
+    kps = np.asarray(kps, dtype=np.float64)
+    D, J = kps.shape[:2]
+    B = int(np.prod(HSV_BINS))
+    if D == 0:
+        return np.zeros((0, 2 * B)), np.zeros(0, dtype=bool)
+    head = HEAD_JOINTS.get(J, ())
+    edges = np.array([(i, j) for i, j in edges_for(J) if i not in head and j not in head]).reshape(-1, 2)
+    a, b = edges.T
+    H, W = image.shape[:2]
+
+    t = np.linspace(0.1, 0.9, BONE_SAMPLES)[None, None, :, None]
+    pts = kps[:, a, None, :2] * (1 - t) + kps[:, b, None, :2] * t              # (D, E, S, 2)
+    vis = kps[..., 2] > conf_thresh
+    x, y = np.round(pts[..., 0]).astype(np.int64), np.round(pts[..., 1]).astype(np.int64)
+    ok = (vis[:, a] & vis[:, b])[..., None] & (x >= 0) & (x < W) & (y >= 0) & (y < H)
+
+    # occlusion: box tests of every sample against every detection not clearly behind it
+    xy = np.where(vis[..., None], kps[..., :2], np.nan)
+    with np.errstate(all="ignore"):
+        lo, hi = np.nanmin(xy, axis=1), np.nanmax(xy, axis=1)                   # (D, 2), NaN if none visible
+        margin = OCCLUDER_MARGIN * (hi[:, 1] - lo[:, 1])
+        lo, hi = lo - margin[:, None], hi + margin[:, None]
+        inside = ((pts[:, :, :, None, :] >= lo) & (pts[:, :, :, None, :] <= hi)).all(axis=-1)  # (D, E, S, D)
+    with np.errstate(invalid="ignore"):
+        feet, tall = np.nanmax(xy[..., 1], axis=1), hi[:, 1] - lo[:, 1]
+        may_cover = feet[None, :] > feet[:, None] - DEPTH_MARGIN * tall[:, None]   # [d, o]: o may be in front of d
+    np.fill_diagonal(may_cover, False)
+    ok &= ~(inside & may_cover[:, None, None, :]).any(axis=-1)
+
+    l_hip, r_hip, top = CENTER_JOINTS.get(J, CENTER_JOINTS[17])
+    hips = vis[:, l_hip] & vis[:, r_hip]
+    center_y = np.where(hips, (kps[:, l_hip, 1] + kps[:, r_hip, 1]) / 2, kps[:, top, 1])
+    lower = pts[..., 1] >= center_y[:, None, None]
+
+    det = np.broadcast_to(np.arange(D)[:, None, None], ok.shape)
+    bins = hsv_bins(image[np.clip(y, 0, H - 1), np.clip(x, 0, W - 1)])
+    key = (det * 2 + lower) * B + bins
+    hist = np.bincount(key[ok], minlength=D * 2 * B).reshape(D, 2, B).astype(np.float64)
+
+    n = hist.sum(axis=2, keepdims=True)
+    emb = np.sqrt(hist / np.maximum(n, 1)).reshape(D, 2 * B)
+    emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+    return emb, (n[:, :, 0] >= MIN_SAMPLES).all(axis=1)
+
+# ----------------------------
+# Gallery + vector search
+# ----------------------------
+class EmbeddingGallery:
+    """
+    Ring buffer of the last `size` unit embeddings per track, searched with one matrix product.
+    An embedding is only stored once the same track gave a matching one (cosine >= confirm) on
+    the previous frame too: a person the detector missed for a frame can't pass their clothes
+    off as whoever they stood in front of.
+    """
+
+    def __init__(self, ids, dim, size=30, confirm=0.85):
+        self.ids = list(ids)
+        self.row = {pid: r for r, pid in enumerate(self.ids)}
+        self.size = size
+        self.confirm = confirm
+        self.bank = np.zeros((len(self.ids), size, dim))
+        self.valid = np.zeros((len(self.ids), size), dtype=bool)
+        self.cursor = np.zeros(len(self.ids), dtype=np.int64)
+        self.pending = np.zeros((len(self.ids), dim))
+        self.pending_frame = np.full(len(self.ids), -2, dtype=np.int64)
+
+    def add(self, pids, embs, frame):
+        for pid, e in zip(pids, embs):
+            r = self.row[pid]
+            if self.pending_frame[r] == frame - 1 and self.pending[r] @ e >= self.confirm:
+                slot = self.cursor[r] % self.size
+                self.bank[r, slot] = e
+                self.valid[r, slot] = True
+                self.cursor[r] += 1
+            self.pending[r] = e
+            self.pending_frame[r] = frame
+
+    def has(self, pid):
+        return bool(self.valid[self.row[pid]].any())
+
+    def similarity(self, queries):
+        """(Q, E) unit queries -> (Q, T) best cosine similarity to each track's gallery (-inf: no data)."""
+        T, G, E = self.bank.shape
+        if len(queries) == 0 or T == 0:
+            return np.full((len(queries), T), -np.inf)
+        sim = (np.asarray(queries) @ self.bank.reshape(T * G, E).T).reshape(-1, T, G)
+        sim[:, ~self.valid] = -np.inf
+        return sim.max(axis=2)
+
+    def match(self, queries, allowed_ids, min_similarity):
+        """
+        One-to-one assignment of queries to track ids, most similar first. allowed_ids holds
+        one list of candidate ids per query. Returns [(query_index, pid, similarity), ...]
+        for pairs at or above min_similarity.
+        """
+        if len(queries) == 0 or not any(allowed_ids):
+            return []
+        sim = self.similarity(queries)
+        mask = np.zeros_like(sim, dtype=bool)
+        for q, pids in enumerate(allowed_ids):
+            mask[q, [self.row[pid] for pid in pids]] = True
+        sim = np.where(mask, sim, -np.inf)
+        order = np.argsort(-sim, axis=None)
+        q_idx, t_idx = np.unravel_index(order, sim.shape)
+        used_q, used_t, out = set(), set(), []
+        for q, t in zip(q_idx, t_idx):
+            s = sim[q, t]
+            if not s >= min_similarity:
+                break
+            if q in used_q or t in used_t:
+                continue
+            used_q.add(q)
+            used_t.add(t)
+            out.append((int(q), self.ids[t], float(s)))
+        return out
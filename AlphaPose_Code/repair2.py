@@ -1,7 +1,12 @@
 # repair2.py
-import json
 import numpy as np
 from collections import defaultdict, deque
+from itertools import chain
+
+from reid import appearance_embeddings, EmbeddingGallery
+from adapters import iter_frames, open_entry_writer
+from framesource import open_backdrop, video_frame_count
+from instrument import stage, progress
 
 # GUI picker
 import tkinter as tk
@@ -15,6 +20,11 @@ MAX_CENTER_JUMP = 150.0     # max pixels a person can move between frames
 POSE_SIM_THRESHOLD = 1.2    # lower = stricter (0 ~ identical after normalization)
 CENTER_WEIGHT = 0.3         # blend center distance into the score
 POSE_WEIGHT = 0.7           # blend pose distance into the score
+REID_ENABLED = True         # appearance ReID; only runs when repair is given the source video
+REID_MIN_SIMILARITY = 0.85  # min cosine similarity of clothing histograms to revive a lost ID
+REID_MAX_LOST = 300         # frames an ID may be lost and still be revived (anywhere in the frame)
+REID_GRACE = 5              # frames a lost ID still matches by position; after that only by appearance
+REID_GALLERY = 30           # embeddings kept per ID
 OUTPUT_JSON = "repaired.json"
 
 # ----------------------------
@@ -83,128 +93,219 @@ def center_distance(kp_a, kp_b):
         return np.inf
     return float(np.linalg.norm(ca - cb))
 
-def repair_alphapose_json(input_json_path: str, output_json_path: str = OUTPUT_JSON):
-    with open(input_json_path, "r") as f:
-        data = json.load(f)
-
-    from collections import defaultdict
-    frames_by_image = defaultdict(list)
-    for entry in data:
-        frames_by_image[entry["image_id"]].append(entry)
-
-    sorted_frame_keys = sorted(frames_by_image.keys(), key=frame_number)
-    if not sorted_frame_keys:
-        raise RuntimeError("No frames found in the selected JSON.")
-
-    first_frame = sorted_frame_keys[0]
-
-    # Lock the ID universe from frame 0
-    initial_people = frames_by_image[first_frame]
-    initial_ids = [p.get("idx") for p in initial_people if "idx" in p]
-    if len(initial_ids) != len(initial_people) or any(i is None for i in initial_ids):
-        initial_ids = list(range(len(initial_people)))
-
-    id_set = list(initial_ids)
-    id_to_history = {pid: deque(maxlen=POSE_HISTORY) for pid in id_set}
-    id_to_last_center = {pid: None for pid in id_set}
-    id_present_flag = {pid: True for pid in id_set}
-
-    # Initialize histories from first frame
-    idx_to_kp_first = {}
-    for person in initial_people:
-        kp = arr_from_keypoints(person)
-        pid = person.get("idx")
-        if pid is None:
-            continue
-        idx_to_kp_first[pid] = kp
-    if not idx_to_kp_first and initial_people:
-        for pid, person in zip(id_set, initial_people):
-            idx_to_kp_first[pid] = arr_from_keypoints(person)
-
-    for pid in id_set:
-        if pid in idx_to_kp_first:
-            kp0 = idx_to_kp_first[pid]
-            id_to_history[pid].append(kp0)
-            id_to_last_center[pid] = center_of(kp0)
-
-    # Pass: repair across frames
-    repaired_entries = []
-
-    for frame_key in sorted_frame_keys:
-        detections = frames_by_image[frame_key]
+def build_center_grid(centers, cell=None):
+    """Bucket detection indices by the uniform grid cell of their center (cell = MAX_CENTER_JUMP)."""
+    cell = cell or MAX_CENTER_JUMP
+    grid = defaultdict(list)
+    for j, c in enumerate(centers):
+        if c is not None:
+            grid[(int(c[0] // cell), int(c[1] // cell))].append(j)
+    return grid
+
+def nearby_detections(grid, center, cell=None):
+    """Detections in the 3x3 block of cells around center — everything within one cell size."""
+    cell = cell or MAX_CENTER_JUMP
+    gx, gy = int(center[0] // cell), int(center[1] // cell)
+    out = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            out.extend(grid.get((gx + dx, gy + dy), ()))
+    return sorted(out)  # keep detection order so score ties break as before
+
+class OnlineRepairer:
+    """
+    Frame-by-frame ID repair state. The ID universe is locked from the first frame;
+    step() takes one frame's detections and returns them with repaired "idx" values
+    (detections that match no ID are dropped, never given new IDs). With the frame image,
+    IDs lost for more than REID_GRACE frames are revived only by an appearance match
+    against their gallery, so a stranger walking past an empty spot can't take the ID.
+    """
+    def __init__(self, initial_people):
+        # Lock the ID universe from frame 0
+        initial_ids = [p.get("idx") for p in initial_people if "idx" in p]
+        if len(initial_ids) != len(initial_people) or any(i is None for i in initial_ids):
+            initial_ids = list(range(len(initial_people)))
+
+        self.id_set = id_set = list(initial_ids)
+        self.id_to_history = id_to_history = {pid: deque(maxlen=POSE_HISTORY) for pid in id_set}
+        self.id_to_last_center = id_to_last_center = {pid: None for pid in id_set}
+        self.id_present_flag = {pid: True for pid in id_set}
+        self.id_last_seen = {pid: 0 for pid in id_set}   # step count of the last match
+        self.t = 0
+        self.gallery = None
+
+        # Initialize histories from first frame
+        idx_to_kp_first = {}
+        for person in initial_people:
+            kp = arr_from_keypoints(person)
+            pid = person.get("idx")
+            if pid is None:
+                continue
+            idx_to_kp_first[pid] = kp
+        if not idx_to_kp_first and initial_people:
+            for pid, person in zip(id_set, initial_people):
+                idx_to_kp_first[pid] = arr_from_keypoints(person)
 
         for pid in id_set:
-            id_present_flag[pid] = False
-
+            if pid in idx_to_kp_first:
+                kp0 = idx_to_kp_first[pid]
+                id_to_history[pid].append(kp0)
+                id_to_last_center[pid] = center_of(kp0)
+
+    def step(self, detections, image=None):
+        """image: this frame (BGR) for appearance ReID, or None for position/pose matching only."""
+        self.t += 1
+        id_set, id_to_history = self.id_set, self.id_to_history
+        id_to_last_center, id_present_flag = self.id_to_last_center, self.id_present_flag
         det_kps = [arr_from_keypoints(d) for d in detections]
-        det_used = [False] * len(det_kps)
-
-        candidates = []
-        for pid in id_set:
-            if len(id_to_history[pid]) == 0:
-                ref_kp = None
-            elif len(id_to_history[pid]) == 1:
-                ref_kp = id_to_history[pid][-1]
-            else:
-                ref_kp = id_to_history[pid][-1]
-
-            last_c = id_to_last_center[pid]
-
-            for j, kp in enumerate(det_kps):
-                if det_used[j]:
-                    continue
-
-                if last_c is not None:
-                    c = center_of(kp)
-                    if c is None:
-                        continue
-                    jump = float(np.linalg.norm(c - last_c))
-                    if jump > MAX_CENTER_JUMP:
-                        continue  # impossible teleport
-
-                if ref_kp is None:
-                    pdist = 0.5
+        gallery = None
+        if REID_ENABLED and image is not None and det_kps:
+            with stage("repair.reid"):
+                # one embedding batch per frame; (D, T) cosine similarity to every ID's gallery
+                embs, emb_ok = appearance_embeddings(image, np.stack(det_kps))
+                if self.gallery is None:
+                    self.gallery = EmbeddingGallery(id_set, embs.shape[1], REID_GALLERY, REID_MIN_SIMILARITY)
+                gallery = self.gallery
+                sim = gallery.similarity(embs)
+                # a detection whose clothes clearly differ from an ID's gallery can't take that ID
+                looks_different = emb_ok[:, None] & np.isfinite(sim) & (sim < REID_MIN_SIMILARITY)
+                looks_same = emb_ok[:, None] & (sim >= REID_MIN_SIMILARITY)
+
+        repaired_entries = []
+        with stage("repair.match"):
+            for pid in id_set:
+                id_present_flag[pid] = False
+
+            det_used = [False] * len(det_kps)
+            det_centers = [center_of(kp) for kp in det_kps]
+            grid = build_center_grid(det_centers)
+
+            candidates = []
+            for pid in id_set:
+                if (gallery is not None and self.t - self.id_last_seen[pid] > REID_GRACE + 1
+                        and gallery.has(pid)):
+                    continue  # lost too long: only the ReID stage below may revive it
+                if len(id_to_history[pid]) == 0:
+                    ref_kp = None
+                elif len(id_to_history[pid]) == 1:
+                    ref_kp = id_to_history[pid][-1]
                 else:
-                    pdist = pose_distance(ref_kp, kp)
-                    if pdist > POSE_SIM_THRESHOLD:
-                        continue
-
-                if id_to_last_center[pid] is None:
-                    cdist = 0.0
-                else:
-                    cdist = center_distance(ref_kp if ref_kp is not None else kp, kp)
-                    if not np.isfinite(cdist):
-                        cdist = MAX_CENTER_JUMP
-
-                score = POSE_WEIGHT * pdist + CENTER_WEIGHT * (cdist / max(1.0, MAX_CENTER_JUMP))
-                candidates.append((score, pid, j))
+                    ref_kp = id_to_history[pid][-1]
 
-        candidates.sort(key=lambda x: x[0])
-        assigned_pid = set()
-        assigned_det = set()
+                last_c = id_to_last_center[pid]
+                # only detections in neighbouring grid cells can be within MAX_CENTER_JUMP
+                nearby = range(len(det_kps)) if last_c is None else nearby_detections(grid, last_c)
 
-        for score, pid, j in candidates:
-            if pid in assigned_pid or j in assigned_det or det_used[j]:
-                continue
-            assigned_pid.add(pid)
-            assigned_det.add(j)
-            det_used[j] = True
-            id_present_flag[pid] = True
-
-            kp = det_kps[j]
-            id_to_history[pid].append(kp)
-            id_to_last_center[pid] = center_of(kp)
-
-            fixed = dict(detections[j])
-            fixed["idx"] = pid
-            repaired_entries.append(fixed)
+                for j in nearby:
+                    if det_used[j] or (gallery is not None and looks_different[j, gallery.row[pid]]):
+                        continue
+                    kp = det_kps[j]
+
+                    if last_c is not None:
+                        c = det_centers[j]
+                        if c is None:
+                            continue
+                        jump = float(np.linalg.norm(c - last_c))
+                        if jump > MAX_CENTER_JUMP:
+                            continue  # impossible teleport
+
+                    if ref_kp is None:
+                        pdist = 0.5
+                    else:
+                        pdist = pose_distance(ref_kp, kp)
+                        if pdist > POSE_SIM_THRESHOLD:
+                            continue
+
+                    if last_c is None:
+                        cdist = 0.0
+                    else:
+                        cdist = jump  # last center is the center of ref_kp
+
+                    score = POSE_WEIGHT * pdist + CENTER_WEIGHT * (cdist / max(1.0, MAX_CENTER_JUMP))
+                    # pairs whose appearance matches the ID's gallery are assigned first
+                    unconfirmed = gallery is None or not looks_same[j, gallery.row[pid]]
+                    candidates.append((unconfirmed, score, pid, j))
+
+            candidates.sort(key=lambda x: x[:2])
+            assigned_pid = set()
+            assigned_det = set()
+            det_of_pid = {}
+
+            for _, score, pid, j in candidates:
+                if pid in assigned_pid or j in assigned_det or det_used[j]:
+                    continue
+                assigned_pid.add(pid)
+                assigned_det.add(j)
+                det_of_pid[pid] = j
+                det_used[j] = True
+                id_present_flag[pid] = True
+
+                kp = det_kps[j]
+                id_to_history[pid].append(kp)
+                id_to_last_center[pid] = det_centers[j]
+
+                fixed = dict(detections[j])
+                fixed["idx"] = pid
+                repaired_entries.append(fixed)
+
+        with stage("repair.reid"):
+            # ReID: leftovers vs. the galleries of IDs that found no match this frame, anywhere
+            # in the frame, most similar first
+            if gallery is not None:
+                lost = [pid for pid in id_set if not id_present_flag[pid]
+                        and self.t - self.id_last_seen[pid] <= REID_MAX_LOST]
+                left = [j for j in range(len(det_kps)) if not det_used[j] and emb_ok[j]
+                        and det_centers[j] is not None]
+                for q, pid, _ in gallery.match(embs[left], [lost] * len(left), REID_MIN_SIMILARITY):
+                    j = left[q]
+                    det_used[j] = True
+                    det_of_pid[pid] = j
+                    id_present_flag[pid] = True
+                    id_to_history[pid].append(det_kps[j])
+                    id_to_last_center[pid] = det_centers[j]
+                    fixed = dict(detections[j])
+                    fixed["idx"] = pid
+                    repaired_entries.append(fixed)
+                seen = [pid for pid, j in det_of_pid.items() if emb_ok[j]]
+                gallery.add(seen, embs[[det_of_pid[pid] for pid in seen]], self.t)
+            for pid in det_of_pid:
+                self.id_last_seen[pid] = self.t
 
         # leftovers are ignored; we don't fabricate entries
+        return repaired_entries
+
+def repair_alphapose_json(input_json_path: str, output_json_path: str = OUTPUT_JSON, video_path=None):
+    """
+    AlphaPose JSON / .jsonl, OpenPose folder or .npz columns; .json/.jsonl input is streamed.
+    video_path: the source video, decoded alongside for appearance ReID (frame n = image_id n).
+    """
+    frames = iter_frames(input_json_path)
+    with stage("repair.load"):
+        first = next(frames, None)
+    if first is None:
+        raise RuntimeError("No frames found in the selected JSON.")
+    repairer = OnlineRepairer(first[1])
+    video = None
+    if REID_ENABLED and video_path:
+        video = open_backdrop(video_path, range(video_frame_count(video_path)))
+
+    # Pass: repair across frames, each frame written out as soon as it is done
+    writer = open_entry_writer(output_json_path)
+    n_written = 0
+    try:
+        for frame_key, detections in progress(chain([first], frames), label="Repair", counter="repaired_frames"):
+            image = video.get(frame_number(frame_key)) if video else None
+            repaired_entries = repairer.step(detections, image)
+            with stage("repair.write"):
+                writer.write(repaired_entries)
+            n_written += len(repaired_entries)
+    finally:
+        if video:
+            video.close()
+        with stage("repair.write"):
+            writer.close()
 
-    with open(output_json_path, "w") as f:
-        json.dump(repaired_entries, f)
-
-    return output_json_path, len(repaired_entries)
+    return output_json_path, n_written
 
 if __name__ == "__main__":
     # Minimal GUI just for picking the input JSON
@@ -214,12 +315,17 @@ if __name__ == "__main__":
     try:
         path = filedialog.askopenfilename(
             title="Select AlphaPose JSON to repair",
-            filetypes=[("JSON Files", "*.json")]
+            filetypes=[("JSON Files", "*.json *.jsonl"), ("Columns", "*.npz")]
         )
         if not path:
             raise RuntimeError("Repair cancelled: no file selected.")
 
-        out_path, n = repair_alphapose_json(path, OUTPUT_JSON)
+        video_path = filedialog.askopenfilename(
+            title="Select the source video for appearance ReID (Cancel to repair without it)",
+            filetypes=[("Video files", "*.mp4 *.avi *.mov")]
+        )
+
+        out_path, n = repair_alphapose_json(path, OUTPUT_JSON, video_path or None)
         messagebox.showinfo("Repair complete", f"Wrote {n} repaired entries to:\n{out_path}")
         print(f"Wrote {n} repaired entries to {out_path}")
     except Exception as e:
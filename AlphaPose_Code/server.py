@@ -0,0 +1,362 @@
+# server.py — local HTTP query service: sessions are loaded into columns once, kept hot, sliced per request
+#   python server.py --root sessions/ [--port 8765 --cache-mb 1024 --fps 30 --calibration calibration.json]
+#   curl "localhost:8765/sessions/bout1.json/distance?a=1&b=2&start_s=180&end_s=360"
+#
+# GET /sessions                               files under --root and whether they are cached
+# GET /stats                                  cache hits/misses/evictions, per-route latency p50/p95
+# GET /sessions/<name>                        frames, frame range, track ids, joints, units
+# GET /sessions/<name>/keypoints              keypoints (F, K, J, 3) + present, absent people are null
+# GET /sessions/<name>/metrics                metric=center,speed,accel,nearest_id,nearest_dist (per frame, track)
+# GET /sessions/<name>/distance?a=1&b=2       center distance between two tracks per frame
+# Range parameters on every session query: start / end (frame numbers, inclusive) or start_s / end_s
+# (seconds at --fps), tracks=1,2 (default: all). format=npz returns the same arrays as an .npz body.
+import io
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+import numpy as np
+
+from adapters import load_session
+from metrics import compute_metrics, DEFAULT_FPS
+from calibration import load_calibration
+
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_MB = 1024           # sessions are evicted least-recently-used first beyond this...
+CACHE_SESSIONS = 8        # ...or beyond this many sessions
+SESSION_EXTS = (".json", ".jsonl", ".npz", ".qca")
+JSON_DECIMALS = 2         # floats in JSON responses are rounded to this many places
+MAX_HEADER = 16 * 1024
+LATENCY_WINDOW = 10000    # requests per route kept for /stats percentiles
+QUERY_THREADS = 2         # threads slicing + encoding responses off the event loop
+
+# ----------------------------
+# Hot session cache
+# ----------------------------
+def _nbytes(d):
+    return sum(v.nbytes for v in d.values() if isinstance(v, np.ndarray))
+
+class SessionCache:
+    """
+    path -> {"cols", "metrics", "mtime", "nbytes"}, least recently used evicted first.
+    Loads run in a worker thread; concurrent requests for a session that is still loading
+    wait for that one load instead of starting their own. A changed file is reloaded.
+    """
+    def __init__(self, root, max_mb=CACHE_MB, max_sessions=CACHE_SESSIONS, fps=DEFAULT_FPS, H=None):
+        self.root = os.path.realpath(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_sessions = max_sessions
+        self.fps = fps
+        self.H = H
+        self.entries = OrderedDict()
+        self.loading = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def resolve(self, name):
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise PermissionError(f"'{name}' is outside the session root")
+        if not path.endswith(SESSION_EXTS) or not os.path.isfile(path):
+            raise FileNotFoundError(f"No session '{name}'")
+        return path
+
+    def list(self):
+        out = []
+        for dirpath, _, files in os.walk(self.root):
+            for fn in sorted(files):
+                if fn.endswith(SESSION_EXTS) and not fn.endswith(".frames.npz"):
+                    path = os.path.join(dirpath, fn)
+                    out.append({"name": os.path.relpath(path, self.root), "bytes": os.path.getsize(path),
+                                "cached": path in self.entries})
+        return out
+
+    def _load(self, path, mtime):
+        cols = load_session(path)
+        m = compute_metrics(cols, self.fps, self.H)
+        item = {"cols": cols, "metrics": m, "mtime": mtime,
+                "col_of": {int(t): k for k, t in enumerate(cols["track_id"])}}
+        item["nbytes"] = _nbytes(cols) + _nbytes(m)
+        return item
+
+    def _evict(self):
+        total = sum(e["nbytes"] for e in self.entries.values())
+        while len(self.entries) > 1 and (len(self.entries) > self.max_sessions or total > self.max_bytes):
+            _, old = self.entries.popitem(last=False)
+            total -= old["nbytes"]
+            self.evictions += 1
+
+    async def get(self, name):
+        path = self.resolve(name)
+        mtime = os.path.getmtime(path)
+        item = self.entries.get(path)
+        if item is not None and item["mtime"] == mtime:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return item
+        if path in self.loading:
+            self.hits += 1
+            return await asyncio.shield(self.loading[path])
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.loading[path] = fut
+        try:
+            item = await loop.run_in_executor(None, self._load, path, mtime)
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # waiters get it; don't warn when there are none
+            raise
+        finally:
+            del self.loading[path]
+        self.entries[path] = item
+        self._evict()
+        fut.set_result(item)
+        return item
+
+    def stats(self):
+        return {"sessions": len(self.entries), "mb": round(sum(e["nbytes"] for e in self.entries.values()) / 2**20, 1),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# ----------------------------
+# Queries (pure functions of a cached session + query parameters)
+# ----------------------------
+def _arg(q, name, cast=str, default=None):
+    vals = q.get(name)
+    if not vals:
+        return default
+    try:
+        return cast(vals[0])
+    except ValueError:
+        raise ValueError(f"Bad value for '{name}': {vals[0]!r}")
+
+def select(item, q, fps):
+    """(row slice, track column indices) for the range/track parameters."""
+    frames = item["cols"]["frame"]
+    start, end = _arg(q, "start", int), _arg(q, "end", int)
+    if start is None and _arg(q, "start_s", float) is not None:
+        start = int(round(_arg(q, "start_s", float) * fps))
+    if end is None and _arg(q, "end_s", float) is not None:
+        end = int(round(_arg(q, "end_s", float) * fps))
+    lo = 0 if start is None else int(np.searchsorted(frames, start, side="left"))
+    hi = len(frames) if end is None else int(np.searchsorted(frames, end, side="right"))
+    tracks = _arg(q, "tracks")
+    if tracks:
+        ks = []
+        for t in tracks.split(","):
+            k = item["col_of"].get(int(t))
+            if k is None:
+                raise KeyError(f"No track {t} in this session")
+            ks.append(k)
+    else:
+        ks = list(range(len(item["cols"]["track_id"])))
+    return slice(lo, hi), np.array(ks, dtype=np.int64)
+
+def query_info(item, q, fps):
+    cols = item["cols"]
+    frames = cols["frame"]
+    return {"frames": int(len(frames)),
+            "first_frame": int(frames[0]) if len(frames) else None,
+            "last_frame": int(frames[-1]) if len(frames) else None,
+            "fps": fps, "track_id": cols["track_id"],
+            "joints": int(cols["keypoints"].shape[2]), "xyz": "xyz" in cols,
+            "units": str(item["metrics"]["units"])}
+
+def query_keypoints(item, q, fps):
+    rows, ks = select(item, q, fps)
+    cols = item["cols"]
+    present = cols["present"][rows][:, ks]
+    kp = cols["keypoints"][rows][:, ks]
+    out = {"frame": cols["frame"][rows], "track_id": cols["track_id"][ks], "present": present,
+           "keypoints": np.where(present[..., None, None], kp, np.nan)}
+    if "xyz" in cols and _arg(q, "xyz", int, 0):
+        out["xyz"] = np.where(present[..., None, None], cols["xyz"][rows][:, ks], np.nan)
+    return out
+
+METRICS = ("center", "speed", "accel", "nearest_id", "nearest_dist")
+
+def query_metrics(item, q, fps):
+    rows, ks = select(item, q, fps)
+    m = item["metrics"]
+    names = (_arg(q, "metric") or "center,speed").split(",")
+    for n in names:
+        if n not in METRICS:
+            raise ValueError(f"Unknown metric '{n}' (choose from {', '.join(METRICS)})")
+    out = {"frame": m["frame"][rows], "track_id": m["track_id"][ks], "units": m["units"]}
+    for n in names:
+        out[n] = m[n][rows][:, ks]
+    return out
+
+def query_distance(item, q, fps):
+    a, b = _arg(q, "a", int), _arg(q, "b", int)
+    if a is None or b is None:
+        raise ValueError("distance needs both a= and b= track ids")
+    q = dict(q, tracks=[f"{a},{b}"])
+    rows, (ka, kb) = select(item, q, fps)
+    m = item["metrics"]
+    d = m["distance"][rows, ka, kb]
+    ok = ~np.isnan(d)
+    return {"frame": m["frame"][rows], "distance": d, "units": m["units"], "a": a, "b": b,
+            "mean": float(d[ok].mean()) if ok.any() else None,
+            "min": float(d[ok].min()) if ok.any() else None}
+
+QUERIES = {"": query_info, "keypoints": query_keypoints, "metrics": query_metrics, "distance": query_distance}
+
+# ----------------------------
+# Encoding
+# ----------------------------
+def _json_value(v):
+    if isinstance(v, np.ndarray):
+        if v.dtype.kind == "f":
+            # numbers only, so the NaN token can be swapped for null on the text
+            text = json.dumps(np.round(v.astype(np.float64), JSON_DECIMALS).tolist(), separators=(",", ":"))
+            return text.replace("NaN", "null")
+        v = v.tolist()
+    elif isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float):
+        v = None if v != v else round(v, JSON_DECIMALS)
+    return json.dumps(v, separators=(",", ":"))
+
+def encode(result, fmt):
+    """(content type, body bytes) for a query result in 'json' or 'npz'."""
+    if fmt == "npz":
+        buf = io.BytesIO()
+        np.savez(buf, **{k: np.asarray(v) for k, v in result.items() if v is not None})
+        return "application/x-npz", buf.getvalue()
+    if fmt != "json":
+        raise ValueError(f"Unknown format '{fmt}' (json or npz)")
+    body = "{" + ",".join(f"{json.dumps(k)}:{_json_value(v)}" for k, v in result.items()) + "}"
+    return "application/json", body.encode()
+
+# ----------------------------
+# HTTP
+# ----------------------------
+STATUS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+          500: "Internal Server Error"}
+
+class QueryServer:
+    def __init__(self, cache, threads=QUERY_THREADS):
+        self.cache = cache
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self.requests = 0
+
+    def stats(self):
+        routes = {}
+        for route, vals in self.latency.items():
+            v = 1000 * np.array(vals)
+            routes[route] = {"n": len(v), "p50_ms": round(float(np.percentile(v, 50)), 3),
+                             "p95_ms": round(float(np.percentile(v, 95)), 3)}
+        return {"requests": self.requests, "cache": self.cache.stats(), "routes": routes}
+
+    async def route(self, target):
+        """(status, content type, body, route name) for a GET target."""
+        url = urlsplit(target)
+        q = parse_qs(url.query)
+        path = unquote(url.path).strip("/")
+        if path == "sessions":
+            return 200, *encode({"sessions": self.cache.list()}, "json"), "sessions"
+        if path == "stats":
+            return 200, *encode(self.stats(), "json"), "stats"
+        if not path.startswith("sessions/"):
+            raise FileNotFoundError(f"No route '/{path}'")
+        name, action = path[len("sessions/"):], ""
+        head, _, tail = name.rpartition("/")
+        if tail in QUERIES and head:
+            name, action = head, tail
+        item = await self.cache.get(name)
+        fmt = _arg(q, "format", str, "json")
+        loop = asyncio.get_running_loop()
+        # slicing + encoding a large range is real work; keep the event loop free for other clients
+        ctype, body = await loop.run_in_executor(
+            self.pool, lambda: encode(QUERIES[action](item, q, self.cache.fps), fmt))
+        return 200, ctype, body, action or "info"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    break
+                t0 = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ") + ["", "", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    k, _, v = line.partition(":")
+                    if k:
+                        headers[k.strip().lower()] = v.strip()
+                if int(headers.get("content-length", 0) or 0):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                route = "error"
+                try:
+                    if method not in ("GET", "HEAD"):
+                        status, ctype, body = 405, *encode({"error": "only GET is supported"}, "json")
+                    else:
+                        status, ctype, body, route = await self.route(target)
+                except (FileNotFoundError, KeyError) as e:
+                    status, ctype, body = 404, *encode({"error": str(e.args[0] if e.args else e)}, "json")
+                except PermissionError as e:
+                    status, ctype, body = 403, *encode({"error": str(e)}, "json")
+                except ValueError as e:
+                    status, ctype, body = 400, *encode({"error": str(e)}, "json")
+                except Exception as e:
+                    status, ctype, body = 500, *encode({"error": f"{type(e).__name__}: {e}"}, "json")
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                elapsed = time.perf_counter() - t0
+                writer.write((f"HTTP/1.1 {status} {STATUS[status]}\r\n"
+                              f"Content-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                              f"X-Query-Ms: {1000 * elapsed:.3f}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                self.requests += 1
+                self.latency[route].append(elapsed)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(root, host=HOST, port=PORT, cache_mb=CACHE_MB, cache_sessions=CACHE_SESSIONS,
+                fps=DEFAULT_FPS, calibration_path=None, preload=()):
+    cache = SessionCache(root, cache_mb, cache_sessions, fps, load_calibration(calibration_path))
+    app = QueryServer(cache)
+    for name in preload:
+        await cache.get(name)
+    server = await asyncio.start_server(app.handle, host, port, limit=MAX_HEADER)
+    port = server.sockets[0].getsockname()[1]
+    print(f"Serving {cache.root} on http://{host}:{port}  (Ctrl+C to stop)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local HTTP query service for session keypoints and metrics")
+    ap.add_argument("--root", default=".", help="directory holding the sessions (.json/.jsonl/.npz/.qca)")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT, help="0 picks a free port")
+    ap.add_argument("--cache-mb", type=float, default=CACHE_MB)
+    ap.add_argument("--cache-sessions", type=int, default=CACHE_SESSIONS)
+    ap.add_argument("--fps", type=float, default=DEFAULT_FPS, help="for start_s/end_s and speed/accel")
+    ap.add_argument("--calibration", help="calibration.json: metrics in meters")
+    ap.add_argument("--preload", nargs="*", default=(), help="session names to load before serving")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.root, args.host, args.port, args.cache_mb, args.cache_sessions,
+                          args.fps, args.calibration, args.preload))
+    except KeyboardInterrupt:
+        pass
@@ -1,57 +1,24 @@
 import os
-import json
 import numpy as np
 import cv2
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from videoCreator import make_video
+from videoCreator import make_video, DEFAULT_ENCODER
 from folderclear import clear_all
-import time
+from skeleton import draw_skeleton, draw_axes, put_text_with_outline as _put_text_with_outline
+from framesource import open_backdrop
+from adapters import load_entries, entry_keypoints
+from instrument import stage, progress
 
-# --- Helpers (copied from reader.py) ---
+# --- Helpers ---
 
 def frame_num(fname):
     return int(os.path.splitext(os.path.basename(fname))[0])
 
-def draw_skeleton(frame, keypoints, color):
-    EDGES = [
-        (0, 1), (0, 2), (1, 3), (2, 4),
-        (0, 5), (0, 6), (5, 7), (7, 9),
-        (6, 8), (8, 10), (5, 11), (6, 12),
-        (11, 13), (13, 15), (12, 14), (14, 16)
-    ]
-    for i, j in EDGES:
-        if keypoints[i, 2] > 0 and keypoints[j, 2] > 0:
-            pt1 = tuple(keypoints[i, :2].astype(int))
-            pt2 = tuple(keypoints[j, :2].astype(int))
-            cv2.line(frame, pt1, pt2, color, 2)
-    for i in range(len(keypoints)):
-        if keypoints[i, 2] > 0:
-            pt = tuple(keypoints[i, :2].astype(int))
-            cv2.circle(frame, pt, 3, color, -1)
-
-def draw_axes(frame, step=100, grid_color=(200, 200, 200)):
-    h, w = frame.shape[:2]
-    for x in range(0, w, step):
-        cv2.line(frame, (x, 0), (x, h), grid_color, 1)
-        _put_text_with_outline(frame, str(x), (x + 2, 15))
-    for y in range(0, h, step):
-        cv2.line(frame, (0, y), (w, y), grid_color, 1)
-        _put_text_with_outline(frame, str(y), (2, max(12, y - 2)))
-    cv2.line(frame, (0, 0), (w, 0), (0, 0, 0), 2)
-    cv2.line(frame, (0, 0), (0, h), (0, 0, 0), 2)
-    _put_text_with_outline(frame, "X", (w - 20, 20), scale=0.6)
-    _put_text_with_outline(frame, "Y", (10, h - 10), scale=0.6)
-
-def _put_text_with_outline(frame, text, org, scale=0.4):
-    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
-                scale, (255, 255, 255), 3, lineType=cv2.LINE_AA)
-    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
-                scale, (0, 0, 0), 1, lineType=cv2.LINE_AA)
-
 # --- Core ---
 
-def convert_single_json_to_images(json_path, video_path, output_dir, target_id):
+def convert_single_json_to_images(json_path, video_path, output_dir, target_id, backdrop=False, frame_range=None):
+    """backdrop=True draws on the real video frames; frame_range=(start, end) limits to those frame numbers."""
     os.makedirs(output_dir, exist_ok=True)
 
     cap = cv2.VideoCapture(video_path)
@@ -59,8 +26,8 @@ def convert_single_json_to_images(json_path, video_path, output_dir, target_id):
     h_res = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
 
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    with stage("load"):
+        data = load_entries(json_path)  # AlphaPose JSON, OpenPose folder or .npz columns
 
     frames = {}
     for entry in data:
@@ -69,51 +36,54 @@ def convert_single_json_to_images(json_path, video_path, output_dir, target_id):
             frames.setdefault(fid, []).append(entry)
 
     sorted_fids = sorted(frames.keys(), key=frame_num)
-    start_time = time.perf_counter()
-
-    for idx, fid in enumerate(sorted_fids):
-        frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
-        draw_axes(frame, step=100)
-
-        pose_drawn = False
-        for person in frames[fid]:
-            idx_val = person.get("idx")
-            if idx_val != target_id:
-                continue
-            kp = np.array(person["keypoints"], dtype=float)
-            if kp.size == 51:
-                pose = kp.reshape(-1, 3)
-                draw_skeleton(frame, pose, (0, 0, 255))
-                if pose[0, 2] > 0:
-                    x, y = pose[0, :2].astype(int)
-                    _put_text_with_outline(frame, f"ID {idx_val}", (x, max(0, y - 10)), scale=0.6)
-                pose_drawn = True
-
-        if not pose_drawn:
-            _put_text_with_outline(frame, f"ID {target_id} Missing", (20, 40), scale=0.9)
-
-        out_path = os.path.join(output_dir, f'plot_{idx}.png')
-        cv2.imwrite(out_path, frame)
-
-        elapsed = time.perf_counter() - start_time
-        print(f"Frame {idx+1}/{len(sorted_fids)} • Elapsed: {elapsed:.2f}s")
-
+    if frame_range is not None:
+        sorted_fids = [f for f in sorted_fids if frame_range[0] <= frame_num(f) <= frame_range[1]]
+    video = open_backdrop(video_path, [frame_num(f) for f in sorted_fids], enabled=backdrop)
+    try:
+        for idx, fid in progress(enumerate(sorted_fids), total=len(sorted_fids), label="Render"):
+            with stage("draw"):
+                frame = video.get(frame_num(fid)) if video else None
+                if frame is None:
+                    frame = np.ones((h_res, w_res, 3), dtype=np.uint8) * 255
+                    draw_axes(frame, step=100)
+
+                pose_drawn = False
+                for person in frames[fid]:
+                    idx_val = person.get("idx")
+                    if idx_val != target_id:
+                        continue
+                    pose = entry_keypoints(person)  # any joint count; draw_skeleton picks the edges
+                    if pose is not None:
+                        draw_skeleton(frame, pose, (0, 0, 255))
+                        if pose[0, 2] > 0:
+                            x, y = pose[0, :2].astype(int)
+                            _put_text_with_outline(frame, f"ID {idx_val}", (x, max(0, y - 10)), scale=0.6)
+                        pose_drawn = True
+
+                if not pose_drawn:
+                    _put_text_with_outline(frame, f"ID {target_id} Missing", (20, 40), scale=0.9)
+
+            out_path = os.path.join(output_dir, f'plot_{idx}.png')
+            with stage("imwrite"):
+                cv2.imwrite(out_path, frame)
+    finally:
+        if video:
+            video.close()
     return output_dir
 
-def run_single_pose_plotter():
+def run_single_pose_plotter(backdrop=False, encoder=DEFAULT_ENCODER):
     result = {"json": None, "video": None, "name": None}
 
     def browse_json():
         path = filedialog.askopenfilename(
             title="Select JSON File",
-            filetypes=[("JSON Files", "*.json")]
+            filetypes=[("JSON Files", "*.json *.jsonl")]
         )
         if not path:
             return
         json_path_var.set(path)
         try:
-            with open(path, 'r') as f:
-                raw_data = json.load(f)
+            raw_data = load_entries(path)
             available_ids = sorted({entry.get("idx") for entry in raw_data if "idx" in entry})
             if available_ids:
                 messagebox.showinfo("Available Person IDs", f"Detected person IDs: {available_ids}")
@@ -150,8 +120,7 @@ def run_single_pose_plotter():
             messagebox.showerror("Invalid Input", "Please enter a valid integer for person ID.")
             return
 
-        with open(json_path, 'r') as f:
-            raw_data = json.load(f)
+        raw_data = load_entries(json_path)
         available_ids = sorted({entry.get("idx") for entry in raw_data if "idx" in entry})
         if selected_index not in available_ids:
             messagebox.showerror("Invalid ID", f"ID {selected_index} not found in JSON. Available: {available_ids}")
@@ -161,8 +130,8 @@ def run_single_pose_plotter():
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         clear_all()
 
-        convert_single_json_to_images(json_path, video_path, OUTPUT_DIR, selected_index)
-        make_video(video_name, video_path)
+        convert_single_json_to_images(json_path, video_path, OUTPUT_DIR, selected_index, backdrop=backdrop)
+        make_video(video_name, video_path, encoder=encoder)
 
         result["json"] = json_path
         result["video"] = video_path
@@ -0,0 +1,127 @@
+# skeleton.py — shared OpenCV skeleton / axes / two-fighter drawing for every reader
+import numpy as np
+import cv2
+
+from calibration import apply_homography
+
+# ----------------------------
+# Skeleton edges
+# ----------------------------
+COCO17_EDGES = [
+    (0, 1), (0, 2), (1, 3), (2, 4),
+    (0, 5), (0, 6), (5, 7), (7, 9),
+    (6, 8), (8, 10), (5, 11), (6, 12),
+    (11, 13), (13, 15), (12, 14), (14, 16)
+]
+SMPL24_EDGES = [
+    (0, 1), (1, 4), (4, 7), (7, 10),
+    (0, 2), (2, 5), (5, 8), (8, 11),
+    (0, 3), (3, 6), (6, 9), (9, 12), (12, 15),
+    (12, 13), (13, 16), (16, 18), (18, 20), (20, 22),
+    (12, 14), (14, 17), (17, 19), (19, 21), (21, 23)
+]
+# OpenPose BODY_25
+BODY25_EDGES = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (1, 5), (5, 6), (6, 7), (1, 8),
+    (8, 9), (9, 10), (10, 11), (11, 24),
+    (11, 22), (22, 23), (8, 12), (12, 13),
+    (13, 14), (14, 21), (14, 19), (19, 20),
+    (0, 15), (15, 17), (0, 16), (16, 18)
+]
+
+# (left hip, right hip, head) per joint layout: COCO17, OpenPose BODY_25, SMPL24 / HybrIK 29
+CENTER_JOINTS = {17: (11, 12, 0), 25: (12, 9, 0), 24: (1, 2, 15), 29: (1, 2, 15)}
+
+def edges_for(n_joints):
+    """Pick the edge set from the joint count (17 COCO, 24 SMPL / 29 HybrIK, 25 BODY_25)."""
+    if n_joints == 17: return COCO17_EDGES
+    if n_joints in (24, 29): return SMPL24_EDGES
+    if n_joints == 25: return BODY25_EDGES
+    return [(i, j) for (i, j) in COCO17_EDGES if i < n_joints and j < n_joints]
+
+# ----------------------------
+# Drawing
+# ----------------------------
+def draw_skeleton(frame, keypoints, color, edges=None, thickness=2, radius=3):
+    """keypoints: (J,3) x/y/score; joints with score 0 are skipped."""
+    if edges is None:
+        edges = edges_for(len(keypoints))
+    for i, j in edges:
+        if keypoints[i, 2] > 0 and keypoints[j, 2] > 0:
+            pt1 = tuple(keypoints[i, :2].astype(int))
+            pt2 = tuple(keypoints[j, :2].astype(int))
+            cv2.line(frame, pt1, pt2, color, thickness)
+    for i in range(len(keypoints)):
+        if keypoints[i, 2] > 0:
+            pt = tuple(keypoints[i, :2].astype(int))
+            cv2.circle(frame, pt, radius, color, -1)
+
+def pose_center(kp):
+    """(J, 3) pose -> (2,) mid-hip when both hips are visible, else the head joint, else None (as metrics.track_centers)."""
+    l_hip, r_hip, head = CENTER_JOINTS.get(len(kp), CENTER_JOINTS[17])
+    if len(kp) > max(l_hip, r_hip) and min(kp[l_hip, 2], kp[r_hip, 2]) > 0:
+        return (kp[l_hip, :2] + kp[r_hip, :2]) / 2.0
+    if len(kp) > head and kp[head, 2] > 0:
+        return kp[head, :2].astype(np.float64)
+    return None
+
+def draw_people(frame, people, id_a=2, id_b=1, plot_distance=False, H=None, missing_label=True):
+    """
+    people: (idx, (J, 3) pose) pairs. Everyone in gray with their id, id_a red, id_b blue,
+    optionally the distance between them (meters when H is given), and "ID Missing" when
+    either is absent (missing_label).
+    """
+    id_to_pose = {}
+    for idx_val, pose in people:
+        # context in gray
+        draw_skeleton(frame, pose, (180, 180, 180))
+        if pose[0, 2] > 0:
+            x, y = pose[0, :2].astype(int)
+            put_text_with_outline(frame, str(idx_val), (x, max(0, y - 10)), scale=0.6)
+        if idx_val in (id_a, id_b):
+            id_to_pose[idx_val] = pose
+
+    # Highlight tracked IDs
+    pose_A = id_to_pose.get(id_a)
+    pose_B = id_to_pose.get(id_b)
+    if pose_A is not None:
+        draw_skeleton(frame, pose_A, (0, 0, 255))
+    if pose_B is not None:
+        draw_skeleton(frame, pose_B, (255, 0, 0))
+
+    c1 = pose_center(pose_A) if pose_A is not None else None
+    c2 = pose_center(pose_B) if pose_B is not None else None
+    if plot_distance and (c1 is not None) and (c2 is not None):
+        if H is None:
+            label = f"{np.linalg.norm(c1 - c2):.1f}"
+        else:
+            m1, m2 = apply_homography(H, np.stack([c1, c2]))
+            label = f"{np.linalg.norm(m1 - m2):.2f} m"
+        x1, y1 = c1.astype(int)
+        x2, y2 = c2.astype(int)
+        cv2.line(frame, (x1, y1), (x2, y2), (0, 0, 0), 2, lineType=cv2.LINE_AA)
+        mx, my = ((x1 + x2) // 2, (y1 + y2) // 2)
+        put_text_with_outline(frame, label, (mx, my), scale=0.6)
+    elif missing_label and ((pose_A is None) or (pose_B is None)):
+        put_text_with_outline(frame, "ID Missing", (20, 40), scale=0.9)
+    return frame
+
+def draw_axes(frame, step=100, grid_color=(200, 200, 200)):
+    h, w = frame.shape[:2]
+    for x in range(0, w, step):
+        cv2.line(frame, (x, 0), (x, h), grid_color, 1)
+        put_text_with_outline(frame, str(x), (x + 2, 15))
+    for y in range(0, h, step):
+        cv2.line(frame, (0, y), (w, y), grid_color, 1)
+        put_text_with_outline(frame, str(y), (2, max(12, y - 2)))
+    cv2.line(frame, (0, 0), (w, 0), (0, 0, 0), 2)
+    cv2.line(frame, (0, 0), (0, h), (0, 0, 0), 2)
+    put_text_with_outline(frame, "X", (w - 20, 20), scale=0.6)
+    put_text_with_outline(frame, "Y", (10, h - 10), scale=0.6)
+
+def put_text_with_outline(frame, text, org, scale=0.4):
+    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (255, 255, 255), 3, lineType=cv2.LINE_AA)
+    cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (0, 0, 0), 1, lineType=cv2.LINE_AA)
@@ -0,0 +1,186 @@
+# triangulate.py — metric 3D joints from synchronized 2D tracks of calibrated cameras (batched DLT)
+#   python triangulate.py cameras.json bout3d.json [--fps 30 --relative --ref-view front]
+# Every camera in cameras.json (see multiview.py) needs a "projection": a JSON with a 3x4 "P"
+# or "K", "R", "t" (calibration.load_projection). The output carries pred_xyz_jts like
+# HybrIK's, so Pose3DPlayer / reader_3d play it; with --relative the joints are root-centred.
+import time
+import argparse
+import numpy as np
+
+from adapters import open_entry_writer, columns_to_entries
+from calibration import load_projection
+from columnar import save_columns
+from multiview import read_cameras, align_cameras
+from instrument import stage
+
+CONF_THR = 0.05           # 2D keypoints below this confidence are not used
+MIN_VIEWS = 2             # views that must see a joint for it to be triangulated
+MAX_REPROJ_PX = 25.0      # joints whose mean reprojection error is larger are dropped
+MIN_JOINTS = 0.5          # fraction of joints a person needs on a tick to be kept
+MAX_GAP = 5               # ticks of a missing joint filled by linear interpolation
+CHUNK_POINTS = 200_000    # points solved per batch (bounds the (N, 2V, 4) system memory)
+ROOT_JOINTS = {17: (11, 12), 24: (0,), 29: (0,)}   # mid-hip for COCO17, pelvis for SMPL
+
+# ----------------------------
+# Batched DLT
+# ----------------------------
+def _normalizer(size):
+    """3x3 map from pixels to roughly [-1, 1] (Hartley normalization keeps the solve well conditioned)."""
+    w, h = size if size[0] > 0 else (1000, 1000)
+    s = max(w, h) / 2.0
+    return np.array([[1 / s, 0, -w / (2 * s)], [0, 1 / s, -h / (2 * s)], [0, 0, 1]])
+
+def triangulate_points(xy, conf, P, sizes=None, conf_thr=CONF_THR, min_views=MIN_VIEWS):
+    """
+    xy (N, V, 2) pixels, conf (N, V), P (V, 3, 4) -> X (N, 3), views used (N,), mean reprojection
+    error in pixels (N,). Each point's 2V x 4 DLT system is weighted by confidence and solved for
+    X with W = 1 as one batched 3x3 linear solve; points seen by fewer than min_views are NaN.
+    """
+    xy = np.asarray(xy, dtype=np.float64)
+    conf = np.asarray(conf, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    V = P.shape[0]
+    T = np.stack([_normalizer(s) for s in (sizes if sizes is not None else [(0, 0)] * V)])
+    Pn = T @ P
+    Pn /= np.linalg.norm(Pn[:, 2, :3], axis=1)[:, None, None]
+    xyn = np.einsum("vij,nvj->nvi", T[:, :2, :2], xy) + T[None, :, :2, 2]
+
+    w = np.where((conf >= conf_thr) & np.isfinite(xy).all(-1), conf, 0.0)
+    used = (w > 0).sum(axis=1)
+    # rows x * p3 - p1 and y * p3 - p2 for every view
+    A = (xyn[..., None] * Pn[None, :, 2:3, :] - Pn[None, :, :2, :]) * w[..., None, None]
+    A = A.reshape(len(xy), 2 * V, 4)
+    M = np.einsum("nri,nrj->nij", A[..., :3], A[..., :3])
+    b = -np.einsum("nri,nr->ni", A[..., :3], A[..., 3])
+    ok = used >= min_views
+    M[~ok] = np.eye(3)
+    b[~ok] = 0.0
+    X = np.linalg.solve(M, b[..., None])[..., 0]
+    X[~ok] = np.nan
+
+    # reprojection error (pixels) over the views that were used
+    proj = np.einsum("vij,nj->nvi", P, np.concatenate([X, np.ones((len(X), 1))], axis=1))
+    err = np.linalg.norm(proj[..., :2] / proj[..., 2:3] - xy, axis=-1)
+    reproj = np.where(w > 0, err, 0.0).sum(axis=1) / np.maximum(used, 1)
+    reproj[~ok] = np.nan
+    return X, used, reproj
+
+def fill_gaps(xyz, valid, max_gap=MAX_GAP):
+    """Linearly interpolate runs of up to max_gap missing ticks along time. xyz (T, K, J, 3), valid (T, K, J)."""
+    T = xyz.shape[0]
+    if max_gap <= 0 or T < 3:
+        return xyz, valid
+    t = np.arange(T)
+    # distance (in ticks) to the previous / next valid sample, for every tick
+    idx = np.where(valid, t[:, None, None], -1)
+    prev = np.maximum.accumulate(idx, axis=0)
+    idx = np.where(valid, t[:, None, None], T)
+    nxt = np.minimum.accumulate(idx[::-1], axis=0)[::-1]
+    gap = ~valid & (prev >= 0) & (nxt < T) & (nxt - prev - 1 <= max_gap)
+    if not gap.any():
+        return xyz, valid
+    ti, ki, ji = np.nonzero(gap)
+    p, n = prev[gap], nxt[gap]
+    a = ((ti - p) / (n - p))[:, None]
+    out = xyz.copy()
+    out[ti, ki, ji] = (1 - a) * xyz[p, ki, ji] + a * xyz[n, ki, ji]
+    return out, valid | gap
+
+# ----------------------------
+# Multi-view store -> 3D columns
+# ----------------------------
+def triangulate_multiview(mv, projections, ref_view=0, relative=False, conf_thr=CONF_THR,
+                          min_views=MIN_VIEWS, max_reproj=MAX_REPROJ_PX, min_joints=MIN_JOINTS, max_gap=MAX_GAP):
+    """
+    Columns (see columnar.py) with one frame per tick and xyz = triangulated joints in the
+    cameras' world frame (meters), or root-centred with relative=True. keypoints/box/score
+    come from ref_view so the 2D readers still work on the result.
+    """
+    T, V, K, J = mv["keypoints"].shape[:4]
+    P = np.stack([np.asarray(p, dtype=np.float64) for p in projections])
+    if len(P) != V:
+        raise ValueError(f"{V} views but {len(P)} projections.")
+    kp = mv["keypoints"]
+    present = mv["present"]
+
+    # (T, V, K, J) -> points (T*K*J, V)
+    xy = kp[..., :2].transpose(0, 2, 3, 1, 4).reshape(-1, V, 2)
+    conf = np.where(present[..., None], kp[..., 2], 0.0).transpose(0, 2, 3, 1).reshape(-1, V)
+    X = np.full((len(xy), 3), np.nan)
+    reproj = np.full(len(xy), np.nan)
+    with stage("triangulate"):
+        for lo in range(0, len(xy), CHUNK_POINTS):
+            hi = lo + CHUNK_POINTS
+            X[lo:hi], _, reproj[lo:hi] = triangulate_points(xy[lo:hi], conf[lo:hi], P, mv["view_size"],
+                                                            conf_thr, min_views)
+    xyz = X.reshape(T, K, J, 3)
+    reproj = reproj.reshape(T, K, J)
+    measured = np.isfinite(reproj) & (reproj <= max_reproj)
+    xyz, valid = fill_gaps(np.where(measured[..., None], xyz, 0.0), measured, max_gap)
+
+    keep = valid.mean(axis=-1) >= min_joints
+    if relative:
+        rj = list(ROOT_JOINTS.get(J, (0,)))
+        n_root = valid[:, :, rj].sum(axis=-1)
+        root = (xyz[:, :, rj] * valid[:, :, rj, None]).sum(axis=2) / np.maximum(n_root, 1)[..., None]
+        xyz = xyz - root[:, :, None, :]
+        keep &= n_root > 0
+    xyz = np.where(valid[..., None] & keep[..., None, None], xyz, 0.0)
+
+    return {
+        "frame": np.arange(T, dtype=np.int64),
+        "image_id": np.array([f"{t}.jpg" for t in range(T)], dtype=str),
+        "track_id": mv["track_id"],
+        "keypoints": np.where(keep[..., None, None], mv["keypoints"][:, ref_view], 0).astype(np.float32),
+        "present": keep,
+        "score": np.where(keep, mv["score"][:, ref_view], 0).astype(np.float32),
+        "box": np.where(keep[..., None], mv["box"][:, ref_view], 0).astype(np.float32),
+        "xyz": xyz.astype(np.float32),
+        "xyz_valid": valid & keep[..., None],                              # False: joint could not be triangulated
+        "reproj_px": np.where(measured, reproj, np.nan).astype(np.float32),   # NaN: interpolated / missing
+    }
+
+def write_3d(cols, out_path):
+    """.npz keeps the columns (plus reproj_px); .json / .jsonl are AlphaPose entries with pred_xyz_jts."""
+    if out_path.endswith(".npz"):
+        save_columns(cols, out_path)
+        return out_path
+    writer = open_entry_writer(out_path)
+    try:
+        entries = columns_to_entries({k: v for k, v in cols.items() if k != "reproj_px"})
+        by_frame = {}
+        for e in entries:
+            by_frame.setdefault(e["image_id"], []).append(e)
+        for image_id in cols["image_id"]:
+            writer.write(by_frame.get(str(image_id), []))
+    finally:
+        writer.close()
+    return out_path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Triangulate synchronized 2D tracks from calibrated cameras into 3D")
+    ap.add_argument("cameras", help="cameras.json, every camera with a \"projection\"")
+    ap.add_argument("out", help=".json / .jsonl (entries with pred_xyz_jts) or .npz (columns)")
+    ap.add_argument("--fps", type=float, default=None, help="timeline fps (default: cameras.json, else fastest camera)")
+    ap.add_argument("--ref-view", default=None, help="camera whose 2D keypoints/boxes go with the 3D (default: first)")
+    ap.add_argument("--relative", action="store_true", help="root-centred joints, like HybrIK's pred_xyz_jts")
+    ap.add_argument("--max-reproj", type=float, default=MAX_REPROJ_PX)
+    args = ap.parse_args()
+
+    cams, spec_fps = read_cameras(args.cameras)
+    missing = [c["name"] for c in cams if not c.get("projection")]
+    if missing:
+        raise SystemExit(f"No \"projection\" for camera(s): {', '.join(missing)}")
+    mv = align_cameras(cams, args.fps or spec_fps)
+    names = [c["name"] for c in cams]
+    ref = names.index(args.ref_view) if args.ref_view else 0
+    t0 = time.perf_counter()
+    cols = triangulate_multiview(mv, [load_projection(c["projection"]) for c in cams], ref, args.relative,
+                                 max_reproj=args.max_reproj)
+    dt = time.perf_counter() - t0
+    n = cols["keypoints"].shape[0] * cols["keypoints"].shape[1] * cols["keypoints"].shape[2]
+    err = cols["reproj_px"]
+    print(f"{len(cams)} views, {len(cols['frame'])} ticks, {len(cols['track_id'])} tracks: "
+          f"{n} joints in {dt:.2f}s ({n / max(dt, 1e-9):,.0f}/s), "
+          f"median reprojection {np.nanmedian(err) if np.isfinite(err).any() else float('nan'):.2f} px")
+    print(f"Wrote {write_3d(cols, args.out)}")
@@ -1,11 +1,96 @@
 import cv2
 import os
+import shutil
+import subprocess
 from os import listdir
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 
-def make_video(name, original_video_path):
-    image_folder = 'AlphaPose_Code/output_plots'
-    output_video_path = f'Video_Outputs/{name}.mp4'
+from instrument import stage, count
+
+# ----------------------------
+# Encoder backends
+# ----------------------------
+# "mp4v" / "mjpg": cv2.VideoWriter (MJPG is much cheaper to encode but files are bigger)
+# "ffmpeg":        raw BGR frames piped to an ffmpeg subprocess (libx264, multi-threaded)
+ENCODERS = ("mp4v", "mjpg", "ffmpeg")
+DEFAULT_ENCODER = "mp4v"
+
+class OpenCVEncoder:
+    def __init__(self, path, fps, size, fourcc="mp4v"):
+        self.path = path
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"OpenCV could not open a '{fourcc}' writer for {path}")
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def release(self):
+        self.writer.release()
+
+class FFmpegEncoder:
+    def __init__(self, path, fps, size, codec="libx264", preset="veryfast", crf=23, threads=0):
+        exe = shutil.which("ffmpeg")
+        if exe is None:
+            raise RuntimeError("ffmpeg encoder selected but no ffmpeg executable was found on PATH.")
+        self.path = path
+        w, h = size
+        cmd = [
+            exe, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}", "-r", f"{fps}", "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # yuv420p needs even dimensions
+            "-c:v", codec, "-preset", str(preset), "-crf", str(crf), "-threads", str(threads),
+            "-pix_fmt", "yuv420p", path,
+        ]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.proc.stdin.write(frame.tobytes())
+
+    def release(self):
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.proc.returncode} while writing {self.path}")
+
+def open_encoder(backend, path, fps, size, **opts):
+    """size is (width, height). opts go to the ffmpeg backend (codec, preset, crf, threads)."""
+    if backend == "mp4v":
+        return OpenCVEncoder(path, fps, size, "mp4v")
+    if backend == "mjpg":
+        return OpenCVEncoder(path, fps, size, "MJPG")
+    if backend == "ffmpeg":
+        return FFmpegEncoder(path, fps, size, **opts)
+    raise ValueError(f"Unknown encoder '{backend}' (choose from {', '.join(ENCODERS)})")
+
+def video_extension(backend):
+    return ".avi" if backend == "mjpg" else ".mp4"
+
+# ----------------------------
+# Bounded, ordered prefetch
+# ----------------------------
+PREFETCH = 2 * (os.cpu_count() or 4)   # max frames decoded ahead of the writer
+
+def imap_bounded(executor, fn, items, window=PREFETCH):
+    """
+    Like executor.map(fn, items) but with at most `window` calls in flight: the next
+    read is only submitted once the writer has taken a frame, so memory stays flat
+    however long the clip is. Results come back in input order.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+# ----------------------------
+# PNG folder -> video
+# ----------------------------
+def make_video(name, original_video_path, encoder=DEFAULT_ENCODER,
+               image_folder='AlphaPose_Code/output_plots', output_dir='Video_Outputs', **encoder_opts):
+    output_video_path = os.path.join(output_dir, f'{name}{video_extension(encoder)}')
 
     def extract_frame_number(filename):
         try:
@@ -33,21 +118,22 @@ def make_video(name, original_video_path):
     fps = cap.get(cv2.CAP_PROP_FPS)
     cap.release()
 
-    # Use faster codec (optional: 'XVID' or 'MJPG' is faster than 'mp4v')
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    video_writer = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+    video_writer = open_encoder(encoder, output_video_path, fps, (width, height), **encoder_opts)
 
     # Precompute image paths
     image_paths = [os.path.join(image_folder, f) for f in image_files]
 
-    # Load all frames in parallel
+    # Load frames in parallel, a bounded window ahead of the writer
     def load_image(path):
         return cv2.imread(path)
 
-    with ThreadPoolExecutor() as executor:
-        for frame in executor.map(load_image, image_paths):
-            if frame is not None:
-                video_writer.write(frame)
-
-    video_writer.release()
+    try:
+        with stage("encode"), ThreadPoolExecutor() as executor:
+            for frame in imap_bounded(executor, load_image, image_paths):
+                if frame is not None:
+                    video_writer.write(frame)
+                    count("encoded_frames")
+    finally:
+        video_writer.release()
     print(f"✅ Video saved to {output_video_path} at {fps:.2f} FPS")
+    return output_video_path
@@ -1,6 +1,9 @@
-import json, os, time
+import json, os, sys, time
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AlphaPose_Code"))
+from frameindex import indexed_frames, read_frames
+
 
 
 
@@ -106,18 +109,12 @@ def filecleanupsingle(input_path, output_dir, target_id, selected=None, prefix="
     """
     os.makedirs(output_dir, exist_ok=True)
 
-    # Load & group by frame
-    with open(input_path, "r") as f:
-        data = json.load(f)
-    framedata = defaultdict(list)
-    for entry in data:
-        framedata[entry["image_id"]].append(entry)
-
-    # Sort frames and resolve selection
-    sorted_frame_keys = sorted(framedata.keys(), key=frame_number)
+    # Frame keys come from the byte-offset sidecar; only the selected frames are parsed
+    sorted_frame_keys, _ = indexed_frames(input_path)
     if not sorted_frame_keys:
         raise RuntimeError("No frames found in the selected JSON.")
     keep_keys = _resolve_selected_keys(sorted_frame_keys, selected)
+    framedata = read_frames(input_path, image_ids=keep_keys if keep_keys else None)
 
     # Write one file per frame where target_id appears
     written = 0
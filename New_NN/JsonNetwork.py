@@ -1,15 +1,36 @@
-import os, json, glob
+import os, json, time, random, hashlib
+import numpy as np
 import torch
+from concurrent.futures import ThreadPoolExecutor
 from torch import nn
 from torch.utils.data import Dataset, DataLoader
-import matplotlib.pyplot as plt 
+from functools import partial
+
+from augment import augment_batch
 # ---- Settings ----
 batch_size = 8
 epochs = 25
 learning_rate = 1e-3
-num_classes = 3
 NUM_KPTS = 29        # change if your JSONs have a different count
 USE_XY_ONLY = True   # if your JSON has [x,y,score], set True to use XY only
+AUGMENT = True       # random rotate/scale/flip/dropout/jitter on each training batch (see augment.py)
+USE_PACKED_FEATURES = True   # packed datasets built with --kinematics train on those features instead of keypoints
+TRAIN_DIR = 'New_NN/dataset/train'
+TEST_DIR = 'New_NN/dataset/test'
+
+# ---- Checkpoints / artifact ----
+CHECKPOINT_DIR = 'New_NN/checkpoints'   # last.pt (resume point) is rewritten every CHECKPOINT_EVERY epochs
+CHECKPOINT_EVERY = 1
+PATIENCE = 5                            # stop after this many epochs without a better test loss (None = never)
+MODEL_PATH = 'New_NN/posenet.pt'        # best weights + everything needed to preprocess for them
+
+# ---- Data loading ----
+MANIFEST_FILE = ".manifest.json"   # per dataset root: paths, labels, sizes, mtimes
+SAMPLE_CACHE = ".samples.npz"      # per dataset root: normalized samples, keyed to the manifest
+LOAD_THREADS = 16                  # threads reading sample JSONs on first use
+num_workers = 0                    # DataLoader worker processes
+pin_memory = torch.cuda.is_available()
+persistent_workers = True          # keep workers alive between epochs (only when num_workers > 0)
 
 # ---- Utilities: extract & normalize keypoints ----
 def extract_keypoints(obj):
@@ -51,7 +72,6 @@ def normalize_xy_flat(flat):
     else:
         xy = flat[:]
 
-    import numpy as np
     arr = np.array(xy, dtype="float32").reshape(NUM_KPTS, 2)
 
     # indices (COCO17): L hip=11, R hip=12, L shoulder=5, R shoulder=6
@@ -76,53 +96,203 @@ def normalize_xy_flat(flat):
 
     return arr.reshape(-1).astype("float32")
 
+# ---- Dataset manifest (what's on disk) ----
+def _scan_class(root_dir, cname):
+    with os.scandir(os.path.join(root_dir, cname)) as it:
+        return [(f"{cname}/{e.name}", e.stat().st_size, e.stat().st_mtime_ns)
+                for e in it if e.is_file() and e.name.endswith(".json")]
+
+def build_manifest(root_dir, classes=None):
+    """
+    {"classes", "samples": [[relpath, label, size, mtime_ns], ...]} for root_dir from one
+    scandir/stat pass per class folder (one thread per class; no file is opened). Editing,
+    adding or removing any sample changes the listing, and with it the SAMPLE_CACHE key.
+    MANIFEST_FILE is rewritten only when the listing changed.
+    """
+    classes = classes or sorted(d for d in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, d)))
+    present = [c for c in classes if os.path.isdir(os.path.join(root_dir, c))]
+    with ThreadPoolExecutor(max_workers=max(1, len(present))) as executor:
+        scans = dict(zip(present, executor.map(lambda c: _scan_class(root_dir, c), present)))
+    samples = [[rel, ci, size, mtime] for ci, c in enumerate(classes) if c in scans
+               for rel, size, mtime in sorted(scans[c])]
+    manifest = {"classes": classes, "samples": samples}
+
+    path = os.path.join(root_dir, MANIFEST_FILE)
+    try:
+        with open(path, "r") as f:
+            if json.load(f) == manifest:
+                return manifest
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+    except OSError:
+        pass  # read-only dataset: nothing to record
+    return manifest
+
+def sample_features(flat):
+    """One person's raw flat keypoints -> the normalized feature vector the model sees."""
+    if USE_XY_ONLY:
+        return normalize_xy_flat(flat)
+    # keep xyz/score but still center/scale XY; append score back
+    # simple route: normalize with XY-only then re-attach scores as-is
+    xy_norm = normalize_xy_flat(flat)
+    scores = []
+    if len(flat) == NUM_KPTS * 3:
+        scores = [flat[i] for i in range(2, len(flat), 3)]
+    return np.concatenate([xy_norm, np.array(scores, dtype="float32")]) if scores else xy_norm
+
+def load_sample(path):
+    """One sample JSON -> normalized feature vector."""
+    with open(path, "r") as f:
+        obj = json.load(f)
+    return sample_features(extract_keypoints(obj))
+
 # ---- Dataset for JSON keypoints in class folders ----
 class KeypointsFolder(Dataset):
-    def __init__(self, root_dir):
+    """
+    Samples are listed from the manifest (a stat pass) at construction; nothing is opened until
+    first use, when every sample is read and validated on a thread pool and kept in memory.
+    The normalized arrays are cached in SAMPLE_CACHE, so later runs skip the JSON reads
+    until the manifest (any file's size or mtime) or the preprocessing settings change.
+    Pass `classes` (e.g. train_data.classes) so a split missing a class keeps the same labels.
+    """
+    def __init__(self, root_dir, classes=None):
         self.root_dir = root_dir
-        # class subfolders
-        self.classes = sorted([d for d in os.listdir(root_dir) if os.path.isdir(os.path.join(root_dir, d))])
-        self.samples = []  # (json_path, class_idx)
-        for ci, cname in enumerate(self.classes):
-            for p in glob.glob(os.path.join(root_dir, cname, "*.json")):
-                self.samples.append((p, ci))
+        manifest = build_manifest(root_dir, classes)
+        self.classes = manifest["classes"]
+        self.samples = [(os.path.join(root_dir, rel), ci) for rel, ci, _, _ in manifest["samples"]]
+        self.key = hashlib.sha1(json.dumps([manifest["samples"], NUM_KPTS, USE_XY_ONLY]).encode()).hexdigest()
+        self.X = None
+        self.y = None
 
         # input dimension (XY only or XYZ/conf kept)
         self.in_dim = NUM_KPTS * (2 if USE_XY_ONLY else 3)
+        self.feature_names = None   # keypoint samples (see PackedKeypoints)
+
+    def load(self):
+        """Read + validate every sample (first use only); drops unreadable/malformed files."""
+        if self.X is not None:
+            return self
+        cache = os.path.join(self.root_dir, SAMPLE_CACHE)
+        try:
+            with np.load(cache, allow_pickle=False) as z:
+                if str(z["key"]) == self.key:
+                    self.X, self.y, keep = z["X"], z["y"], z["keep"]
+                    self.samples = [s for s, k in zip(self.samples, keep) if k]
+                    return self
+        except (OSError, KeyError, ValueError):
+            pass
+
+        def read(sample):
+            try:
+                x = load_sample(sample[0])
+            except (OSError, ValueError, KeyError, IndexError, TypeError):
+                return None
+            return x if x.shape == (self.in_dim,) and np.isfinite(x).all() else None
+
+        with ThreadPoolExecutor(max_workers=LOAD_THREADS) as executor:
+            xs = list(executor.map(read, self.samples))
+        keep = np.array([x is not None for x in xs], dtype=bool)
+        if len(keep) and not keep.any():
+            raise ValueError(f"{self.root_dir}: none of the {len(keep)} samples could be read as "
+                             f"{NUM_KPTS}-joint keypoints (check NUM_KPTS)")
+        if not keep.all():
+            print(f"{self.root_dir}: skipped {int((~keep).sum())} unreadable/malformed samples")
+        self.X = np.stack([x for x in xs if x is not None]) if keep.any() else np.zeros((0, self.in_dim), "float32")
+        self.y = np.array([s[1] for s, k in zip(self.samples, keep) if k], dtype=np.int64)
+        self.samples = [s for s, k in zip(self.samples, keep) if k]
+        try:
+            np.savez(cache, key=self.key, X=self.X, y=self.y, keep=keep)
+        except OSError:
+            pass
+        return self
 
     def __len__(self):
-        return len(self.samples)
+        return len(self.load().X)
 
     def __getitem__(self, idx):
-        path, label = self.samples[idx]
-        with open(path, "r") as f:
-            obj = json.load(f)
-        flat = extract_keypoints(obj)
+        self.load()
+        return torch.from_numpy(self.X[idx]), int(self.y[idx])
 
-        if USE_XY_ONLY:
-            x = normalize_xy_flat(flat)
+class PackedKeypoints(Dataset):
+    """
+    Packed .npz dataset written by build_dataset.py (raw keypoints + labels in one file).
+    Normalized once at load; `classes` remaps labels onto another split's class list.
+    When the file also has kinematics features (--kinematics), those are the model input.
+    """
+    def __init__(self, path, classes=None):
+        with np.load(path, allow_pickle=False) as z:
+            raw, label, own = z["keypoints"], z["label"], z["classes"].tolist()
+            num_joints = int(z["num_joints"]) if "num_joints" in z.files else raw.shape[1] // 3
+            packed = USE_PACKED_FEATURES and "features" in z.files
+            features = z["features"].astype("float32") if packed else None
+            self.feature_names = z["feature_names"].tolist() if packed else None
+        self.classes = list(classes) if classes else own
+        remap = np.array([self.classes.index(c) if c in self.classes else -1 for c in own], dtype=np.int64)
+        if features is not None:
+            # kinematics features (build_dataset.py --kinematics) are already scaled
+            self.in_dim = features.shape[1]
+            xs = [x if np.isfinite(x).all() else None for x in features]
         else:
-            # keep xyz/score but still center/scale XY; append score back
-            # simple route: normalize with XY-only then re-attach scores as-is
-            xy_norm = normalize_xy_flat(flat)
-            scores = []
-            if len(flat) == NUM_KPTS * 3:
-                scores = [flat[i] for i in range(2, len(flat), 3)]
-            import numpy as np
-            x = np.concatenate([xy_norm, np.array(scores, dtype="float32")]) if scores else xy_norm
+            if num_joints != NUM_KPTS:
+                raise ValueError(f"{path} holds {num_joints}-joint keypoints but NUM_KPTS = {NUM_KPTS}; "
+                                 f"set NUM_KPTS = {num_joints} (or rebuild the dataset from {NUM_KPTS}-joint sessions)")
+            self.in_dim = NUM_KPTS * (2 if USE_XY_ONLY else 3)
+            xs = []
+            for row in raw:
+                try:
+                    x = sample_features(row.tolist())
+                except ValueError:
+                    x = None
+                xs.append(x if x is not None and x.shape == (self.in_dim,) and np.isfinite(x).all() else None)
+        keep = np.array([x is not None for x in xs], dtype=bool) & (remap[label] >= 0)
+        if not keep.all():
+            print(f"{path}: skipped {int((~keep).sum())} malformed or unknown-class samples")
+        self.X = np.stack([x for x, k in zip(xs, keep) if k]) if keep.any() else np.zeros((0, self.in_dim), "float32")
+        self.y = remap[label][keep]
 
-        return torch.from_numpy(x), label
+    def load(self):
+        return self
 
-# ---- Build datasets & loaders ----
-train_data = KeypointsFolder(root_dir='New_NN/dataset/train')
-test_data  = KeypointsFolder(root_dir='New_NN/dataset/test')
+    def __len__(self):
+        return len(self.X)
+
+    def __getitem__(self, idx):
+        return torch.from_numpy(self.X[idx]), int(self.y[idx])
 
-train_loader = DataLoader(train_data, batch_size=batch_size, shuffle=True)
-test_loader  = DataLoader(test_data, batch_size=batch_size)
+def open_dataset(path, classes=None):
+    """Class-folder tree of sample JSONs, or a packed .npz from build_dataset.py."""
+    return PackedKeypoints(path, classes) if path.endswith(".npz") else KeypointsFolder(path, classes)
 
-# ---- Model (MLP on flattened keypoints) ----
-INPUT_SIZE = len(train_data[0][0])  # inferred from dataset
+def make_loader(dataset, shuffle=False):
+    """DataLoader with the worker/pinning settings above."""
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, num_workers=num_workers,
+                      pin_memory=pin_memory, persistent_workers=persistent_workers and num_workers > 0)
 
+def check_inputs(feature_names, dataset, what="dataset"):
+    """Raise unless `dataset` yields the inputs named by feature_names (None = normalized keypoints)."""
+    want = list(feature_names) if feature_names else None
+    have = list(dataset.feature_names) if dataset.feature_names else None
+    if want == have:
+        return
+    if want is None:
+        raise ValueError(f"{what} holds kinematics features but keypoint inputs are expected "
+                         f"(set USE_PACKED_FEATURES = False, or use a keypoint dataset)")
+    if have is None:
+        raise ValueError(f"{what} holds keypoint samples but the model takes {len(want)} kinematics features "
+                         f"(use a packed .npz built with build_dataset.py --kinematics)")
+    raise ValueError(f"{what} has different kinematics features than expected ({len(have)} vs {len(want)})")
+
+# ---- Build datasets ----
+def build_datasets(train_dir=TRAIN_DIR, test_dir=TEST_DIR):
+    train_data = open_dataset(train_dir)
+    test_data  = open_dataset(test_dir, classes=train_data.classes)
+    check_inputs(train_data.feature_names, test_data, f"test set {test_dir}")
+    return train_data, test_data
+
+# ---- Model (MLP on flattened keypoints) ----
 class PoseNet(nn.Module):
     def __init__(self, in_dim, num_classes):
         super().__init__()
@@ -136,19 +306,13 @@ class PoseNet(nn.Module):
     def forward(self, x):
         return self.net(x)
 
-model = PoseNet(INPUT_SIZE, num_classes)
-
-# ---- Loss/Opt ----
-loss_fn = nn.CrossEntropyLoss()
-optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
-
-# ---- Training / Testing (same as your loops) ----
-train_losses, test_accuracies = [], []
-
-def train_loop(dataloader, model, loss_fn, optimizer):
+# ---- Training / Testing ----
+def train_loop(dataloader, model, loss_fn, optimizer, augment=None):
     model.train()
     total = 0.0
     for batch, (X, y) in enumerate(dataloader):
+        if augment is not None:
+            X = augment(X)  # whole collated batch at once
         pred = model(X)
         loss = loss_fn(pred, y)
         total += loss.item()
@@ -157,7 +321,7 @@ def train_loop(dataloader, model, loss_fn, optimizer):
         optimizer.zero_grad()
         if batch % 10 == 0:
             print(f"loss: {loss.item():.4f}")
-    train_losses.append(total / len(dataloader))
+    return total / max(1, len(dataloader))
 
 @torch.no_grad()
 def test_loop(dataloader, model, loss_fn):
@@ -168,40 +332,173 @@ def test_loop(dataloader, model, loss_fn):
         pred = model(X)
         total_loss += loss_fn(pred, y).item()
         correct += (pred.argmax(1) == y).sum().item()
-    acc = 100.0 * correct / size
-    test_accuracies.append(acc)
-    print(f"Test Accuracy: {acc:.2f}% | Avg Loss: {total_loss / len(dataloader):.4f}")
-
-for epoch in range(epochs):
-    print(f"\nEpoch {epoch+1}")
-    train_loop(train_loader, model, loss_fn, optimizer)
-    test_loop(test_loader, model, loss_fn)
-
-# ---- Single prediction demo ----
-label_map = train_data.classes
-sample, label = test_data[0]
-model.eval()
-with torch.no_grad():
-    pred = model(sample.unsqueeze(0))
-    pred_label = label_map[pred.argmax(1).item()]
-print(f"\nPredicted: {pred_label}, Actual: {label_map[label]}")
-
-# --- Plot Loss and Accuracy ---
-plt.figure(figsize=(10, 4))
-
-plt.subplot(1, 2, 1)
-plt.plot(train_losses, label="Train Loss")
-plt.xlabel("Epoch")
-plt.ylabel("Loss")
-plt.title("Training Loss")
-plt.grid(True)
-
-plt.subplot(1, 2, 2)
-plt.plot(test_accuracies, label="Test Accuracy", color='green')
-plt.xlabel("Epoch")
-plt.ylabel("Accuracy (%)")
-plt.title("Test Accuracy")
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+    acc = 100.0 * correct / max(1, size)
+    avg_loss = total_loss / max(1, len(dataloader))
+    print(f"Test Accuracy: {acc:.2f}% | Avg Loss: {avg_loss:.4f}")
+    return acc, avg_loss
+
+# ---- Checkpoints ----
+def _rng_state():
+    return {"torch": torch.get_rng_state(), "numpy": np.random.get_state(), "python": random.getstate(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None}
+
+def _set_rng_state(state):
+    torch.set_rng_state(state["torch"])
+    np.random.set_state(state["numpy"])
+    random.setstate(state["python"])
+    if state.get("cuda") is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+def run_signature(dataset):
+    """What a checkpoint must match to be resumed: input width, classes and input kind."""
+    return {"in_dim": int(dataset.in_dim), "classes": list(dataset.classes),
+            "features": list(dataset.feature_names) if dataset.feature_names else None}
+
+def save_checkpoint(path, model, optimizer, epoch, history, best, signature=None):
+    """Model + optimizer + finished epoch + RNG state (+ run_signature); written to a temp file then renamed."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    torch.save({"model": model.state_dict(), "optimizer": optimizer.state_dict(), "epoch": epoch,
+                "history": history, "best": best, "rng": _rng_state(), "signature": signature}, tmp)
+    os.replace(tmp, path)  # an interrupted save never clobbers the previous checkpoint
+
+def load_checkpoint(path, model, optimizer, signature=None):
+    """
+    Restore a save_checkpoint() file in place; returns (next_epoch, history, best).
+    With a signature, refuses a checkpoint from a run with other inputs or classes.
+    """
+    ckpt = torch.load(path, map_location="cpu", weights_only=False)
+    if signature is not None and ckpt.get("signature") != signature:
+        theirs = ckpt.get("signature") or {}
+        raise ValueError(f"{path} is from a different run (in_dim {theirs.get('in_dim')}, classes {theirs.get('classes')}; "
+                         f"now in_dim {signature['in_dim']}, classes {signature['classes']}). "
+                         f"Delete it or call train(resume=False).")
+    model.load_state_dict(ckpt["model"])
+    optimizer.load_state_dict(ckpt["optimizer"])
+    _set_rng_state(ckpt["rng"])
+    return ckpt["epoch"] + 1, ckpt["history"], ckpt["best"]
+
+# ---- Model artifact (inference) ----
+def save_model(path, model, classes, feature_names=None):
+    """Weights plus the preprocessing config they were trained with (feature_names: packed kinematics input)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    in_dim = model.net[0].in_features
+    torch.save({"state_dict": model.state_dict(), "in_dim": in_dim, "num_classes": model.net[-1].out_features,
+                "classes": list(classes),
+                "config": {"NUM_KPTS": NUM_KPTS, "USE_XY_ONLY": USE_XY_ONLY,
+                           "normalization": "xy centered on mid-hip (11,12), scaled by shoulder width (5,6)",
+                           "features": feature_names}},
+               path)
+    return path
+
+def load_model(path=MODEL_PATH):
+    """(model in eval mode, artifact dict) — no dataset or training needed."""
+    art = torch.load(path, map_location="cpu", weights_only=False)
+    cfg = art["config"]
+    if cfg["NUM_KPTS"] != NUM_KPTS or cfg["USE_XY_ONLY"] != USE_XY_ONLY:
+        raise ValueError(f"{path} was trained with NUM_KPTS={cfg['NUM_KPTS']}, USE_XY_ONLY={cfg['USE_XY_ONLY']}; "
+                         f"this module is set to NUM_KPTS={NUM_KPTS}, USE_XY_ONLY={USE_XY_ONLY}")
+    model = PoseNet(art["in_dim"], art["num_classes"])
+    model.load_state_dict(art["state_dict"])
+    model.eval()
+    return model, art
+
+@torch.no_grad()
+def predict(model, classes, flat_keypoints):
+    """
+    Class name for one person's raw keypoints ([x1,y1,s1, ...] as in the sample JSONs).
+    A model trained on kinematics features (art["config"]["features"]) takes
+    kinematics.feature_matrix rows directly instead: model(torch.from_numpy(rows)).
+    """
+    expected = NUM_KPTS * (2 if USE_XY_ONLY else 3)
+    if model.net[0].in_features != expected:
+        raise ValueError(f"model takes {model.net[0].in_features} inputs, not {NUM_KPTS}-joint keypoints "
+                         f"({expected}); a kinematics-feature model needs feature_matrix rows")
+    x = torch.from_numpy(sample_features(flat_keypoints)).unsqueeze(0)
+    return classes[model(x).argmax(1).item()]
+
+# ---- Train / resume ----
+def train(epochs=epochs, train_dir=TRAIN_DIR, test_dir=TEST_DIR, checkpoint_dir=CHECKPOINT_DIR,
+          resume=True, patience=PATIENCE, checkpoint_every=CHECKPOINT_EVERY, model_path=MODEL_PATH, seed=0):
+    """
+    Train PoseNet, resuming from checkpoint_dir/last.pt when it exists (and resume=True); a
+    checkpoint from a run with another input width, class list or input kind raises instead.
+    The best test-loss weights are saved to model_path as they appear; training stops early
+    after `patience` epochs without improvement. Returns (model, history, classes).
+    """
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    random.seed(seed)
+    train_data, test_data = build_datasets(train_dir, test_dir)
+    train_loader = make_loader(train_data, shuffle=True)
+    test_loader  = make_loader(test_data)
+
+    model = PoseNet(train_data.in_dim, len(train_data.classes))  # sizes come from the data
+    loss_fn = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    # augmentation moves keypoints; kinematics features have no joint layout to rotate/flip
+    augment = partial(augment_batch, num_joints=NUM_KPTS) if AUGMENT and not train_data.feature_names else None
+
+    last = os.path.join(checkpoint_dir, "last.pt")
+    start, history = 0, {"train_loss": [], "test_acc": [], "test_loss": [], "epoch_seconds": []}
+    best = {"test_loss": float("inf"), "epoch": -1}
+    signature = run_signature(train_data)
+    if resume and os.path.exists(last):
+        start, history, best = load_checkpoint(last, model, optimizer, signature)
+        print(f"Resuming from {last} at epoch {start + 1}")
+
+    for epoch in range(start, epochs):
+        if patience is not None and epoch - best["epoch"] > patience:
+            print(f"Early stop: no better test loss since epoch {best['epoch'] + 1}")
+            break
+        print(f"\nEpoch {epoch+1}")
+        t0 = time.perf_counter()
+        history["train_loss"].append(train_loop(train_loader, model, loss_fn, optimizer, augment))
+        acc, test_loss = test_loop(test_loader, model, loss_fn)
+        history["test_acc"].append(acc)
+        history["test_loss"].append(test_loss)
+        history["epoch_seconds"].append(time.perf_counter() - t0)
+
+        if test_loss < best["test_loss"]:
+            best = {"test_loss": test_loss, "test_acc": acc, "epoch": epoch}
+            save_model(model_path, model, train_data.classes, train_data.feature_names)
+        if (epoch + 1) % checkpoint_every == 0 or epoch + 1 == epochs:
+            save_checkpoint(last, model, optimizer, epoch, history, best, signature)
+
+    return model, history, train_data.classes
+
+def plot_history(history):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 4))
+
+    plt.subplot(1, 2, 1)
+    plt.plot(history["train_loss"], label="Train Loss")
+    plt.xlabel("Epoch")
+    plt.ylabel("Loss")
+    plt.title("Training Loss")
+    plt.grid(True)
+
+    plt.subplot(1, 2, 2)
+    plt.plot(history["test_acc"], label="Test Accuracy", color='green')
+    plt.xlabel("Epoch")
+    plt.ylabel("Accuracy (%)")
+    plt.title("Test Accuracy")
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    model, history, label_map = train()
+
+    # ---- Single prediction demo (best weights, loaded the way inference would) ----
+    best_model, art = load_model(MODEL_PATH)
+    test_data = open_dataset(TEST_DIR, classes=art["classes"])
+    check_inputs(art["config"].get("features"), test_data, f"test set {TEST_DIR}")
+    sample, label = test_data[0]
+    with torch.no_grad():
+        pred_label = art["classes"][best_model(sample.unsqueeze(0)).argmax(1).item()]
+    print(f"\nPredicted: {pred_label}, Actual: {label_map[label]}")
+
+    plot_history(history)
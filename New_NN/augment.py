@@ -0,0 +1,68 @@
+# augment.py — batched pose augmentation for PoseNet training, applied to whole collated batches
+import math
+import torch
+
+# ---- Defaults (normalized units: centered on the hips, 1.0 = shoulder width) ----
+ROTATE_DEG = 15.0          # uniform in [-ROTATE_DEG, ROTATE_DEG]
+SCALE = (0.9, 1.1)         # uniform scale range
+FLIP_P = 0.5               # horizontal flip (with left/right joint swap)
+DROPOUT_P = 0.05           # per joint: zeroed, i.e. moved onto the root, as a missed detection
+JITTER = 0.02              # Gaussian noise sigma
+
+# ---- Left/right joint pairs ----
+COCO17_FLIP = [(1, 2), (3, 4), (5, 6), (7, 8), (9, 10), (11, 12), (13, 14), (15, 16)]
+SMPL24_FLIP = [(1, 2), (4, 5), (7, 8), (10, 11), (13, 14), (16, 17), (18, 19), (20, 21), (22, 23)]
+# HybrIK 29 = SMPL 24 + head, left/right middle finger, left/right big toe
+SMPL29_FLIP = SMPL24_FLIP + [(25, 26), (27, 28)]
+FLIP_PAIRS = {17: COCO17_FLIP, 24: SMPL24_FLIP, 29: SMPL29_FLIP}
+
+def flip_permutation(num_joints):
+    """Index list mapping each joint to its mirror partner (itself for center joints)."""
+    if num_joints not in FLIP_PAIRS:
+        raise ValueError(f"No left/right joint pairs known for {num_joints} joints (have {sorted(FLIP_PAIRS)})")
+    perm = list(range(num_joints))
+    for a, b in FLIP_PAIRS[num_joints]:
+        perm[a], perm[b] = b, a
+    return perm
+
+def augment_batch(X, num_joints, rotate_deg=ROTATE_DEG, scale=SCALE, flip_p=FLIP_P,
+                  dropout_p=DROPOUT_P, jitter=JITTER, generator=None):
+    """
+    X: (B, num_joints*2) normalized xy features, optionally followed by num_joints scores
+    (JsonNetwork with USE_XY_ONLY=False). Returns a new tensor of the same shape; every
+    sample gets its own random rotation, scale, flip, dropout and jitter, all drawn in a
+    handful of batched ops.
+    """
+    B = X.shape[0]
+    dev, dt = X.device, X.dtype
+    xy = X[:, :num_joints * 2].reshape(B, num_joints, 2)
+    rest = X[:, num_joints * 2:]
+
+    def rand(*shape):
+        return torch.rand(*shape, generator=generator, device=dev, dtype=dt)
+
+    # flip: mirror x, then swap left/right joints
+    if flip_p > 0:
+        flip = rand(B) < flip_p
+        mirrored = xy[:, flip_permutation(num_joints)] * torch.tensor([-1.0, 1.0], device=dev, dtype=dt)
+        xy = torch.where(flip[:, None, None], mirrored, xy)
+        if rest.shape[1] == num_joints:
+            rest = torch.where(flip[:, None], rest[:, flip_permutation(num_joints)], rest)
+
+    # rotation + scale as one (B, 2, 2) matrix per sample
+    theta = (rand(B) * 2 - 1) * math.radians(rotate_deg)
+    s = scale[0] + rand(B) * (scale[1] - scale[0])
+    cos, sin = torch.cos(theta) * s, torch.sin(theta) * s
+    M = torch.stack([torch.stack([cos, -sin], -1), torch.stack([sin, cos], -1)], -2)
+    xy = torch.einsum("bij,bkj->bki", M, xy)
+
+    if jitter > 0:
+        xy = xy + torch.randn(xy.shape, generator=generator, device=dev, dtype=dt) * jitter
+
+    if dropout_p > 0:
+        keep = rand(B, num_joints) >= dropout_p
+        xy = xy * keep[..., None]
+        if rest.shape[1] == num_joints:
+            rest = rest * keep
+
+    return torch.cat([xy.reshape(B, -1), rest], dim=1)
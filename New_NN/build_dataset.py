@@ -0,0 +1,147 @@
+# build_dataset.py — labeled segments of repaired sessions -> one packed .npz training set
+#   python New_NN/build_dataset.py annotations.csv New_NN/dataset/train.npz
+#
+# annotations: CSV with a header row, or a JSON list of objects, with the fields
+#   session      path to the session (AlphaPose .json, .jsonl, .npz columns, .qca archive)
+#   track_id     the fighter's idx in that (repaired) session
+#   start_frame  first frame number of the segment (inclusive)
+#   end_frame    last frame number of the segment (inclusive)
+#   label        class name, e.g. stand / on_floor
+import os
+import sys
+import csv
+import json
+import argparse
+import numpy as np
+from functools import partial
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "AlphaPose_Code"))
+from frameindex import load_frame_index, read_frames
+from adapters import load_session
+from columnar import entries_to_columns
+from kinematics import compute_kinematics, feature_matrix, feature_names_for
+from metrics import DEFAULT_FPS
+
+# ---- Packed dataset format ----
+# keypoints (N, J*3) float32  raw x, y, score per joint (what the sample JSONs hold)
+# num_joints ()      int64    J (JsonNetwork.NUM_KPTS has to match it)
+# label     (N,)     int64    index into classes
+# classes   (C,)     str
+# session   (N,)     int64    index into sessions
+# sessions  (S,)     str
+# track_id  (N,)     int64
+# image_id  (N,)     str
+# with --kinematics:
+# features       (N, D) float32  kinematics.feature_matrix row for the sample (angles, velocities, ...)
+# feature_names  (D,)   str
+
+def read_annotations(path):
+    if path.endswith(".json"):
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+    return [{"session": r["session"], "track_id": int(r["track_id"]), "start_frame": int(r["start_frame"]),
+             "end_frame": int(r["end_frame"]), "label": str(r["label"]).strip()} for r in rows]
+
+def _segment_columns(session, segments):
+    """
+    Columns holding every frame inside some segment (plus one frame either side, so time
+    derivatives at a segment's edges see real neighbours). AlphaPose JSON goes through the
+    frame index, so only those frames are read; other formats are loaded whole.
+    """
+    if not session.endswith(".json"):
+        return load_session(session)
+    index = load_frame_index(session)
+    frames = index["frame"]
+    wanted = np.zeros(len(frames), dtype=bool)
+    for seg in segments:
+        wanted |= (frames >= seg["start_frame"] - 1) & (frames <= seg["end_frame"] + 1)
+    by_image = read_frames(session, image_ids=index["image_id"][wanted].tolist(), index=index)
+    return entries_to_columns([e for entries in by_image.values() for e in entries])
+
+def extract_session(session, segments, kinematics=False, fps=DEFAULT_FPS):
+    """
+    All samples for one session's segments in one pass: (keypoints list, segment index, track,
+    image_id, kinematics feature row or None).
+    """
+    cols = _segment_columns(session, segments)
+    feats = feature_matrix(compute_kinematics(cols, fps, use_3d=False)) if kinematics else None  # 2D, like the keypoints
+    col_of = {int(t): k for k, t in enumerate(cols["track_id"])}
+    out = []
+    for si, seg in enumerate(segments):
+        k = col_of.get(seg["track_id"])
+        if k is None:
+            continue
+        rows = np.nonzero((cols["frame"] >= seg["start_frame"]) & (cols["frame"] <= seg["end_frame"])
+                          & cols["present"][:, k])[0]
+        for fi in rows:
+            out.append((cols["keypoints"][fi, k].reshape(-1).tolist(), si, seg["track_id"], str(cols["image_id"][fi]),
+                        feats[fi, k] if feats is not None else None))
+    return out
+
+def build_packed(annotations, out_path, classes=None, workers=None, kinematics=False, fps=DEFAULT_FPS):
+    """
+    Extract every annotated segment (sessions in parallel) and write the packed .npz.
+    kinematics=True also stores each sample's kinematics features (see kinematics.py).
+    """
+    by_session = defaultdict(list)
+    for a in annotations:
+        by_session[a["session"]].append(a)
+    sessions = sorted(by_session)
+    classes = list(classes) if classes else sorted({a["label"] for a in annotations})
+    class_of = {c: i for i, c in enumerate(classes)}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(partial(extract_session, kinematics=kinematics, fps=fps),
+                                    sessions, [by_session[s] for s in sessions]))
+
+    kps, labels, sess, tracks, image_ids, feats = [], [], [], [], [], []
+    for s_i, (session, samples) in enumerate(zip(sessions, results)):
+        segs = by_session[session]
+        for kp, seg_i, tid, image_id, feat in samples:
+            kps.append(kp)
+            feats.append(feat)
+            labels.append(class_of[segs[seg_i]["label"]])
+            sess.append(s_i)
+            tracks.append(tid)
+            image_ids.append(image_id)
+        print(f"{session}: {len(samples)} samples from {len(segs)} segment(s)")
+    if not kps:
+        raise RuntimeError("No samples matched the annotations (check track ids and frame ranges).")
+
+    widths = sorted({len(k) for k in kps})
+    if len(widths) > 1:
+        raise ValueError(f"Sessions have different joint layouts ({', '.join(str(w // 3) for w in widths)} joints); "
+                         f"pack them into separate datasets.")
+    keypoints = np.array(kps, dtype=np.float32).reshape(len(kps), widths[0])
+    num_joints = widths[0] // 3
+    extra = {}
+    if kinematics:
+        extra = {"features": np.stack(feats).astype(np.float32),
+                 "feature_names": np.array(feature_names_for(num_joints), dtype=str)}
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez_compressed(out_path, keypoints=keypoints, num_joints=np.int64(num_joints),
+                        label=np.array(labels, dtype=np.int64),
+                        classes=np.array(classes, dtype=str), session=np.array(sess, dtype=np.int64),
+                        sessions=np.array(sessions, dtype=str), track_id=np.array(tracks, dtype=np.int64),
+                        image_id=np.array(image_ids, dtype=str), **extra)
+    counts = np.bincount(labels, minlength=len(classes))
+    print(f"Wrote {len(kps)} {num_joints}-joint samples to {out_path}: "
+          + ", ".join(f"{c}={n}" for c, n in zip(classes, counts)))
+    return out_path
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build a packed PoseNet dataset from labeled session segments")
+    ap.add_argument("annotations", help="CSV or JSON: session, track_id, start_frame, end_frame, label")
+    ap.add_argument("out", help="packed dataset (.npz)")
+    ap.add_argument("--classes", nargs="*", help="fixed class order (default: sorted labels)")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--kinematics", action="store_true", help="also pack joint-angle/velocity features")
+    ap.add_argument("--fps", type=float, default=DEFAULT_FPS, help="for the kinematics time derivatives")
+    args = ap.parse_args()
+    build_packed(read_annotations(args.annotations), args.out, args.classes, args.workers, args.kinematics, args.fps)
@@ -0,0 +1,134 @@
+# export_posenet.py — CPU inference exports of PoseNet: TorchScript (float + dynamic int8) and ONNX
+#   python New_NN/export_posenet.py [--model New_NN/posenet.pt] [--out-dir New_NN/export] [--threads 4]
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import torch
+from torch import nn
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from JsonNetwork import load_model, open_dataset, check_inputs, MODEL_PATH, TEST_DIR
+
+EXPORT_DIR = 'New_NN/export'
+BATCH_SIZES = (1, 64, 4096)
+MAX_ACC_DROP = 0.5        # percentage points the int8 model may lose on the test split
+
+# ---- Exports ----
+def quantize(model):
+    """Dynamic int8 quantization of every nn.Linear (weights int8, activations quantized on the fly)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+def to_torchscript(model, in_dim, path):
+    """Traced TorchScript module (PoseNet has no control flow, so tracing is exact); loads without this repo."""
+    example = torch.zeros(1, in_dim)
+    with torch.no_grad():
+        scripted = torch.jit.freeze(torch.jit.trace(model.eval(), example))
+    scripted.save(path)
+    return scripted
+
+def to_onnx(model, in_dim, path):
+    """Float ONNX graph with a dynamic batch axis (for onnxruntime or other CPU runtimes)."""
+    torch.onnx.export(model.eval(), torch.zeros(1, in_dim), path, input_names=["keypoints"],
+                      output_names=["logits"], dynamic_axes={"keypoints": {0: "batch"}, "logits": {0: "batch"}},
+                      opset_version=17)
+    return path
+
+# ---- Checks ----
+@torch.no_grad()
+def parity(reference, candidate, X, y):
+    """Accuracy of both models on (X, y), how often they agree, and the largest logit difference."""
+    ref, cand = reference(X), candidate(X)
+    return {
+        "reference_acc": round(100.0 * (ref.argmax(1) == y).float().mean().item(), 2),
+        "candidate_acc": round(100.0 * (cand.argmax(1) == y).float().mean().item(), 2),
+        "agreement": round(100.0 * (ref.argmax(1) == cand.argmax(1)).float().mean().item(), 2),
+        "max_logit_diff": round((ref - cand).abs().max().item(), 5),
+    }
+
+@torch.no_grad()
+def benchmark(fn, in_dim, batch_sizes=BATCH_SIZES, min_seconds=0.5, warmup=5):
+    """Median latency per call and throughput (samples/s) at each batch size."""
+    out = {}
+    for bs in batch_sizes:
+        x = torch.randn(bs, in_dim)
+        for _ in range(warmup):
+            fn(x)
+        times = []
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_seconds or len(times) < 10:
+            t0 = time.perf_counter()
+            fn(x)
+            times.append(time.perf_counter() - t0)
+        med = float(np.median(times))
+        out[bs] = {"latency_ms": round(1000 * med, 4), "samples_per_s": round(bs / med, 1)}
+    return out
+
+def _onnx_runner(path):
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+    sess = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    return lambda x: sess.run(None, {"keypoints": x.numpy()})[0]
+
+# ---- Driver ----
+def export_all(model_path=MODEL_PATH, out_dir=EXPORT_DIR, test_dir=TEST_DIR, threads=None,
+               batch_sizes=BATCH_SIZES, min_seconds=0.5):
+    if threads:
+        torch.set_num_threads(threads)
+    model, art = load_model(model_path)
+    in_dim = art["in_dim"]
+    os.makedirs(out_dir, exist_ok=True)
+
+    qmodel = quantize(model)
+    paths = {
+        "torchscript_fp32": os.path.join(out_dir, "posenet_fp32.pt"),
+        "torchscript_int8": os.path.join(out_dir, "posenet_int8.pt"),
+        "onnx_fp32": os.path.join(out_dir, "posenet_fp32.onnx"),
+    }
+    ts_fp32 = to_torchscript(model, in_dim, paths["torchscript_fp32"])
+    ts_int8 = to_torchscript(qmodel, in_dim, paths["torchscript_int8"])
+    try:
+        to_onnx(model, in_dim, paths["onnx_fp32"])
+    except Exception as e:  # the exporter needs the optional onnx / onnxscript packages
+        print(f"ONNX export skipped: {e}")
+        del paths["onnx_fp32"]
+    for name, p in paths.items():
+        print(f"{name:<18}{os.path.getsize(p) / 1024:>8.1f} KB  {p}")
+
+    report = {"exports": paths}
+    test = open_dataset(test_dir, classes=art["classes"])
+    check_inputs(art["config"].get("features"), test, f"test set {test_dir}")
+    test.load()
+    if len(test.X):
+        X, y = torch.from_numpy(test.X), torch.from_numpy(test.y)
+        report["parity_int8"] = parity(model, ts_int8, X, y)
+        report["parity_torchscript"] = parity(model, ts_fp32, X, y)
+        p = report["parity_int8"]
+        print(f"\ntest split ({len(y)} samples): fp32 {p['reference_acc']:.2f}%  int8 {p['candidate_acc']:.2f}%  "
+              f"agreement {p['agreement']:.2f}%  max |Δlogit| {p['max_logit_diff']}")
+        if p["reference_acc"] - p["candidate_acc"] > MAX_ACC_DROP:
+            print(f"WARNING: int8 model loses more than {MAX_ACC_DROP} points of accuracy; ship the fp32 export.")
+
+    runners = {"eager_fp32": model, "torchscript_fp32": ts_fp32, "torchscript_int8": ts_int8}
+    onnx = _onnx_runner(paths["onnx_fp32"]) if "onnx_fp32" in paths else None
+    if onnx is not None:
+        runners["onnxruntime_fp32"] = onnx
+    report["benchmark"] = {}
+    print(f"\n{'runtime':<18}" + "".join(f"{'bs=' + str(bs):>24}" for bs in batch_sizes))
+    for name, fn in runners.items():
+        res = benchmark(fn, in_dim, batch_sizes, min_seconds)
+        report["benchmark"][name] = res
+        print(f"{name:<18}" + "".join(f"{r['latency_ms']:>9.3f} ms {r['samples_per_s']:>10.0f}/s" for r in res.values()))
+    return report
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Export PoseNet for CPU inference and benchmark it")
+    ap.add_argument("--model", default=MODEL_PATH, help="artifact written by JsonNetwork.train()")
+    ap.add_argument("--out-dir", default=EXPORT_DIR)
+    ap.add_argument("--test-dir", default=TEST_DIR)
+    ap.add_argument("--threads", type=int, default=None, help="torch intra-op threads (default: torch's choice)")
+    args = ap.parse_args()
+    export_all(args.model, args.out_dir, args.test_dir, args.threads)
@@ -1,6 +1,13 @@
 import cv2
 import os
+import sys
 from os import listdir
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded read-ahead shared with the AlphaPose pipeline's video writer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "AlphaPose_Code"))
+from videoCreator import imap_bounded
+
 def make_video(name):
     # Directory where your plots are saved
     image_folder = 'OpenPose_Code/newplots'
@@ -29,11 +36,12 @@ def make_video(name):
     fps = 30  # or adjust to match original video speed
     video_writer = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
 
-    # Write each image to the video
-    for image in images:
-        img_path = os.path.join(image_folder, image)
-        frame = cv2.imread(img_path)
-        video_writer.write(frame)
+    # Write each image to the video (reads run ahead in a bounded window, order preserved)
+    img_paths = [os.path.join(image_folder, image) for image in images]
+    with ThreadPoolExecutor() as executor:
+        for frame in imap_bounded(executor, cv2.imread, img_paths):
+            if frame is not None:
+                video_writer.write(frame)
 
     video_writer.release()
-    print(f"Video saved to {output_video_path}")
\ No newline at end of file
+    print(f"Video saved to {output_video_path}")
@@ -0,0 +1,88 @@
+# bench_encoders.py — encode throughput / output size per make_video backend
+#   python benchmarks/bench_encoders.py [--clip AlphaPose_Code/videos/video.avi] [--repeat 3] [--json out.json]
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AlphaPose_Code"))
+from videoCreator import open_encoder, video_extension
+
+REFERENCE_CLIP = "AlphaPose_Code/videos/video.avi"
+
+# (label, backend, ffmpeg options)
+CONFIGS = [
+    ("opencv-mp4v", "mp4v", {}),
+    ("opencv-mjpg", "mjpg", {}),
+    ("ffmpeg-x264-ultrafast", "ffmpeg", {"preset": "ultrafast", "crf": 23, "threads": 0}),
+    ("ffmpeg-x264-veryfast", "ffmpeg", {"preset": "veryfast", "crf": 23, "threads": 0}),
+    ("ffmpeg-x264-medium", "ffmpeg", {"preset": "medium", "crf": 23, "threads": 0}),
+]
+
+def load_clip(path):
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        ok, img = cap.read()
+        if not ok:
+            break
+        frames.append(img)
+    cap.release()
+    if not frames:
+        raise RuntimeError(f"Could not decode any frames from {path}")
+    return frames, fps
+
+def bench_config(frames, fps, backend, opts, out_dir, repeat):
+    h, w = frames[0].shape[:2]
+    path = os.path.join(out_dir, f"bench{video_extension(backend)}")
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        enc = open_encoder(backend, path, fps, (w, h), **opts)
+        for f in frames:
+            enc.write(f)
+        enc.release()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return {"seconds": round(best, 4), "fps": round(len(frames) / best, 1), "bytes": os.path.getsize(path)}
+
+def run(clip=REFERENCE_CLIP, repeat=3):
+    frames, fps = load_clip(clip)
+    h, w = frames[0].shape[:2]
+    results = []
+    out_dir = tempfile.mkdtemp(prefix="bench_enc_")
+    try:
+        for label, backend, opts in CONFIGS:
+            row = {"config": label, "backend": backend, **opts}
+            if backend == "ffmpeg" and shutil.which("ffmpeg") is None:
+                row["skipped"] = "ffmpeg not on PATH"
+            else:
+                row.update(bench_config(frames, fps, backend, opts, out_dir, repeat))
+            results.append(row)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {"clip": clip, "frames": len(frames), "width": w, "height": h, "fps": fps, "results": results}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Encode throughput / output size per make_video backend")
+    ap.add_argument("--clip", default=REFERENCE_CLIP)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="also write the report here")
+    args = ap.parse_args()
+
+    report = run(args.clip, args.repeat)
+    print(f"{report['clip']}: {report['frames']} frames {report['width']}x{report['height']} @ {report['fps']:.2f} FPS")
+    print(f"{'config':<24}{'enc fps':>10}{'seconds':>10}{'size KB':>10}")
+    for r in report["results"]:
+        if "skipped" in r:
+            print(f"{r['config']:<24}  skipped: {r['skipped']}")
+        else:
+            print(f"{r['config']:<24}{r['fps']:>10}{r['seconds']:>10}{r['bytes'] / 1024:>10.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
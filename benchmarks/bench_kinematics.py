@@ -0,0 +1,66 @@
+# bench_kinematics.py — kinematics throughput on an hour-long synthetic session (2D COCO17 and 3D SMPL24)
+#   python benchmarks/bench_kinematics.py [--minutes 60 --fps 30 --people 2 --repeat 3 --out kin.json]
+import os
+import sys
+import json
+import time
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(REPO, "AlphaPose_Code"))
+sys.path.insert(0, HERE)
+
+import numpy as np
+
+import synthetic
+from kinematics import compute_kinematics, kinematics_table, feature_matrix
+from instrument import peak_rss_mb
+
+def best_of(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, out
+
+def run(minutes=60.0, fps=30.0, people=2, repeat=3, seed=0):
+    frames = int(minutes * 60 * fps)
+    t0 = time.perf_counter()
+    cols = synthetic.synthetic_columns(frames, people, xyz=True, seed=seed)
+    print(f"synthetic session: {frames} frames x {people} people ({minutes:g} min at {fps:g} fps), "
+          f"{time.perf_counter() - t0:.1f}s to generate")
+
+    report = {"frames": frames, "people": people, "fps": fps, "stages": {}}
+    print(f"\n{'stage':<22}{'seconds':>10}{'frames/s':>14}{'joint-frames/s':>18}")
+    for name, use_3d in (("2d_coco17", False), ("3d_smpl24", True)):
+        J = (cols["xyz"] if use_3d else cols["keypoints"]).shape[2]
+        dt, k = best_of(lambda: compute_kinematics(cols, fps, use_3d=use_3d), repeat)
+        stages = {f"kinematics_{name}": dt}
+        stages[f"table_{name}"], _ = best_of(lambda: kinematics_table(k), repeat)
+        stages[f"features_{name}"], X = best_of(lambda: feature_matrix(k), repeat)
+        for stage, sec in stages.items():
+            report["stages"][stage] = {"seconds": round(sec, 4), "frames_per_s": round(frames / sec, 1),
+                                       "joint_frames_per_s": round(frames * people * J / sec, 1)}
+            print(f"{stage:<22}{sec:>10.3f}{frames / sec:>14,.0f}{frames * people * J / sec:>18,.0f}")
+        report["stages"][f"features_{name}"]["shape"] = list(X.shape)
+        report["stages"][f"features_{name}"]["nonzero_fraction"] = round(float(np.count_nonzero(X) / X.size), 4)
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(f"\npeak RSS {report['peak_rss_mb']} MB")
+    return report
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark kinematics.py on a long synthetic session")
+    ap.add_argument("--minutes", type=float, default=60.0)
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--people", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="write the report JSON here")
+    args = ap.parse_args()
+    report = run(args.minutes, args.fps, args.people, args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
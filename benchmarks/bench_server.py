@@ -0,0 +1,180 @@
+# bench_server.py — load-test the local query server (AlphaPose_Code/server.py) on synthetic sessions
+#   python benchmarks/bench_server.py [--frames 18000 --people 4 --sessions 3 --concurrency 1 8 32 --seconds 5]
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(REPO, "AlphaPose_Code"))
+sys.path.insert(0, HERE)
+
+import numpy as np
+
+import synthetic
+from columnar import save_columns
+
+FPS = 30.0
+
+# ----------------------------
+# Minimal keep-alive HTTP client
+# ----------------------------
+class Client:
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, target):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await self.writer.drain()
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        status = int(head.split(" ", 2)[1])
+        length = int(head.lower().split("content-length:", 1)[1].split("\r\n", 1)[0])
+        body = await self.reader.readexactly(length)
+        return status, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+# ----------------------------
+# Workload
+# ----------------------------
+def make_queries(sessions, frames, tracks, rng):
+    """A mix of what coaches ask: a minute of distance, a round of metrics, a few seconds of keypoints."""
+    def rng_range(seconds):
+        start = rng.randrange(0, max(1, frames - int(seconds * FPS)))
+        return start, start + int(seconds * FPS)
+
+    qs = []
+    for _ in range(500):
+        s = rng.choice(sessions)
+        a, b = rng.sample(tracks, 2)
+        lo, hi = rng_range(60)
+        qs.append(("distance_json", f"/sessions/{s}/distance?a={a}&b={b}&start={lo}&end={hi}"))
+        lo, hi = rng_range(180)
+        qs.append(("metrics_json", f"/sessions/{s}/metrics?metric=speed,nearest_dist&start={lo}&end={hi}"))
+        qs.append(("metrics_npz", f"/sessions/{s}/metrics?metric=speed,nearest_dist&start={lo}&end={hi}&format=npz"))
+        lo, hi = rng_range(5)
+        qs.append(("keypoints_json", f"/sessions/{s}/keypoints?tracks={a},{b}&start={lo}&end={hi}"))
+        qs.append(("keypoints_npz", f"/sessions/{s}/keypoints?tracks={a},{b}&start={lo}&end={hi}&format=npz"))
+    rng.shuffle(qs)
+    return qs
+
+async def load(port, queries, concurrency, seconds):
+    """`concurrency` keep-alive clients cycling through queries for `seconds`; latencies per kind."""
+    lat = {}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(i):
+        nonlocal errors
+        c = Client(port)
+        j = i
+        try:
+            while time.perf_counter() < deadline:
+                kind, target = queries[j % len(queries)]
+                j += concurrency
+                t0 = time.perf_counter()
+                status, _ = await c.get(target)
+                lat.setdefault(kind, []).append(time.perf_counter() - t0)
+                errors += status != 200
+        finally:
+            c.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - t0
+    n = sum(len(v) for v in lat.values())
+    out = {"concurrency": concurrency, "requests": n, "errors": errors, "req_per_s": round(n / wall, 1), "kinds": {}}
+    for kind, v in sorted(lat.items()):
+        v = 1000 * np.array(v)
+        out["kinds"][kind] = {"n": len(v), **{f"p{p}_ms": round(float(np.percentile(v, p)), 2) for p in (50, 95, 99)}}
+    return out
+
+async def cold_loads(port, sessions):
+    c = Client(port)
+    out = {}
+    for s in sessions:
+        t0 = time.perf_counter()
+        status, _ = await c.get(f"/sessions/{s}")
+        out[s] = {"status": status, "ms": round(1000 * (time.perf_counter() - t0), 1)}
+    c.close()
+    return out
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(port, timeout=30):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not come up")
+
+def run(frames=18000, people=4, n_sessions=3, fmt="npz", concurrency=(1, 8, 32), seconds=5.0, seed=0):
+    work = tempfile.mkdtemp(prefix="qc_server_")
+    names = []
+    for i in range(n_sessions):
+        name = f"bout{i}.{fmt}"
+        cols = synthetic.synthetic_columns(frames, people, seed=seed + i)
+        if fmt == "npz":
+            save_columns(cols, os.path.join(work, name))
+        else:
+            from adapters import columns_to_entries
+            synthetic.write_session(os.path.join(work, name), columns_to_entries(cols))
+        names.append(name)
+    print(f"{n_sessions} sessions x {frames} frames x {people} people ({fmt}) in {work}")
+
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO, "AlphaPose_Code", "server.py"), "--root", work,
+                             "--port", str(port), "--fps", str(FPS)], stdout=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        report = {"frames": frames, "people": people, "sessions": n_sessions, "format": fmt}
+        report["cold_load"] = asyncio.run(cold_loads(port, names))
+        print("cold load: " + ", ".join(f"{k} {v['ms']} ms" for k, v in report["cold_load"].items()))
+        queries = make_queries(names, frames, list(range(1, people + 1)), random.Random(seed))
+        report["load"] = []
+        for c in concurrency:
+            res = asyncio.run(load(port, queries, c, seconds))
+            report["load"].append(res)
+            print(f"\nconcurrency {c}: {res['requests']} requests, {res['req_per_s']} req/s, {res['errors']} errors")
+            print(f"  {'query':<16}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for kind, r in res["kinds"].items():
+                print(f"  {kind:<16}{r['n']:>7}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+        report["server_stats"] = json.loads(asyncio.run(Client(port).get("/stats"))[1])
+        return report
+    finally:
+        proc.terminate()
+        proc.wait()
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Load-test the session query server")
+    ap.add_argument("--frames", type=int, default=18000, help="per session (18000 = 10 min at 30 fps)")
+    ap.add_argument("--people", type=int, default=4)
+    ap.add_argument("--sessions", type=int, default=3)
+    ap.add_argument("--format", choices=("npz", "json"), default="npz", help="how the sessions are stored")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--seconds", type=float, default=5.0, help="per concurrency level")
+    ap.add_argument("--out", help="write the report JSON here")
+    args = ap.parse_args()
+    report = run(args.frames, args.people, args.sessions, args.format, args.concurrency, args.seconds)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
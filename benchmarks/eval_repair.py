@@ -0,0 +1,197 @@
+# eval_repair.py — score repair2 settings against synthetic sessions with known ID swaps,
+# people who leave and come back, and strangers who walk in
+#   python benchmarks/eval_repair.py [--frames 600 --people 4 --swap-rate 0.01 --dropout 0.05 --returns 1 --newcomers 1]
+#   python benchmarks/eval_repair.py --grid MAX_CENTER_JUMP=100,150,250 POSE_SIM_THRESHOLD=0.8,1.2 REID_ENABLED=0,1
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import itertools
+import contextlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "AlphaPose_Code"))
+sys.path.insert(0, HERE)
+
+import synthetic
+
+# repair2 module globals a sweep may set
+TUNABLES = ("POSE_HISTORY", "MAX_CENTER_JUMP", "POSE_SIM_THRESHOLD", "CENTER_WEIGHT", "POSE_WEIGHT",
+            "REID_ENABLED", "REID_MIN_SIMILARITY", "REID_MAX_LOST", "REID_GRACE", "REID_GALLERY")
+
+# ----------------------------
+# Scoring
+# ----------------------------
+def score_tracks(entries, total, strangers=()):
+    """
+    entries:   output entries carrying both "idx" (what the tracker said) and "gt_idx" (truth).
+    total:     number of true detections that repair could have kept (the input entries of
+               everyone but the strangers).
+    strangers: gt_idx values of people who walk in mid-session; repair should drop them.
+
+    id_switches: times a true person's assigned idx changes from its previous appearance
+    misses:      input detections the output dropped (repair never fabricates entries)
+    intrusions:  stranger detections the output kept under some ID (the false positives)
+    mota:        1 - (misses + intrusions + id_switches) / total
+    idf_acc:     share of outputs whose idx is the one that true person carries most often
+    """
+    by_frame = defaultdict(list)
+    intrusions = 0
+    for e in entries:
+        if e["gt_idx"] in strangers:
+            intrusions += 1
+        else:
+            by_frame[synthetic_frame(e["image_id"])].append(e)
+
+    last_id = {}
+    switches = 0
+    kept = 0
+    counts = defaultdict(lambda: defaultdict(int))
+    for f in sorted(by_frame):
+        for e in by_frame[f]:
+            kept += 1
+            gt, pid = e["gt_idx"], e["idx"]
+            if gt in last_id and last_id[gt] != pid:
+                switches += 1
+            last_id[gt] = pid
+            counts[gt][pid] += 1
+
+    return {
+        "id_switches": switches,
+        "misses": total - kept,
+        "intrusions": intrusions,
+        "kept": kept,
+        "majority": sum(max(c.values()) for c in counts.values()),
+        "total": total,
+    }
+
+def summarize(scores):
+    """Raw counts (possibly summed over sessions) -> the reported metrics."""
+    total, kept = scores["total"], scores["kept"]
+    errors = scores["misses"] + scores["intrusions"] + scores["id_switches"]
+    return {
+        "id_switches": scores["id_switches"],
+        "misses": scores["misses"],
+        "intrusions": scores["intrusions"],
+        "mota": round(1.0 - errors / total, 4) if total else None,
+        "idf_acc": round(scores["majority"] / kept, 4) if kept else None,
+    }
+
+def synthetic_frame(image_id):
+    return int(os.path.splitext(image_id)[0].split('_')[-1])
+
+# ----------------------------
+# One configuration (runs in a worker process)
+# ----------------------------
+def evaluate(config, sessions, out_dir):
+    """Run repair2 with `config` applied to its module globals on every session; sum the scores."""
+    import repair2
+    for name, value in config.items():
+        if name not in TUNABLES:
+            raise ValueError(f"Unknown repair2 tunable '{name}'")
+        setattr(repair2, name, type(getattr(repair2, name))(value))
+
+    totals = defaultdict(int)
+    seconds = 0.0
+    frames = 0
+    for s in sessions:
+        out_path = os.path.join(out_dir, f"{os.path.basename(s['path'])}.{os.getpid()}.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            repair2.repair_alphapose_json(s["path"], out_path, s["video"])
+            seconds += time.perf_counter() - t0
+        with open(out_path) as f:
+            scores = score_tracks(json.load(f), s["total"], s["strangers"])
+        os.remove(out_path)
+        for k, v in scores.items():
+            totals[k] += v
+        frames += s["frames"]
+
+    return {"config": config, **summarize(totals),
+            "frames_per_s": round(frames / seconds, 1) if seconds else None}
+
+# ----------------------------
+# Sessions, grids, driver
+# ----------------------------
+def make_sessions(work, frames, people, swap_rate, dropout, seeds, returns=0, newcomers=0):
+    strangers = set(range(people + 1, people + newcomers + 1))   # make_session numbers them after the people
+    sessions = []
+    for seed in range(seeds):
+        video = os.path.join(work, f"session_{seed}.avi")    # rendered footage for appearance ReID
+        entries = synthetic.make_session(frames, people, swap_rate=swap_rate, dropout=dropout, seed=seed,
+                                         with_truth=True, returns=returns, newcomers=newcomers, video_path=video)
+        path = synthetic.write_session(os.path.join(work, f"session_{seed}.json"), entries)
+        total = sum(e["gt_idx"] not in strangers for e in entries)
+        sessions.append({"path": path, "video": video, "frames": frames, "total": total, "strangers": strangers,
+                         "baseline": score_tracks(entries, total, strangers)})
+    return sessions
+
+def parse_grid(specs):
+    """["MAX_CENTER_JUMP=100,150", "REID_ENABLED=0,1"] -> list of config dicts (cartesian product)."""
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in TUNABLES or not values:
+            raise ValueError(f"Bad grid axis '{spec}' (use NAME=v1,v2 with NAME in {', '.join(TUNABLES)})")
+        axes.append([(name, float(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)] if axes else [{}]
+
+def run(configs, frames=600, people=4, swap_rate=0.01, dropout=0.05, seeds=3, workers=None,
+        returns=1, newcomers=1):
+    work = tempfile.mkdtemp(prefix="qc_eval_")
+    try:
+        sessions = make_sessions(work, frames, people, swap_rate, dropout, seeds, returns, newcomers)
+        base = defaultdict(int)
+        for s in sessions:
+            for k, v in s["baseline"].items():
+                base[k] += v
+        baseline = summarize(base)
+        print(f"{seeds} session(s) × {frames} frames × {people} people ({returns} leave and return, "
+              f"{newcomers} replaced by a stranger), {base['total']} detections; input before repair: "
+              f"{baseline['id_switches']} ID switches, {baseline['intrusions']} stranger detections, "
+              f"MOTA {baseline['mota']:.4f}")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = [executor.submit(evaluate, cfg, sessions, work) for cfg in configs]
+            results = [job.result() for job in jobs]
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    results.sort(key=lambda r: (-r["mota"], -(r["frames_per_s"] or 0)))
+    return {"input": baseline, "detections": base["total"], "results": results}
+
+def print_table(report):
+    print(f"{'mota':>7} {'idf':>7} {'switch':>7} {'miss':>6} {'intr':>6} {'fr/s':>9}  config")
+    for r in report["results"]:
+        cfg = " ".join(f"{k}={v:g}" for k, v in r["config"].items()) or "(repair2 defaults)"
+        print(f"{r['mota']:>7.4f} {r['idf_acc'] or 0:>7.4f} {r['id_switches']:>7} {r['misses']:>6} "
+              f"{r['intrusions']:>6} {r['frames_per_s'] or 0:>9.1f}  {cfg}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="ID-switch / MOTA / speed evaluation of repair2 settings")
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--people", type=int, default=4)
+    ap.add_argument("--swap-rate", type=float, default=0.01, help="chance per frame of an injected ID swap")
+    ap.add_argument("--dropout", type=float, default=0.05, help="chance a detection is missing")
+    ap.add_argument("--seeds", type=int, default=3, help="independent sessions per configuration")
+    ap.add_argument("--returns", type=int, default=1, help="people per session who leave and come back under a new id")
+    ap.add_argument("--newcomers", type=int, default=1, help="people per session replaced by a stranger")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--grid", nargs="*", default=[], metavar="NAME=v1,v2",
+                    help="sweep repair2 tunables (cartesian product)")
+    ap.add_argument("--out", help="write the results as JSON")
+    args = ap.parse_args()
+
+    report = run(parse_grid(args.grid), args.frames, args.people, args.swap_rate, args.dropout,
+                 args.seeds, args.workers, args.returns, args.newcomers)
+    print_table(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report: {args.out}")
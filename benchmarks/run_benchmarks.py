@@ -0,0 +1,142 @@
+# run_benchmarks.py — time every pipeline stage on a synthetic session, write a JSON report
+#   python benchmarks/run_benchmarks.py [--frames 300 --people 4] [--out report.json] [--compare old.json]
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(REPO, "AlphaPose_Code"))
+sys.path.insert(0, HERE)
+
+import numpy as np
+import cv2
+
+import synthetic
+from adapters import load_session
+from repair2 import repair_alphapose_json
+from reader import convert_json_to_opencv_images
+from videoCreator import make_video
+from frameGUIandSelect import frame_range_from_json
+from metrics import export_metrics
+from kinematics import export_kinematics
+
+RESULTS_DIR = os.path.join(HERE, "results")
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def timed(report, name, fn, frames, repeat=1):
+    """Best-of-repeat wall time for one stage; stdout from the stage is swallowed."""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    report["stages"][name] = {"seconds": round(best, 4), "frames_per_s": round(frames / best, 1) if best else None}
+    print(f"  {name:<14}{best:>9.3f}s {frames / best:>10.1f} frames/s")
+
+def run(frames=300, people=4, fps=30.0, width=1280, height=720, encoder="mp4v", repeat=1, seed=0):
+    work = tempfile.mkdtemp(prefix="qc_bench_")
+    report = {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count(), "numpy": np.__version__, "opencv": cv2.__version__},
+        "config": {"frames": frames, "people": people, "fps": fps, "width": width, "height": height,
+                   "encoder": encoder, "repeat": repeat, "seed": seed},
+        "stages": {},
+    }
+    try:
+        json_path = os.path.join(work, "session.json")
+        video_path = os.path.join(work, "session.avi")
+        plots = os.path.join(work, "plots")
+        t0 = time.perf_counter()
+        entries = synthetic.make_session(frames, people, width, height, swap_rate=2.0 / frames,
+                                         dropout=0.02, seed=seed)
+        synthetic.write_session(json_path, entries)
+        synthetic.write_blank_video(video_path, frames, width, height, fps)
+        print(f"synthetic session: {len(entries)} entries, {os.path.getsize(json_path) / 1e6:.1f} MB "
+              f"({time.perf_counter() - t0:.2f}s to generate)")
+
+        timed(report, "load_json", lambda: json.load(open(json_path)), frames, repeat)
+        timed(report, "load_columns", lambda: load_session(json_path), frames, repeat)
+        timed(report, "repair", lambda: repair_alphapose_json(json_path, os.path.join(work, "repaired.json")),
+              frames, repeat)
+        timed(report, "render", lambda: convert_json_to_opencv_images(json_path, video_path, plots, plot_distance=True),
+              frames, repeat)
+        timed(report, "encode", lambda: make_video("bench", video_path, encoder=encoder, image_folder=plots,
+                                                   output_dir=work), frames, repeat)
+        timed(report, "frame_select", lambda: frame_range_from_json(json_path, 1.0, frames / fps - 1.0, fps),
+              frames, repeat)
+        timed(report, "metrics", lambda: export_metrics(json_path, os.path.join(work, "m.npz"), fps), frames, repeat)
+        timed(report, "kinematics", lambda: export_kinematics(json_path, os.path.join(work, "k.npz"), fps),
+              frames, repeat)
+        train_stage(report, work)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return report
+
+def train_stage(report, work, epochs=1):
+    """One PoseNet epoch on New_NN/dataset (needs torch; skipped with the reason otherwise)."""
+    try:
+        sys.path.insert(0, os.path.join(REPO, "New_NN"))
+        import JsonNetwork as jn
+    except ImportError as e:
+        report["stages"]["training"] = {"skipped": f"cannot import New_NN/JsonNetwork.py ({e})"}
+        return
+    train_dir = os.path.join(REPO, "New_NN", "dataset", "train")
+    test_dir = os.path.join(REPO, "New_NN", "dataset", "test")
+    if not os.path.isdir(train_dir):
+        report["stages"]["training"] = {"skipped": f"no dataset at {train_dir}"}
+        return
+    samples = len(jn.KeypointsFolder(train_dir)) * epochs
+    timed(report, "training", lambda: jn.train(epochs, train_dir, test_dir, os.path.join(work, "ckpt"), resume=False,
+                                               model_path=os.path.join(work, "posenet.pt")), samples)
+
+def compare(report, old_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    print(f"\nvs {old_path} (commit {old.get('commit')}):")
+    for name, st in report["stages"].items():
+        prev = old.get("stages", {}).get(name, {})
+        if "seconds" in st and "seconds" in prev and prev["seconds"]:
+            change = 100.0 * (st["seconds"] - prev["seconds"]) / prev["seconds"]
+            print(f"  {name:<14}{prev['seconds']:>9.3f}s -> {st['seconds']:>8.3f}s  ({change:+.1f}%)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Time load/repair/render/encode/frame-select/metrics stages")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--people", type=int, default=4)
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--encoder", default="mp4v")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="report path (default: benchmarks/results/<commit>_<time>.json)")
+    ap.add_argument("--compare", help="earlier report to diff against")
+    args = ap.parse_args()
+
+    report = run(args.frames, args.people, args.fps, encoder=args.encoder, repeat=args.repeat, seed=args.seed)
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{report['commit'] or 'nogit'}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {out}")
+    if args.compare:
+        compare(report, args.compare)
@@ -0,0 +1,217 @@
+# synthetic.py — deterministic AlphaPose-shaped sessions for benchmarks and repair evaluation
+import os
+import sys
+import json
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AlphaPose_Code"))
+from adapters import columns_to_entries
+from skeleton import COCO17_EDGES
+
+# COCO17 standing template, unit height (y down), centered at mid-hip
+COCO17_TEMPLATE = np.array([
+    [0.00, -0.88], [-0.03, -0.91], [0.03, -0.91], [-0.07, -0.89], [0.07, -0.89],
+    [-0.17, -0.70], [0.17, -0.70], [-0.22, -0.45], [0.22, -0.45], [-0.24, -0.22], [0.24, -0.22],
+    [-0.10, 0.00], [0.10, 0.00], [-0.11, 0.27], [0.11, 0.27], [-0.12, 0.52], [0.12, 0.52],
+])
+LIMB_JOINTS = [7, 8, 9, 10, 13, 14, 15, 16]   # elbows, wrists, knees, ankles swing over time
+
+def synthetic_columns(frames=300, people=2, width=1280, height=720, jitter=2.0, xyz=False, seed=0):
+    """Clean ground-truth tracks as columns (see columnar.py), generated fully vectorized."""
+    rng = np.random.default_rng(seed)
+    F, K, J = frames, people, len(COCO17_TEMPLATE)
+
+    # per-person body: height in pixels + slightly different proportions (so ReID has something to use)
+    size = rng.uniform(0.45, 0.6, K) * height
+    body = COCO17_TEMPLATE[None] * rng.uniform(0.9, 1.1, (K, 1, 2)) * size[:, None, None]
+
+    # smooth center paths: random walk with momentum, kept inside the frame
+    vel = np.cumsum(rng.normal(0, 0.6, (F, K, 2)), axis=0) * 0.3
+    start = np.stack([rng.uniform(0.2, 0.8, K) * width, np.full(K, 0.55 * height)], axis=1)
+    path = start[None] + np.cumsum(vel, axis=0)
+    lo, hi = np.array([0.1 * width, 0.45 * height]), np.array([0.9 * width, 0.65 * height])
+    span = hi - lo
+    path = lo + span - np.abs(((path - lo) % (2 * span)) - span)   # reflect at the borders
+
+    # limb swing
+    t = np.arange(F)[:, None, None]
+    phase = rng.uniform(0, 2 * np.pi, (1, K, 1))
+    pose = np.broadcast_to(body[None], (F, K, J, 2)).copy()
+    swing = 0.06 * size[None, :, None] * np.sin(0.15 * t + phase)
+    pose[:, :, LIMB_JOINTS, 0] += swing
+
+    xy = pose + path[:, :, None, :] + rng.normal(0, jitter, (F, K, J, 2))
+    conf = rng.uniform(0.6, 1.0, (F, K, J, 1))
+    kp = np.concatenate([xy, conf], axis=-1).astype(np.float32)
+    mins, maxs = xy.min(axis=2), xy.max(axis=2)
+
+    cols = {
+        "frame": np.arange(F, dtype=np.int64),
+        "image_id": np.array([f"{f}.jpg" for f in range(F)], dtype=str),
+        "track_id": np.arange(1, K + 1, dtype=np.int64),
+        "keypoints": kp,
+        "present": np.ones((F, K), dtype=bool),
+        "score": rng.uniform(2.0, 3.0, (F, K)).astype(np.float32),
+        "box": np.concatenate([mins, maxs - mins], axis=-1).astype(np.float32),
+    }
+    if xyz:
+        # SMPL-24 style root-relative joints in meters
+        smpl = rng.normal(0, 0.3, (K, 24, 3))
+        cols["xyz"] = (smpl[None] + rng.normal(0, 0.01, (F, K, 24, 3))).astype(np.float32)
+    return cols
+
+def turnover(cols, people, returns=0, newcomers=0, gap=(15, 45), seed=0):
+    """
+    People leaving the view. cols holds the session's `people` followed by `newcomers`
+    strangers (clean columns). Returns (cols, truth) where truth (K,) is the true person
+    behind each column. Each event picks a different person and happens mid-session:
+      returns:   the person vanishes for `gap` frames and comes back under a fresh track id
+                 (what a tracker does after losing someone)
+      newcomers: the person leaves for good and, `gap` frames later, a stranger walks in
+    """
+    if returns + newcomers > people:
+        raise ValueError(f"{returns} returns + {newcomers} newcomers need that many of the {people} people")
+    rng = np.random.default_rng(seed + 2)
+    cols = {k: v.copy() for k, v in cols.items()}
+    F = len(cols["frame"])
+    truth = cols["track_id"].copy()
+    per_frame = ["keypoints", "present", "score", "box"] + (["xyz"] if "xyz" in cols else [])
+    chosen = rng.choice(people, returns + newcomers, replace=False)
+    leave = rng.integers(F // 4, max(F // 4, 3 * F // 4) + 1, len(chosen))
+    back = leave + rng.integers(gap[0], gap[1] + 1, len(chosen))
+
+    for n, (k, f, g) in enumerate(zip(chosen[:newcomers], leave, back)):
+        cols["present"][f:, k] = False
+        cols["present"][:g, people + n] = False
+    for k, f, g in zip(chosen[newcomers:], leave[newcomers:], back[newcomers:]):
+        for name in per_frame:
+            cols[name] = np.concatenate([cols[name], cols[name][:, k:k + 1]], axis=1)
+        cols["present"][:g, -1] = False
+        cols["present"][f:, k] = False
+        cols["track_id"] = np.append(cols["track_id"], cols["track_id"].max() + 1)
+        truth = np.append(truth, truth[k])
+    return cols, truth
+
+def corrupt(cols, swap_rate=0.0, dropout=0.0, seed=0, truth=None):
+    """
+    Simulate tracker mistakes. Returns (corrupted_cols, gt) where gt (F, K) holds the true
+    person (truth per column, default the track id) of whatever ends up in each column.
+    A swap exchanges two columns from that frame on (what a tracker ID switch looks like);
+    dropouts clear single detections.
+    """
+    rng = np.random.default_rng(seed + 1)
+    cols = {k: v.copy() for k, v in cols.items()}
+    F, K = cols["present"].shape
+    truth = cols["track_id"] if truth is None else truth
+    gt = np.broadcast_to(np.asarray(truth)[None], (F, K)).copy()
+    per_frame = ["keypoints", "present", "score", "box"] + (["xyz"] if "xyz" in cols else [])
+    if K >= 2:
+        for f in np.nonzero(rng.random(F) < swap_rate)[0]:
+            a, b = rng.choice(K, 2, replace=False)
+            for name in per_frame:
+                cols[name][f:, [a, b]] = cols[name][f:, [b, a]]
+            gt[f:, [a, b]] = gt[f:, [b, a]]
+    cols["present"] &= rng.random((F, K)) >= dropout
+    return cols, gt
+
+# ----------------------------
+# Rendered footage (for appearance ReID)
+# ----------------------------
+LEG_JOINTS = (11, 12, 13, 14, 15, 16)
+
+def clothing_colors(ids, seed=0):
+    """
+    {true id: (shirt BGR, trousers BGR)}: saturated outfits, one per person. Hues step round
+    the color wheel by the golden ratio so no two people in a session dress alike.
+    """
+    rng = np.random.default_rng(seed + 3)
+    ids = [int(pid) for pid in ids]
+    steps = np.arange(len(ids))[:, None] * 0.618 * 180
+    hue = (rng.uniform(0, 180, 2) + steps) % 180                        # (people, shirt/trousers)
+    hsv = np.stack([hue, rng.integers(120, 256, hue.shape), rng.integers(90, 256, hue.shape)], axis=-1)
+    bgr = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2BGR)
+    return {pid: tuple(tuple(int(c) for c in part) for part in outfit) for pid, outfit in zip(ids, bgr)}
+
+def write_session_video(path, cols, truth, width=1280, height=720, fps=30.0, seed=0):
+    """
+    MJPG video of what the camera saw: every present column drawn as a filled figure in its
+    true person's clothes (a returning person keeps theirs, strangers get their own), with a
+    slow lighting drift. Frame n matches image_id "n.jpg".
+    """
+    F = len(cols["present"])
+    colors = clothing_colors(np.unique(truth), seed)
+    ramp = np.linspace(110, 150, width).astype(np.uint8)
+    background = np.ascontiguousarray(np.broadcast_to(ramp[None, :, None], (height, width, 3)))
+    vw = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for f in range(F):
+        img = cv2.convertScaleAbs(background, alpha=1.0 + 0.08 * np.sin(f / 40.0))
+        people = np.nonzero(cols["present"][f])[0]
+        for k in people[np.argsort(cols["keypoints"][f, people, :, 1].max(axis=1))]:   # far (feet higher up) first
+            kp = cols["keypoints"][f, k, :, :2]
+            shirt, trousers = colors[int(truth[k])]
+            width_px = max(3, int(0.06 * (kp[15, 1] - kp[0, 1])))
+            cv2.fillConvexPoly(img, kp[[5, 6, 12, 11]].astype(np.int32), shirt)
+            for i, j in COCO17_EDGES:
+                if i < 5:
+                    continue
+                color = trousers if i in LEG_JOINTS and j in LEG_JOINTS else shirt
+                cv2.line(img, tuple(kp[i].astype(int)), tuple(kp[j].astype(int)), color, width_px, cv2.LINE_AA)
+            cv2.circle(img, tuple(kp[0].astype(int)), width_px, (140, 170, 210), -1)
+        vw.write(img)
+    vw.release()
+    return path
+
+def make_session(frames=300, people=2, width=1280, height=720, jitter=2.0,
+                 swap_rate=0.0, dropout=0.0, xyz=False, seed=0, with_truth=False, returns=0, newcomers=0,
+                 video_path=None):
+    """
+    AlphaPose-style entry list; with_truth adds a "gt_idx" field to every entry. Strangers
+    (newcomers) get gt_idx values above `people`. video_path also renders the footage
+    (write_session_video); dropouts are detector misses, so those people are still drawn.
+    """
+    clean = synthetic_columns(frames, people + newcomers, width, height, jitter, xyz, seed)
+    clean, truth = turnover(clean, people, returns, newcomers, seed=seed)
+    if video_path:
+        write_session_video(video_path, clean, truth, width, height, seed=seed)
+    cols, gt = corrupt(clean, swap_rate, dropout, seed, truth)
+    entries = columns_to_entries(cols)
+    if with_truth:
+        fi, k = np.nonzero(cols["present"])
+        for e, t in zip(entries, gt[fi, k]):
+            e["gt_idx"] = int(t)
+    return entries
+
+def write_session(path, entries):
+    with open(path, "w") as f:
+        json.dump(entries, f)
+    return path
+
+def write_blank_video(path, frames, width=1280, height=720, fps=30.0):
+    """Stand-in source video: the readers only take size/FPS from it (or frames for backdrops)."""
+    vw = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    blank = np.full((height, width, 3), 128, dtype=np.uint8)
+    for _ in range(frames):
+        vw.write(blank)
+    vw.release()
+    return path
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Write a synthetic AlphaPose JSON session")
+    ap.add_argument("out")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--people", type=int, default=2)
+    ap.add_argument("--jitter", type=float, default=2.0)
+    ap.add_argument("--swap-rate", type=float, default=0.0)
+    ap.add_argument("--dropout", type=float, default=0.0)
+    ap.add_argument("--returns", type=int, default=0, help="people who leave and come back under a new id")
+    ap.add_argument("--newcomers", type=int, default=0, help="people who leave for good, replaced by a stranger")
+    ap.add_argument("--xyz", action="store_true", help="include pred_xyz_jts")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--truth", action="store_true", help="add gt_idx to each entry")
+    a = ap.parse_args()
+    entries = make_session(a.frames, a.people, jitter=a.jitter, swap_rate=a.swap_rate, dropout=a.dropout,
+                           xyz=a.xyz, seed=a.seed, with_truth=a.truth, returns=a.returns, newcomers=a.newcomers)
+    write_session(a.out, entries)
+    print(f"Wrote {len(entries)} entries to {a.out}")
@@ -0,0 +1,28 @@
+# adapters.iter_frames streams an AlphaPose .json through its frame index in chunks;
+# the frames must match grouping the whole file in memory.
+import os
+import sys
+import json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "AlphaPose_Code"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import adapters
+import synthetic
+from columnar import frame_number
+
+def test_json_streams_in_frame_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(adapters, "STREAM_FRAMES", 7)     # several chunks
+    entries = synthetic.make_session(30, 3, seed=2)
+    entries = entries[len(entries) // 2:] + entries[:len(entries) // 2]   # out of frame order on disk
+    path = str(tmp_path / "session.json")
+    with open(path, "w") as f:
+        json.dump(entries, f)
+
+    expected = {}
+    for e in entries:
+        expected.setdefault(e["image_id"], []).append(e)
+    streamed = list(adapters.iter_frames(path))
+    assert [fid for fid, _ in streamed] == sorted(expected, key=frame_number)
+    assert dict(streamed) == expected
@@ -0,0 +1,50 @@
+# Export round trip for a tiny randomly initialised PoseNet (skipped where torch isn't installed).
+import os
+import sys
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "New_NN"))
+
+import JsonNetwork as jn
+import export_posenet as ex
+
+@pytest.fixture
+def artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(jn, "NUM_KPTS", 17)
+    torch.manual_seed(0)
+    model = jn.PoseNet(34, 2).eval()
+    path = jn.save_model(str(tmp_path / "posenet.pt"), model, ["on_floor", "stand"])
+    rng = np.random.default_rng(0)
+    test = str(tmp_path / "test.npz")
+    np.savez(test, keypoints=rng.uniform(0, 500, (64, 51)).astype(np.float32), num_joints=np.int64(17),
+             label=rng.integers(0, 2, 64), classes=np.array(["on_floor", "stand"]))
+    return model, path, test
+
+def test_torchscript_fp32_and_int8(artifact, tmp_path):
+    model, _, _ = artifact
+    x = torch.randn(16, 34)
+    fp32 = ex.to_torchscript(model, 34, str(tmp_path / "fp32.pt"))
+    int8 = ex.to_torchscript(ex.quantize(model), 34, str(tmp_path / "int8.pt"))
+    reloaded = torch.jit.load(str(tmp_path / "int8.pt"))
+    with torch.no_grad():
+        assert torch.allclose(fp32(x), model(x), atol=1e-5)
+        assert torch.allclose(reloaded(x), int8(x))
+        assert (int8(x) - model(x)).abs().max().item() < 0.1
+
+def test_onnx_export(artifact, tmp_path):
+    pytest.importorskip("onnx")
+    model, _, _ = artifact
+    path = ex.to_onnx(model, 34, str(tmp_path / "posenet.onnx"))
+    assert os.path.getsize(path) > 0
+
+def test_export_all(artifact, tmp_path):
+    _, path, test = artifact
+    report = ex.export_all(path, str(tmp_path / "export"), test, threads=1, batch_sizes=(1, 8), min_seconds=0.01)
+    assert report["parity_torchscript"]["agreement"] == 100.0
+    assert report["parity_int8"]["max_logit_diff"] < 0.5
+    assert set(report["benchmark"]) >= {"eager_fp32", "torchscript_fp32", "torchscript_int8"}
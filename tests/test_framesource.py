@@ -0,0 +1,55 @@
+# VideoFrameReader on a container that can't seek exactly: frames must still come out right,
+# and long gaps must walk forward instead of rewinding to frame 0 every time.
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "AlphaPose_Code"))
+
+import framesource
+
+KEYFRAME = 250
+
+class KeyframeCapture:
+    """Stand-in for cv2.VideoCapture whose seeks land on the previous keyframe."""
+    frames = 3000
+    decoded = 0
+
+    def __init__(self, path):
+        self.pos = 0
+
+    def set(self, prop, value):
+        self.pos = int(value) // KEYFRAME * KEYFRAME
+
+    def get(self, prop):
+        return self.pos
+
+    def grab(self):
+        if self.pos >= self.frames:
+            return False
+        self.pos += 1
+        KeyframeCapture.decoded += 1
+        return True
+
+    def read(self):
+        if self.pos >= self.frames:
+            return False, None
+        img = np.full((1, 1), self.pos, dtype=np.int64)
+        self.pos += 1
+        KeyframeCapture.decoded += 1
+        return True, img
+
+    def release(self):
+        pass
+
+def test_inexact_seek_walks_forward(monkeypatch):
+    monkeypatch.setattr(framesource.cv2, "VideoCapture", KeyframeCapture)
+    KeyframeCapture.decoded = 0
+    wanted = list(range(5, 3000, 2 * framesource.SEEK_GAP))
+    with framesource.VideoFrameReader("fake.avi", wanted + [5000]) as video:
+        got = [video.get(f) for f in wanted]
+        assert video.get(5000) is None          # past the end of the video
+    assert [int(img[0, 0]) for img in got] == wanted
+    assert KeyframeCapture.decoded < 2 * KeyframeCapture.frames   # rewinding every gap decodes ~50x this
@@ -0,0 +1,57 @@
+# PoseNet training smoke test on a tiny packed dataset (skipped where torch isn't installed).
+import os
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "New_NN"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import JsonNetwork as jn
+import synthetic
+from build_dataset import build_packed
+
+def packed_dataset(tmp_path, labels=("stand", "on_floor")):
+    """One synthetic 17-joint session; every label gets one track's frames 0-39."""
+    session = synthetic.write_session(str(tmp_path / "session.json"),
+                                      synthetic.make_session(40, len(labels), seed=1))
+    annotations = [{"session": session, "track_id": k + 1, "start_frame": 0, "end_frame": 39, "label": label}
+                   for k, label in enumerate(labels)]
+    return build_packed(annotations, str(tmp_path / f"{len(labels)}.npz"), workers=1)
+
+@pytest.fixture
+def small_config(monkeypatch):
+    monkeypatch.setattr(jn, "NUM_KPTS", 17)
+    monkeypatch.setattr(jn, "AUGMENT", False)
+
+def test_train_save_load_predict(tmp_path, small_config):
+    data = packed_dataset(tmp_path)
+    ckpt, model_path = str(tmp_path / "ckpt"), str(tmp_path / "posenet.pt")
+    model, history, classes = jn.train(2, data, data, ckpt, resume=False, patience=None, model_path=model_path)
+    assert len(history["train_loss"]) == 2
+    assert model.net[-1].out_features == len(classes) == 2     # class count comes from the data
+
+    best, art = jn.load_model(model_path)
+    assert art["classes"] == classes and art["in_dim"] == 34
+    flat = synthetic.make_session(1, 1)[0]["keypoints"]       # predict takes raw flat keypoints
+    assert jn.predict(best, art["classes"], flat) in classes
+
+    # resuming the same run continues from the checkpoint
+    _, history, _ = jn.train(3, data, data, ckpt, resume=True, patience=None, model_path=model_path)
+    assert len(history["train_loss"]) == 3
+
+def test_resume_refuses_other_classes(tmp_path, small_config):
+    two = packed_dataset(tmp_path)
+    ckpt = str(tmp_path / "ckpt")
+    jn.train(1, two, two, ckpt, resume=False, model_path=str(tmp_path / "a.pt"))
+    three = packed_dataset(tmp_path, ("stand", "on_floor", "guard"))
+    with pytest.raises(ValueError, match="different run"):
+        jn.train(2, three, three, ckpt, resume=True, model_path=str(tmp_path / "b.pt"))
+
+def test_packed_joint_mismatch_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(jn, "NUM_KPTS", 29)
+    with pytest.raises(ValueError, match="17-joint"):
+        jn.PackedKeypoints(packed_dataset(tmp_path))
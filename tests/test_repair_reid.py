@@ -0,0 +1,86 @@
+# repair2 appearance ReID on rendered synthetic footage: a fighter who walks out and comes
+# back elsewhere (under a new tracker id) gets their old ID back; a stranger who walks into
+# the spot a fighter left never inherits it.
+import os
+import sys
+import json
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "AlphaPose_Code"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import repair2
+import synthetic
+from adapters import columns_to_entries
+
+FRAMES, LEAVE, BACK = 90, 30, 50
+W, H = 1280, 360
+PER_FRAME = ("keypoints", "present", "score", "box")
+
+def scene(tmp_path, stranger, offset, seed=0):
+    """
+    Person idx 2 (column 1) walks out at LEAVE. At BACK either they come back (tracker id 4)
+    or a stranger (truth 9) walks in, `offset` px from where idx 2 was last seen.
+    Returns (json path, video path).
+    """
+    cols = synthetic.synthetic_columns(FRAMES, 4 if stranger else 3, W, H, seed=seed)
+    # one lane each, so everyone is seen unoccluded before anyone leaves
+    K = cols["keypoints"].shape[1]
+    lane = (np.arange(K) + 0.5) * W / K - cols["keypoints"][:, :, :, 0].mean(axis=(0, 2))
+    cols["keypoints"][..., 0] += lane[None, :, None]
+    cols["box"][..., 0] += lane[None, :]
+    truth = cols["track_id"].copy()
+    if stranger:
+        truth[3] = 9
+    else:
+        for name in PER_FRAME:
+            cols[name] = np.concatenate([cols[name], cols[name][:, 1:2]], axis=1)
+        cols["track_id"] = np.append(cols["track_id"], 4)
+        truth = np.append(truth, 2)
+    last = cols["keypoints"][LEAVE - 1, 1, :, :2].mean(axis=0)
+    enter = cols["keypoints"][BACK, -1, :, :2].mean(axis=0)
+    target = last + np.array([-offset if last[0] > W / 2 else offset, 0.0])
+    shift = target - enter
+    cols["keypoints"][BACK:, -1, :, :2] += shift
+    cols["box"][BACK:, -1, :2] += shift
+    cols["present"][LEAVE:, 1] = False
+    cols["present"][:BACK, -1] = False
+
+    video = synthetic.write_session_video(str(tmp_path / "scene.avi"), cols, truth, W, H, seed=seed)
+    entries = columns_to_entries(cols)
+    fi, k = np.nonzero(cols["present"])
+    for e, t in zip(entries, truth[k]):
+        e["gt_idx"] = int(t)
+    return synthetic.write_session(str(tmp_path / "scene.json"), entries), video
+
+def repaired(tmp_path, src, video=None):
+    out, _ = repair2.repair_alphapose_json(src, str(tmp_path / "out.json"), video)
+    with open(out) as f:
+        return [e for e in json.load(f) if repair2.frame_number(e["image_id"]) >= BACK]
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_returning_fighter_gets_old_id(tmp_path, seed):
+    src, video = scene(tmp_path, stranger=False, offset=300, seed=seed)   # far beyond MAX_CENTER_JUMP
+    back = [e["idx"] for e in repaired(tmp_path, src, video) if e["gt_idx"] == 2]
+    assert len(back) >= 0.8 * (FRAMES - BACK) and set(back) == {2}
+    # position alone can't bring them back from across the frame
+    assert not [e for e in repaired(tmp_path, src) if e["gt_idx"] == 2]
+
+@pytest.mark.parametrize("offset", [40, 300])
+def test_stranger_never_takes_lost_id(tmp_path, offset):
+    src, video = scene(tmp_path, stranger=True, offset=offset)
+    late = repaired(tmp_path, src, video)
+    assert not [e for e in late if e["gt_idx"] == 9]
+    assert [e["idx"] for e in late if e["gt_idx"] == 1] == [1] * (FRAMES - BACK)   # the others keep theirs
+    if offset < repair2.MAX_CENTER_JUMP:
+        # without footage the stranger right where idx 2 left does inherit it: what ReID fixes
+        assert {e["idx"] for e in repaired(tmp_path, src) if e["gt_idx"] == 9} == {2}
+
+def test_without_video_repair_is_position_only(tmp_path, monkeypatch):
+    src, _ = scene(tmp_path, stranger=True, offset=40)
+    with_reid = repaired(tmp_path, src)
+    monkeypatch.setattr(repair2, "REID_ENABLED", False)
+    assert repaired(tmp_path, src) == with_reid
@@ -0,0 +1,34 @@
+# make_video must release the encoder (ffmpeg: close the pipe, reap the child) even when a frame fails.
+import os
+import sys
+
+import numpy as np
+import cv2
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "AlphaPose_Code"))
+
+import videoCreator
+
+class RecordingEncoder:
+    def __init__(self, *args, **kwargs):
+        self.frames = 0
+        self.released = False
+        RecordingEncoder.last = self
+
+    def write(self, frame):
+        self.frames += 1
+        if self.frames == 2:
+            raise OSError("broken pipe")
+
+    def release(self):
+        self.released = True
+
+def test_encoder_released_on_error(tmp_path, monkeypatch):
+    for i in range(4):
+        cv2.imwrite(str(tmp_path / f"plot_{i}.png"), np.zeros((8, 8, 3), np.uint8))
+    monkeypatch.setattr(videoCreator, "open_encoder", RecordingEncoder)
+    with pytest.raises(OSError):
+        videoCreator.make_video("clip", "missing.avi", image_folder=str(tmp_path), output_dir=str(tmp_path))
+    assert RecordingEncoder.last.released